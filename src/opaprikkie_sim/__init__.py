@@ -1,20 +1,47 @@
-"""Opa Prikkie Simulator - A Python implementation of the Dutch dice game."""
-
-from opaprikkie_sim.board import Board, Peg
-from opaprikkie_sim.dice import DiceRoll, DiceRoller
-from opaprikkie_sim.display import Display
-from opaprikkie_sim.game import Game, Player
-from opaprikkie_sim.strategy import FinishPegsStrategy, GreedyStrategy, RandomStrategy, Strategy
-from opaprikkie_sim.utilities import init_logger
-
-# Single-sourcing the version number with poetry:
-# https://github.com/python-poetry/poetry/pull/2366#issuecomment-652418094
-
-__version__: str = "unknown"
-if __package__ is not None:
-    __version__ = __import__("importlib.metadata").metadata.version(
-        __package__.replace(".", "-")  # canonicalize any namespaced module
+"""Opa Prikkie Simulator - A Python implementation of the Dutch dice game.
+
+The public classes are loaded from their modules on first access, and the version is looked up
+on first access of ``__version__``: importing the package, or any module of it, stays cheap.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from opaprikkie_sim.board import Board, PackedBoard, Peg
+    from opaprikkie_sim.dice import DiceRoll, DiceRoller
+    from opaprikkie_sim.display import Display
+    from opaprikkie_sim.game import Game, Player
+    from opaprikkie_sim.strategy import (
+        FinishPegsStrategy,
+        GreedyStrategy,
+        OptimalStrategy,
+        RandomStrategy,
+        Strategy,
     )
+    from opaprikkie_sim.utilities import init_logger
+
+    __version__: str
+
+# Module of every public name
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "Board": "board",
+    "PackedBoard": "board",
+    "Peg": "board",
+    "DiceRoll": "dice",
+    "DiceRoller": "dice",
+    "Display": "display",
+    "Game": "game",
+    "Player": "game",
+    "FinishPegsStrategy": "strategy",
+    "GreedyStrategy": "strategy",
+    "OptimalStrategy": "strategy",
+    "RandomStrategy": "strategy",
+    "Strategy": "strategy",
+    "init_logger": "utilities",
+}
 
 __all__ = [
     "Board",
@@ -24,9 +51,38 @@ __all__ = [
     "FinishPegsStrategy",
     "Game",
     "GreedyStrategy",
+    "OptimalStrategy",
+    "PackedBoard",
     "Peg",
     "Player",
     "RandomStrategy",
     "Strategy",
     "init_logger",
 ]
+
+
+def _version() -> str:
+    # Single-sourcing the version number with poetry:
+    # https://github.com/python-poetry/poetry/pull/2366#issuecomment-652418094
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version(__name__.replace(".", "-"))
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    if name == "__version__":
+        value: Any = _version()
+    elif name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(f"{__name__}.{_LAZY_ATTRIBUTES[name]}"), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # cache it, later accesses do not come here
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_ATTRIBUTES, "__version__"})
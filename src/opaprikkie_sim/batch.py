@@ -0,0 +1,399 @@
+"""Vectorized lockstep engine that plays many Opa Prikkie games at once.
+
+All boards of a batch live in a single ``(games, players, 12)`` int8 array. Every step the
+current player of all unfinished games rolls at once, strategies pick their targets with masked
+array operations and finished games are retired from the active set. Because every game
+advances exactly one player per step, all active games always share the same current player.
+"""
+
+from __future__ import annotations
+
+import functools
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from opaprikkie_sim.board import Board, Peg
+from opaprikkie_sim.constants import MAX_DICE_NUM, MAX_ROW_HEIGHT, MIN_DICE_NUM, NUMBER_OF_DICE
+from opaprikkie_sim.dice import DiceRoll
+from opaprikkie_sim.roll_table import face_counts_to_key
+from opaprikkie_sim.turn_table import turn_outcome_distribution
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import numpy.typing as npt
+
+    from opaprikkie_sim.solver import SolitaireSolution
+    from opaprikkie_sim.strategy import Strategy
+
+NUM_TARGETS: int = 2 * MAX_DICE_NUM
+PACKED_BITS_PER_PEG: int = 3
+
+_FACES = np.arange(MIN_DICE_NUM, MAX_DICE_NUM + 1, dtype=np.int8)
+_DOUBLE_TARGETS = np.arange(MAX_DICE_NUM + 1, NUM_TARGETS + 1, dtype=np.int8)
+
+# (target, face a, face b) with a <= b and a + b == target, for all two-dice targets
+_DOUBLE_PAIRS: list[tuple[int, int, int]] = [
+    (target, a, target - a)
+    for target in range(MAX_DICE_NUM + 1, NUM_TARGETS + 1)
+    for a in range(max(MIN_DICE_NUM, target - MAX_DICE_NUM), target // 2 + 1)
+]
+
+# Rolls of up to this many dice are looked up in precomputed tables instead of counted
+_MAX_LOOKUP_DICE: int = NUMBER_OF_DICE
+
+
+def target_counts(faces: npt.NDArray[np.int8]) -> npt.NDArray[np.int8]:
+    """Count how many times every target can be formed in each roll.
+
+    This is the array version of ``DiceRoll.get_available_targets``.
+
+    Args:
+        faces: ``(games, dice)`` dice values, 0 marks a die that was not rolled
+
+    Returns:
+        ``(games, 12)`` array where column ``t - 1`` holds the count for target ``t``
+    """
+    face_counts = (faces[:, :, None] == _FACES).sum(axis=1, dtype=np.int8)
+    counts = np.zeros((faces.shape[0], NUM_TARGETS), dtype=np.int8)
+    counts[:, :MAX_DICE_NUM] = face_counts
+    for target, a, b in _DOUBLE_PAIRS:
+        if a == b:
+            counts[:, target - 1] += face_counts[:, a - 1] // 2
+        else:
+            counts[:, target - 1] += np.minimum(face_counts[:, a - 1], face_counts[:, b - 1])
+    return counts
+
+
+def pack_boards(positions: npt.NDArray[np.int8]) -> npt.NDArray[np.int64]:
+    """Pack ``(..., 12)`` peg positions into one integer per board, as ``PackedBoard.key``."""
+    shifts = PACKED_BITS_PER_PEG * np.arange(NUM_TARGETS, dtype=np.int64)
+    return (positions.astype(np.int64) << shifts).sum(axis=-1)
+
+
+def unpack_boards(keys: npt.NDArray[np.int64]) -> npt.NDArray[np.int8]:
+    """Unpack ``PackedBoard.key`` integers into ``(..., 12)`` peg positions."""
+    shifts = PACKED_BITS_PER_PEG * np.arange(NUM_TARGETS, dtype=np.int64)
+    return ((keys[..., None] >> shifts) & ((1 << PACKED_BITS_PER_PEG) - 1)).astype(np.int8)
+
+
+def _roll_codes(faces: npt.NDArray[np.int8]) -> npt.NDArray[np.int64]:
+    """Encode every roll as a base-7 number, with one digit per die (0 = not rolled)."""
+    powers = (MAX_DICE_NUM + 1) ** np.arange(faces.shape[1], dtype=np.int64)
+    return faces.astype(np.int64) @ powers
+
+
+@functools.cache
+def _roll_lookup(num_dice: int) -> npt.NDArray[np.int8]:
+    """Target counts of every possible roll, indexed by ``_roll_codes``."""
+    codes = np.arange((MAX_DICE_NUM + 1) ** num_dice, dtype=np.int64)
+    powers = (MAX_DICE_NUM + 1) ** np.arange(num_dice, dtype=np.int64)
+    faces = (codes[:, None] // powers % (MAX_DICE_NUM + 1)).astype(np.int8)
+    return target_counts(faces)
+
+
+@functools.cache
+def _outcome_cdf(num_dice: int) -> npt.NDArray[np.float64]:
+    """Cumulative turn-outcome probabilities, one row per target (row 0 is unused).
+
+    Rows are padded with a value above 1 so that padding never counts as a reached outcome.
+    """
+    distributions = [
+        [float(p) for p in turn_outcome_distribution(target, num_dice)]
+        for target in range(MIN_DICE_NUM, NUM_TARGETS + 1)
+    ]
+    width = max(len(distribution) for distribution in distributions) - 1
+    cdf = np.full((NUM_TARGETS + 1, width), 2.0)
+    for target, distribution in enumerate(distributions, start=MIN_DICE_NUM):
+        cumulative = np.cumsum(distribution)[:-1]
+        cdf[target, : cumulative.size] = cumulative
+    return cdf
+
+
+def sample_turn_outcomes(
+    targets: npt.NDArray[np.int8], uniform: npt.NDArray[np.float64], num_dice: int = NUMBER_OF_DICE
+) -> npt.NDArray[np.int8]:
+    """Moves of a complete turn for every target, drawn from the outcome table.
+
+    Args:
+        targets: Targets (1-12), 0 for no target, which never moves
+        uniform: One uniform number in ``[0, 1)`` per target
+
+    Returns:
+        Moves per target, as ``DiceRoller.simulate_turn``
+    """
+    cdf = _outcome_cdf(num_dice)[targets]
+    return (cdf <= uniform[:, None]).sum(axis=1, dtype=np.int8)
+
+
+class BatchStrategy(ABC):
+    """Abstract base class for array-native strategies used by ``BatchGame``."""
+
+    def __init__(self, row_height: int = MAX_ROW_HEIGHT):
+        self.row_height = row_height
+
+    @abstractmethod
+    def choose_targets(
+        self,
+        positions: npt.NDArray[np.int8],
+        counts: npt.NDArray[np.int8],
+        rng: np.random.Generator,
+    ) -> npt.NDArray[np.int8]:
+        """Choose which target number to save for in every game.
+
+        Args:
+            positions: ``(games, 12)`` peg positions of the acting player
+            counts: ``(games, 12)`` target counts of the roll, see ``target_counts``
+            rng: Random generator of the engine
+
+        Returns:
+            ``(games,)`` chosen targets (1-12), 0 where no target can be chosen.
+        """
+        pass
+
+
+def _valid_targets(
+    positions: npt.NDArray[np.int8], counts: npt.NDArray[np.int8], row_height: int
+) -> npt.NDArray[np.bool_]:
+    """Targets that were rolled and whose peg is not at the top yet."""
+    return (counts > 0) & (positions < row_height)
+
+
+def _first_best(score: npt.NDArray[np.int16], valid: npt.NDArray[np.bool_]) -> npt.NDArray[np.int8]:
+    """Pick the highest scoring valid target, the lowest target on ties.
+
+    This matches the heuristic strategies, which keep the first best target of
+    ``DiceRoll.get_available_targets`` (listed in ascending order).
+    """
+    key = np.where(valid, score, -1)
+    choice = (key.argmax(axis=1) + 1).astype(np.int8)
+    choice[~valid.any(axis=1)] = 0
+    return choice
+
+
+class BatchRandomStrategy(BatchStrategy):
+    """Array version of ``RandomStrategy``."""
+
+    def choose_targets(
+        self,
+        positions: npt.NDArray[np.int8],
+        counts: npt.NDArray[np.int8],
+        rng: np.random.Generator,
+    ) -> npt.NDArray[np.int8]:
+        """Choose a random target from the valid options."""
+        valid = _valid_targets(positions, counts, self.row_height)
+        key = np.where(valid, rng.random(valid.shape), -1.0)
+        choice = (key.argmax(axis=1) + 1).astype(np.int8)
+        choice[~valid.any(axis=1)] = 0
+        return choice
+
+
+class BatchGreedyStrategy(BatchStrategy):
+    """Array version of ``GreedyStrategy``."""
+
+    def choose_targets(
+        self,
+        positions: npt.NDArray[np.int8],
+        counts: npt.NDArray[np.int8],
+        rng: np.random.Generator,  # noqa: ARG002
+    ) -> npt.NDArray[np.int8]:
+        """Choose the target that will move a peg the furthest."""
+        score = counts.astype(np.int16) * (self.row_height - positions)
+        return _first_best(score, _valid_targets(positions, counts, self.row_height))
+
+
+class BatchFinishPegsStrategy(BatchStrategy):
+    """Array version of ``FinishPegsStrategy``."""
+
+    def choose_targets(
+        self,
+        positions: npt.NDArray[np.int8],
+        counts: npt.NDArray[np.int8],
+        rng: np.random.Generator,  # noqa: ARG002
+    ) -> npt.NDArray[np.int8]:
+        """Choose the target with the most moves, preferring pegs that can be finished."""
+        score = counts.astype(np.int16)
+        bonus = np.where(positions + counts >= self.row_height, self.row_height, 0)
+        score += bonus.astype(np.int16)
+        return _first_best(score, _valid_targets(positions, counts, self.row_height))
+
+
+class BatchOptimalStrategy(BatchStrategy):
+    """Array version of ``OptimalStrategy``, it needs a solution with a policy table."""
+
+    def __init__(self, solution: SolitaireSolution | None = None, row_height: int = MAX_ROW_HEIGHT):
+        super().__init__(solution.row_height if solution is not None else row_height)
+        self.solution = solution
+
+    def choose_targets(
+        self,
+        positions: npt.NDArray[np.int8],
+        counts: npt.NDArray[np.int8],
+        rng: np.random.Generator,  # noqa: ARG002
+    ) -> npt.NDArray[np.int8]:
+        """Choose the first rolled target in the order of preference of the board."""
+        from opaprikkie_sim.solver import get_solution, unpack_policy
+
+        if self.solution is None:
+            self.solution = get_solution(self.row_height)
+        if self.solution.policy is None:
+            raise ValueError("BatchOptimalStrategy needs a solution with a policy table")
+
+        powers = (self.row_height + 1) ** np.arange(NUM_TARGETS, dtype=np.int64)
+        preferences = unpack_policy(self.solution.policy[positions.astype(np.int64) @ powers])
+        valid = _valid_targets(positions, counts, self.row_height)
+        rolled = np.take_along_axis(valid, np.maximum(preferences, 0), axis=1) & (preferences >= 0)
+
+        rank = rolled.argmax(axis=1)
+        choice = (preferences[np.arange(rank.size), rank] + 1).astype(np.int8)
+        choice[~rolled.any(axis=1)] = 0
+        return choice
+
+
+class StrategyAdapter(BatchStrategy):
+    """Runs a classic ``Strategy`` game by game, for strategies without an array version."""
+
+    def __init__(self, strategy: Strategy, row_height: int = MAX_ROW_HEIGHT):
+        super().__init__(row_height)
+        self.strategy = strategy
+
+    def choose_targets(
+        self,
+        positions: npt.NDArray[np.int8],
+        counts: npt.NDArray[np.int8],
+        rng: np.random.Generator,  # noqa: ARG002
+    ) -> npt.NDArray[np.int8]:
+        """Ask the strategy for every game, on a ``Board`` and ``DiceRoll`` of that game."""
+        choice = np.zeros(positions.shape[0], dtype=np.int8)
+        for game, (row, roll_counts) in enumerate(zip(positions.tolist(), counts, strict=True)):
+            pegs = [
+                Peg(number=number, position=position, max_position=self.row_height)
+                for number, position in enumerate(row, start=MIN_DICE_NUM)
+            ]
+            # the single-die targets are the number of dice per face
+            roll = DiceRoll.from_face_key(face_counts_to_key(roll_counts[:MAX_DICE_NUM].tolist()))
+            choice[game] = self.strategy.choose_target(Board(pegs, self.row_height), roll) or 0
+        return choice
+
+
+# available batch strategies, same names as STRATEGIES_NAME_MAPPING (no rollout, expectimax)
+# and as constants.BATCH_STRATEGIES
+BATCH_STRATEGIES_NAME_MAPPING: dict[str, type[BatchStrategy]] = {
+    "random": BatchRandomStrategy,
+    "greedy": BatchGreedyStrategy,
+    "smart": BatchFinishPegsStrategy,
+    "optimal": BatchOptimalStrategy,
+}
+
+
+@dataclass
+class BatchResult:
+    """Outcome of all games played by a ``BatchGame``."""
+
+    winners: npt.NDArray[np.int8]  # (games,) index of the winning player
+    turn_counts: npt.NDArray[np.int32]  # (games,) completed rounds, as GameState.turn_count
+    boards: npt.NDArray[np.int8]  # (games, players, 12) final peg positions
+
+
+class BatchGame:
+    """Plays many independent games in lockstep on NumPy arrays."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        num_games: int,
+        num_players: int = 2,
+        strategies: Sequence[BatchStrategy] | None = None,
+        num_dice: int = NUMBER_OF_DICE,
+        rng: np.random.Generator | None = None,
+        use_outcome_table: bool = True,
+        row_height: int = MAX_ROW_HEIGHT,
+    ):
+        if strategies is None:
+            strategies = [BatchRandomStrategy(row_height) for _ in range(num_players)]
+        if len(strategies) != num_players:
+            raise ValueError(f"Expected {num_players} strategies, got {len(strategies)}")
+        if any(strategy.row_height != row_height for strategy in strategies):
+            raise ValueError(f"All strategies must play row height {row_height}")
+
+        self.num_games = num_games
+        self.num_players = num_players
+        self.strategies = list(strategies)
+        self.num_dice = num_dice
+        self.rng = rng or np.random.default_rng()
+        self.use_outcome_table = use_outcome_table
+        self.row_height = row_height
+        self.boards = np.zeros((num_games, num_players, NUM_TARGETS), dtype=np.int8)
+
+    def roll(self, num_games: int) -> npt.NDArray[np.int8]:
+        """Roll all dice for the given number of games."""
+        return self.rng.integers(
+            MIN_DICE_NUM, MAX_DICE_NUM + 1, size=(num_games, self.num_dice), dtype=np.int8
+        )
+
+    def count_targets(self, faces: npt.NDArray[np.int8]) -> npt.NDArray[np.int8]:
+        """Target counts of the rolls, looked up in a table for the usual number of dice."""
+        if self.num_dice > _MAX_LOOKUP_DICE:
+            return target_counts(faces)
+        return _roll_lookup(self.num_dice)[_roll_codes(faces)]
+
+    def simulate_turns(self, targets: npt.NDArray[np.int8]) -> npt.NDArray[np.int8]:
+        """Simulate a complete turn for every target, as ``DiceRoller.simulate_turn`` does."""
+        if not self.use_outcome_table:
+            return self.simulate_turns_reference(targets)
+        return sample_turn_outcomes(targets, self.rng.random(targets.size), self.num_dice)
+
+    def simulate_turns_reference(self, targets: npt.NDArray[np.int8]) -> npt.NDArray[np.int8]:
+        """Simulate a complete turn for every target by rolling the dice round by round."""
+        total = np.zeros(targets.shape, dtype=np.int8)
+        available = np.full(targets.shape, self.num_dice, dtype=np.int8)
+        dice_per_match = np.where(targets <= MAX_DICE_NUM, 1, 2).astype(np.int8)
+        live = np.arange(targets.size)
+
+        while live.size:
+            faces = self.roll(live.size)
+            faces[np.arange(self.num_dice) >= available[live, None]] = 0
+            count = self.count_targets(faces)[np.arange(live.size), targets[live] - 1]
+
+            total[live] += count
+            available[live] -= count * dice_per_match[live]
+            available[live[available[live] == 0]] = self.num_dice
+
+            keep = (count > 0) & (total[live] < MAX_ROW_HEIGHT)
+            live = live[keep]
+
+        return total
+
+    def play(self) -> BatchResult:
+        """Play all games until every game has a winner."""
+        winners = np.zeros(self.num_games, dtype=np.int8)
+        turn_counts = np.zeros(self.num_games, dtype=np.int32)
+        active = np.arange(self.num_games)
+        step = 0
+
+        while active.size:
+            player = step % self.num_players
+            positions = self.boards[active, player]
+
+            faces = self.roll(active.size)
+            targets = self.strategies[player].choose_targets(
+                positions, self.count_targets(faces), self.rng
+            )
+
+            moving = np.nonzero(targets)[0]
+            columns = targets[moving] - 1
+            moves = self.simulate_turns(targets[moving])
+            positions[moving, columns] = np.minimum(
+                positions[moving, columns] + moves, self.row_height
+            )
+            self.boards[active, player] = positions
+
+            finished = (positions >= self.row_height).all(axis=1)
+            winners[active[finished]] = player
+            turn_counts[active[finished]] = step // self.num_players
+            active = active[~finished]
+            step += 1
+
+        return BatchResult(winners=winners, turn_counts=turn_counts, boards=self.boards)
@@ -0,0 +1,304 @@
+"""Benchmarks of the hot paths, with JSON reports and a comparison against a stored baseline.
+
+Every benchmark prepares its inputs up front from a fixed seed, then times a call that runs a
+number of operations with ``timeit``: the best of a few repeats is kept, which is the least
+disturbed by the rest of the machine. Micro benchmarks report microseconds per operation, the
+end-to-end runs report games per second and the peak memory traced by ``tracemalloc``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import random
+import timeit
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from opaprikkie_sim.batch import NUM_TARGETS
+from opaprikkie_sim.board import Board
+from opaprikkie_sim.constants import BENCH_TOLERANCE, MAX_ROW_HEIGHT, MIN_DICE_NUM
+from opaprikkie_sim.dice import BufferedDiceRoller, DiceRoll, DiceRoller
+from opaprikkie_sim.game import Game
+from opaprikkie_sim.replay import ReplayWriter
+from opaprikkie_sim.simulation import create_strategy, run_games
+from opaprikkie_sim.strategy import OptimalStrategy
+from opaprikkie_sim.utilities import init_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = init_logger(__name__)
+
+BENCH_SEED: int = 20240601
+# Rolls and boards prepared per micro benchmark, one call goes over all of them
+BENCH_INPUTS: int = 1000
+# The optimal strategy is benchmarked on a small game that is solved in seconds
+OPTIMAL_ROW_HEIGHT: int = 2
+
+
+@dataclass
+class Benchmark:
+    """A hot path to time: ``setup`` prepares a call that runs the given number of operations."""
+
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    size: int = BENCH_INPUTS  # operations per call
+    quick_size: int = BENCH_INPUTS  # operations per call of a quick run
+    throughput: bool = False  # report games per second instead of microseconds per operation
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurement of one benchmark."""
+
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+    peak_memory_kib: float | None = None
+
+
+@dataclass
+class Comparison:
+    """Measurement of a benchmark against its baseline, positive changes are improvements."""
+
+    name: str
+    value: float
+    baseline: float
+    change: float
+    memory_change: float | None
+    regressed: bool
+
+
+def _rolls(num_rolls: int) -> list[DiceRoll]:
+    roller = DiceRoller(rng=random.Random(BENCH_SEED))  # noqa: S311
+    return [roller.roll() for _ in range(num_rolls)]
+
+
+def _boards(num_boards: int, row_height: int = MAX_ROW_HEIGHT) -> list[Board]:
+    rng = random.Random(BENCH_SEED)  # noqa: S311
+    boards = []
+    for _ in range(num_boards):
+        board = Board(row_height=row_height)
+        for peg in board.pegs:
+            peg.position = rng.randint(0, row_height - 1)
+        boards.append(board)
+    return boards
+
+
+def _available_targets(size: int) -> Callable[[], object]:
+    rolls = _rolls(size)
+    return lambda: [roll.get_available_targets() for roll in rolls]
+
+
+def _targets(size: int) -> list[int]:
+    rng = random.Random(BENCH_SEED)  # noqa: S311
+    return [rng.randint(MIN_DICE_NUM, NUM_TARGETS) for _ in range(size)]
+
+
+def _combinations(size: int) -> Callable[[], object]:
+    pairs = list(zip(_rolls(size), _targets(size), strict=True))
+    return lambda: [roll.get_combinations_for_target(target) for roll, target in pairs]
+
+
+def _simulate_turn(
+    roller_factory: Callable[[], DiceRoller],
+) -> Callable[[int], Callable[[], object]]:
+    def setup(size: int) -> Callable[[], object]:
+        roller = roller_factory()
+        targets = _targets(size)
+        return lambda: [roller.simulate_turn(target) for target in targets]
+
+    return setup
+
+
+def _choose_target(strategy_name: str) -> Callable[[int], Callable[[], object]]:
+    def setup(size: int) -> Callable[[], object]:
+        strategy = create_strategy(strategy_name, random.Random(BENCH_SEED))  # noqa: S311
+        boards = _boards(size)
+        if isinstance(strategy, OptimalStrategy):
+            boards = _boards(size, OPTIMAL_ROW_HEIGHT)
+            strategy.choose_target(boards[0], _rolls(1)[0])  # solve outside the timing
+        pairs = list(zip(boards, _rolls(size), strict=True))
+        return lambda: [strategy.choose_target(board, roll) for board, roll in pairs]
+
+    return setup
+
+
+def _play_games(headless: bool) -> Callable[[int], Callable[[], object]]:
+    def setup(size: int) -> Callable[[], object]:
+        def play() -> None:
+            for index in range(size):
+                roller = DiceRoller(rng=random.Random(BENCH_SEED + index))  # noqa: S311
+                game = Game(num_players=2, dice_roller=roller, headless=headless)
+                game.set_player_strategy(0, create_strategy("greedy"))
+                game.set_player_strategy(1, create_strategy("smart"))
+                if headless:
+                    game.play_headless()
+                else:
+                    game.play_game()
+
+        return play
+
+    return setup
+
+
+def _simulation(engine: str) -> Callable[[int], Callable[[], object]]:
+    def setup(size: int) -> Callable[[], object]:
+        return lambda: run_games(size, 2, "greedy", "smart", engine, workers=1, seed=BENCH_SEED)
+
+    return setup
+
+
+def _recorded_simulation(size: int) -> Callable[[], object]:
+    def play() -> None:
+        # the cost of recording, without the cost of the disk
+        with ReplayWriter(os.devnull, ["greedy", "smart"], BENCH_SEED) as replay:
+            run_games(size, 2, "greedy", "smart", workers=1, seed=BENCH_SEED, replay=replay)
+
+    return play
+
+
+def _default_roller() -> DiceRoller:
+    return DiceRoller(rng=random.Random(BENCH_SEED))  # noqa: S311
+
+
+def _buffered_roller() -> DiceRoller:
+    return BufferedDiceRoller(generator=np.random.Generator(np.random.SFC64(BENCH_SEED)))
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    benchmark.name: benchmark
+    for benchmark in [
+        Benchmark("dice.get_available_targets", _available_targets),
+        Benchmark("dice.get_combinations_for_target", _combinations),
+        Benchmark("dice.simulate_turn", _simulate_turn(_default_roller)),
+        Benchmark("dice.simulate_turn.buffered", _simulate_turn(_buffered_roller)),
+        *[
+            Benchmark(f"strategy.{name}.choose_target", _choose_target(name))
+            for name in ("random", "greedy", "smart", "optimal")
+        ],
+        Benchmark("strategy.rollout.choose_target", _choose_target("rollout"), 50, 5),
+        Benchmark("strategy.expectimax.choose_target", _choose_target("expectimax"), 50, 5),
+        Benchmark("game.play_game", _play_games(headless=False), 200, 20, throughput=True),
+        Benchmark("game.play_headless", _play_games(headless=True), 200, 20, throughput=True),
+        Benchmark("simulation.classic", _simulation("classic"), 2000, 200, throughput=True),
+        Benchmark("simulation.classic.replay", _recorded_simulation, 2000, 200, throughput=True),
+        Benchmark("simulation.batch", _simulation("batch"), 50000, 5000, throughput=True),
+    ]
+}
+
+
+def run_benchmark(benchmark: Benchmark, quick: bool = False) -> BenchmarkResult:
+    """Time one benchmark.
+
+    Args:
+        benchmark: Benchmark to run
+        quick: Fewer games and repeats, for smoke tests
+
+    Returns:
+        BenchmarkResult: Best time per operation, or games per second and peak memory
+    """
+    operations = benchmark.quick_size if quick else benchmark.size
+    call = benchmark.setup(operations)
+    timer = timeit.Timer(call)
+    if benchmark.throughput:
+        number = 1
+    else:
+        number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=2 if quick else 5, number=number)) / number
+    logger.info(f"Benchmark {benchmark.name}: {best:.4f} s per call of {operations} operations")
+
+    if not benchmark.throughput:
+        return BenchmarkResult(benchmark.name, best / operations * 1e6, "us/op", False)
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(benchmark.name, operations / best, "games/s", True, peak / 1024)
+
+
+def run_benchmarks(patterns: list[str] | None = None, quick: bool = False) -> list[BenchmarkResult]:
+    """Run every benchmark whose name contains one of the patterns (default: all)."""
+    return [
+        run_benchmark(benchmark, quick)
+        for name, benchmark in BENCHMARKS.items()
+        if not patterns or any(pattern in name for pattern in patterns)
+    ]
+
+
+def benchmark_report(results: list[BenchmarkResult]) -> dict[str, Any]:
+    """JSON-serializable report of the results and of the machine they were measured on."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def save_report(report: dict[str, Any], path: str | Path) -> None:
+    """Write a report as JSON."""
+    with Path(path).open("w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+
+
+def load_report(path: str | Path) -> dict[str, Any]:
+    """Read a report written by ``save_report``."""
+    with Path(path).open(encoding="utf-8") as file:
+        report: dict[str, Any] = json.load(file)
+    return report
+
+
+def _relative_change(value: float, baseline: float, higher_is_better: bool) -> float:
+    ratio = value / baseline if higher_is_better else baseline / value
+    return ratio - 1
+
+
+def compare_to_baseline(
+    results: list[BenchmarkResult],
+    baseline: dict[str, Any],
+    tolerance: float = BENCH_TOLERANCE,
+) -> list[Comparison]:
+    """Compare results to the benchmarks of the same name in a baseline report.
+
+    Args:
+        results: Measurements of this run
+        baseline: Report of an earlier run, see ``benchmark_report``
+        tolerance: Relative slowdown or memory growth that still passes
+
+    Returns:
+        list[Comparison]: One comparison per benchmark present in both
+    """
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    comparisons = []
+    for result in results:
+        reference = baseline_results.get(result.name)
+        if reference is None:
+            continue
+        change = _relative_change(result.value, reference["value"], result.higher_is_better)
+        memory_change = None
+        if result.peak_memory_kib is not None and reference.get("peak_memory_kib"):
+            memory_change = _relative_change(
+                result.peak_memory_kib, reference["peak_memory_kib"], False
+            )
+        regressed = change < -tolerance or (
+            memory_change is not None and memory_change < -tolerance
+        )
+        comparisons.append(
+            Comparison(
+                result.name, result.value, reference["value"], change, memory_change, regressed
+            )
+        )
+    return comparisons
@@ -1,5 +1,7 @@
 """Game board representation for Opa Prikkie."""
 
+from __future__ import annotations
+
 from dataclasses import dataclass, field
 
 from opaprikkie_sim.constants import MAX_DICE_NUM, MAX_ROW_HEIGHT, MIN_DICE_NUM
@@ -44,11 +46,21 @@ class Board:
 
     def get_peg(self, number: int) -> Peg | None:
         """Get the peg for a specific number."""
+        # Boards created with all pegs keep them in order of number
+        index = number - MIN_DICE_NUM
+        if 0 <= index < len(self.pegs) and self.pegs[index].number == number:
+            return self.pegs[index]
         for peg in self.pegs:
             if peg.number == number:
                 return peg
         return None  # Peg not found
 
+    def get_position(self, number: int) -> int:
+        """Get the position of the peg for a specific number."""
+        peg = self.get_peg(number)
+        assert peg is not None, f"Peg {number} not found"
+        return peg.position
+
     def is_peg_movable(self, number: int) -> bool:
         """Check if a peg is movable. A Peg can be moved up if it is not at the top."""
         peg = self.get_peg(number)
@@ -126,3 +138,157 @@ class Board:
             lines.append(row_str)
 
         return "\n".join(lines)
+
+
+# Bits per peg position in a PackedBoard, enough for row heights up to 7
+_BITS_PER_PEG: int = 3
+_PEG_MASK: int = (1 << _BITS_PER_PEG) - 1
+_NUM_PEGS: int = 2 * MAX_DICE_NUM - MIN_DICE_NUM + 1
+_ALL_PEGS_MASK: int = (1 << _NUM_PEGS) - 1
+
+
+class PackedBoard(Board):
+    """Board that stores all peg positions in a single integer.
+
+    Every peg takes three bits, so the twelve pegs fit in 36 bits. Peg access and moves are
+    O(1), the board keeps a mask of the pegs that can still move and hashes as cheaply as an int.
+    It is a drop-in replacement for ``Board``; ``get_peg`` and ``pegs`` return ``Peg`` snapshots,
+    so change the board with ``move_peg`` rather than through the returned pegs.
+    """
+
+    def __init__(self, pegs: list[Peg] | None = None, row_height: int = MAX_ROW_HEIGHT):
+        assert row_height <= _PEG_MASK, f"Row height {row_height} does not fit a packed peg"
+        self.row_height = row_height
+        self.key = 0
+        # pegs that are on the board, and pegs that are on the board but not at the top
+        self.present_mask = _ALL_PEGS_MASK
+        self.open_mask = _ALL_PEGS_MASK
+        if pegs:
+            self.pegs = pegs
+
+    @classmethod
+    def from_board(cls, board: Board) -> PackedBoard:
+        """Create a packed copy of a board."""
+        if isinstance(board, PackedBoard):
+            return board.copy()
+        return cls(pegs=board.pegs, row_height=board.row_height)
+
+    @classmethod
+    def from_key(cls, key: int, row_height: int = MAX_ROW_HEIGHT) -> PackedBoard:
+        """Create a full board from a packed key, see ``PackedBoard.key``."""
+        board = cls(row_height=row_height)
+        board.key = key
+        board.open_mask = 0
+        for index in range(_NUM_PEGS):
+            if (key >> (_BITS_PER_PEG * index)) & _PEG_MASK < row_height:
+                board.open_mask |= 1 << index
+        return board
+
+    def copy(self) -> PackedBoard:
+        """Return an independent copy of the board."""
+        board = PackedBoard.__new__(PackedBoard)
+        board.row_height = self.row_height
+        board.key = self.key
+        board.present_mask = self.present_mask
+        board.open_mask = self.open_mask
+        return board
+
+    @property
+    def pegs(self) -> list[Peg]:
+        """Snapshots of all pegs on the board."""
+        return [
+            Peg(number=number, position=self.get_position(number), max_position=self.row_height)
+            for number in range(MIN_DICE_NUM, _NUM_PEGS + 1)
+            if self.present_mask >> (number - 1) & 1
+        ]
+
+    @pegs.setter
+    def pegs(self, pegs: list[Peg]) -> None:
+        self.key = 0
+        self.present_mask = 0
+        self.open_mask = 0
+        for peg in pegs:
+            bit = 1 << (peg.number - 1)
+            position = min(peg.position, self.row_height)
+            self.key |= position << (_BITS_PER_PEG * (peg.number - 1))
+            self.present_mask |= bit
+            if position < self.row_height:
+                self.open_mask |= bit
+
+    @property
+    def completed_count(self) -> int:
+        """Number of pegs that reached the top."""
+        return (self.present_mask & ~self.open_mask).bit_count()
+
+    def get_position(self, number: int) -> int:
+        """Get the position of the peg for a specific number."""
+        return (self.key >> (_BITS_PER_PEG * (number - 1))) & _PEG_MASK
+
+    def get_peg(self, number: int) -> Peg | None:
+        """Get a snapshot of the peg for a specific number."""
+        if not (MIN_DICE_NUM <= number <= _NUM_PEGS) or not self.present_mask >> (number - 1) & 1:
+            return None
+        return Peg(number=number, position=self.get_position(number), max_position=self.row_height)
+
+    def is_peg_movable(self, number: int) -> bool:
+        """Check if a peg is movable. A Peg can be moved up if it is not at the top."""
+        return MIN_DICE_NUM <= number <= _NUM_PEGS and bool(self.open_mask >> (number - 1) & 1)
+
+    def move_peg(self, number: int, steps: int) -> bool:
+        """Move a peg by the given number of steps. Returns True if Peg is moved to the top."""
+        assert self.present_mask >> (number - 1) & 1, f"Peg {number} not found"
+        assert self.open_mask >> (number - 1) & 1, f"Peg {number} is already at the top"
+        shift = _BITS_PER_PEG * (number - 1)
+        position = min(((self.key >> shift) & _PEG_MASK) + steps, self.row_height)
+        self.key = (self.key & ~(_PEG_MASK << shift)) | (position << shift)
+        if position < self.row_height:
+            return False
+        self.open_mask &= ~(1 << (number - 1))
+        return True
+
+    def is_complete(self) -> bool:
+        """Check if all pegs have reached the top of the board."""
+        return self.open_mask == 0
+
+    def get_incomplete_pegs(self) -> list[Peg]:
+        """Get all pegs that haven't reached the top yet."""
+        return [peg for peg in self.pegs if peg.position < self.row_height]
+
+    def get_peg_positions(self) -> dict[int, int]:
+        """Get the current positions of all pegs."""
+        return {peg.number: peg.position for peg in self.pegs}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackedBoard):
+            return NotImplemented
+        return (self.key, self.present_mask, self.row_height) == (
+            other.key,
+            other.present_mask,
+            other.row_height,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.key, self.present_mask, self.row_height))
+
+    def __repr__(self) -> str:
+        return f"PackedBoard(positions={self.get_peg_positions()}, row_height={self.row_height})"
+
+
+# Bits of the positions in a board key, the pegs on the board and the row height follow
+_POSITION_BITS: int = _BITS_PER_PEG * _NUM_PEGS
+
+
+def board_key(board: Board) -> int:
+    """Canonical key of any board: equal for boards with the same pegs, positions and height.
+
+    The low bits hold the ``PackedBoard.key`` of the positions, followed by the pegs on the
+    board and the row height. A ``PackedBoard`` has its key at hand, other boards are packed.
+    """
+    if isinstance(board, PackedBoard):
+        key, present_mask = board.key, board.present_mask
+    else:
+        key = present_mask = 0
+        for peg in board.pegs:
+            key |= min(peg.position, board.row_height) << (_BITS_PER_PEG * (peg.number - 1))
+            present_mask |= 1 << (peg.number - 1)
+    return key | present_mask << _POSITION_BITS | board.row_height << (_POSITION_BITS + _NUM_PEGS)
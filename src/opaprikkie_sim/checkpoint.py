@@ -0,0 +1,150 @@
+"""Checkpoints of long runs, so that a run that was stopped continues where it left off.
+
+Chunks of games are merged in the order of the games, so the merged statistics always cover
+games ``0`` to ``num_games - 1`` and the next chunk starts at game ``num_games``. A checkpoint
+holds these statistics, the settings of the run and the seconds it has run, nothing else: the
+games of a seeded run draw from counter-based streams keyed by their index, so a resumed seeded
+run plays the same games and ends with the same results as a run that was never stopped. An
+unseeded run continues with fresh random numbers, its results are statistically the same.
+
+Every checkpoint is written to a temporary file that replaces the previous checkpoint at once,
+a run that is stopped while writing leaves the previous checkpoint intact.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from opaprikkie_sim.constants import CHECKPOINT_INTERVAL
+from opaprikkie_sim.simulation import SimulationStats
+from opaprikkie_sim.utilities import init_logger
+
+logger = init_logger(__name__)
+
+CHECKPOINT_VERSION: int = 1
+
+
+def stats_to_dict(stats: SimulationStats) -> dict[str, Any]:
+    """Aggregates of the statistics as a JSON-serializable dict, without records or profile."""
+    return {
+        "num_players": stats.num_players,
+        "strategy_names": stats.strategy_names,
+        "num_games": stats.num_games,
+        "wins": stats.wins,
+        "total_turns": stats.total_turns,
+        "turn_histogram": stats.turn_histogram,
+    }
+
+
+def stats_from_dict(data: dict[str, Any]) -> SimulationStats:
+    """Statistics written by ``stats_to_dict``."""
+    return SimulationStats(
+        data["num_players"],
+        strategy_names=data["strategy_names"],
+        num_games=data["num_games"],
+        wins=data["wins"],
+        total_turns=data["total_turns"],
+        turn_histogram=data["turn_histogram"],
+    )
+
+
+def save_checkpoint(path: str | Path, checkpoint: dict[str, Any]) -> None:
+    """Write a checkpoint atomically: to a temporary file that then replaces the file."""
+    path = Path(path)
+    temporary = path.with_name(f"{path.name}.tmp")
+    with temporary.open("w", encoding="utf-8") as file:
+        json.dump(checkpoint, file)
+        file.flush()
+        os.fsync(file.fileno())
+    temporary.replace(path)
+
+
+def load_checkpoint(path: str | Path) -> dict[str, Any]:
+    """Read a checkpoint written by ``save_checkpoint``.
+
+    Raises:
+        ValueError: If the file is not a checkpoint of this version.
+    """
+    with Path(path).open(encoding="utf-8") as file:
+        checkpoint: dict[str, Any] = json.load(file)
+    if not isinstance(checkpoint, dict) or checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Not a checkpoint of version {CHECKPOINT_VERSION}: {path}")
+    return checkpoint
+
+
+class Checkpointer:
+    """Saves the statistics of a run every ``interval`` seconds, and resumes from them."""
+
+    def __init__(
+        self, path: str | Path, interval: float = CHECKPOINT_INTERVAL, resume: bool = False
+    ):
+        """Set up the checkpoints of a run.
+
+        Args:
+            path: File of the checkpoints
+            interval: Seconds between checkpoints, 0 for a checkpoint after every chunk
+            resume: Continue from the checkpoint in the file, if there is one
+        """
+        self.path = Path(path)
+        self.interval = interval
+        self.resume = resume
+        self.run: dict[str, Any] = {}
+        self.resumed_games = 0
+        self.elapsed_before = 0.0  # seconds the run played before it was resumed
+        self._started = time.monotonic()
+        self._saved = self._started
+
+    def start(self, run: dict[str, Any]) -> SimulationStats | None:
+        """Start the checkpoints of a run.
+
+        Args:
+            run: Settings of the run, a checkpoint only resumes a run with the same settings
+
+        Returns:
+            SimulationStats | None: Statistics to continue from, ``None`` for a new run
+
+        Raises:
+            ValueError: If the checkpoint in the file belongs to a run with other settings.
+        """
+        self.run = run
+        self._started = self._saved = time.monotonic()
+        if not self.resume or not self.path.exists():
+            return None
+        checkpoint = load_checkpoint(self.path)
+        if checkpoint["run"] != run:
+            raise ValueError(
+                f"Checkpoint {self.path} is of another run: {checkpoint['run']}, not {run}"
+            )
+        stats = stats_from_dict(checkpoint["stats"])
+        self.resumed_games = stats.num_games
+        self.elapsed_before = checkpoint["elapsed"]
+        logger.info(f"Resuming from {self.path} after {stats.num_games} games")
+        return stats
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds the run has played, over all its resumptions."""
+        return self.elapsed_before + time.monotonic() - self._started
+
+    def update(self, stats: SimulationStats) -> None:
+        """Save a checkpoint if the interval has passed since the last one."""
+        if time.monotonic() - self._saved >= self.interval:
+            self.save(stats)
+
+    def save(self, stats: SimulationStats) -> None:
+        """Save a checkpoint of the statistics now."""
+        save_checkpoint(
+            self.path,
+            {
+                "version": CHECKPOINT_VERSION,
+                "run": self.run,
+                "elapsed": self.elapsed,
+                "stats": stats_to_dict(stats),
+            },
+        )
+        self._saved = time.monotonic()
+        logger.debug(f"Checkpoint of {stats.num_games} games saved to {self.path}")
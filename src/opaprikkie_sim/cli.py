@@ -1,18 +1,62 @@
-"""Command-line interface for Opa Prikkie simulator."""
+"""Command-line interface for Opa Prikkie simulator.
 
+The engines, NumPy and the process pools are imported by the commands that use them, so that
+``--version``, ``--help`` and short runs start quickly.
+"""
+
+from __future__ import annotations
+
+import contextlib
 import sys
+from typing import TYPE_CHECKING, Any
 
 import click
 
-from opaprikkie_sim.constants import PVP_MAX_PLAYERS, PVP_MIN_PLAYERS
+from opaprikkie_sim.constants import (
+    BATCH_STRATEGIES,
+    BENCH_TOLERANCE,
+    CHECKPOINT_INTERVAL,
+    ENGINES,
+    EXECUTORS,
+    LINEUP_ENGINES,
+    MAX_ROW_HEIGHT,
+    OUTPUT_FORMATS,
+    PVP_MAX_PLAYERS,
+    PVP_MIN_PLAYERS,
+)
 from opaprikkie_sim.display import Display
-from opaprikkie_sim.game import Game
-from opaprikkie_sim.strategy import STRATEGIES_NAME_MAPPING, Strategy
+from opaprikkie_sim.estimators import Z_95, StoppingRule, wilson_interval
+from opaprikkie_sim.profiling import PERCENTILES
+from opaprikkie_sim.strategy import STRATEGIES_NAME_MAPPING
 from opaprikkie_sim.utilities import init_logger
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from opaprikkie_sim.profiling import Profiler
+    from opaprikkie_sim.simulation import (
+        SimulationStats,
+        create_batch_strategy as create_batch_strategy,  # noqa: PLC0414
+        create_strategy as create_strategy,  # noqa: PLC0414
+    )
+
 logger = init_logger(__name__)
 display = Display.get_instance()
 
+# Names that moved to ``simulation``, loaded from there on first access
+_SIMULATION_ATTRIBUTES: tuple[str, ...] = ("create_strategy", "create_batch_strategy")
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    if name not in _SIMULATION_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from opaprikkie_sim import simulation
+
+    value = getattr(simulation, name)
+    # cache it, later accesses do not come here
+    globals()[name] = value
+    return value
+
 
 def get_version() -> str:
     """Get the version of the Opa Prikkie simulator."""
@@ -24,17 +68,23 @@ def get_version() -> str:
         return "unknown"
 
 
-def create_strategy(strategy_name: str) -> Strategy:
-    """Create a strategy based on the name."""
-    strategy_class = STRATEGIES_NAME_MAPPING.get(strategy_name.lower())
-    if not strategy_class:
-        raise ValueError(f"Unknown strategy: {strategy_name}")
+def playable_strategies() -> list[str]:
+    """Names of the strategies, the optimal one only if its solution can be loaded or solved."""
+    from opaprikkie_sim.solver import check_solution
 
-    return strategy_class()
+    strategies = list(STRATEGIES_NAME_MAPPING)
+    try:
+        check_solution()
+    except FileNotFoundError:
+        strategies.remove("optimal")
+    return strategies
 
 
 def play_interactive_game(num_players: int) -> None:  # noqa: C901
     """Play an interactive game with user input."""
+    from opaprikkie_sim.game import Game
+    from opaprikkie_sim.simulation import create_strategy
+
     display.display_info("Welcome to Opa Prikkie Simulator!")
     display.display_separator()
 
@@ -49,7 +99,7 @@ def play_interactive_game(num_players: int) -> None:  # noqa: C901
     logger.info(f"Created game with {num_players} players")
 
     # Set strategies
-    strategies = list(STRATEGIES_NAME_MAPPING.keys())
+    strategies = playable_strategies()
     for i in range(num_players):
         display.display_info(f"\nChoose strategy for Player {i + 1}:")
         for j, strategy in enumerate(strategies, 1):
@@ -60,13 +110,13 @@ def play_interactive_game(num_players: int) -> None:  # noqa: C901
         max_prompt_attempts = 3
         prompt_attempts = 0
         while True:
-            choice: int = click.prompt("Enter choice (1-3)", type=int)
+            choice: int = click.prompt(f"Enter choice (1-{number_of_strategies})", type=int)
             if 1 <= choice <= number_of_strategies:
                 strategy_obj = create_strategy(strategies[choice - 1])
                 game.set_player_strategy(i, strategy_obj)
                 logger.info(f"Player {i + 1} assigned {strategies[choice - 1]} strategy")
                 break
-            display.display_warning("Please enter a number between 1 and 3.")
+            display.display_warning(f"Please enter a number between 1 and {number_of_strategies}.")
             prompt_attempts += 1
 
             if prompt_attempts >= max_prompt_attempts:
@@ -110,56 +160,384 @@ def play_interactive_game(num_players: int) -> None:  # noqa: C901
     logger.info(f"Game completed in {turn_count} turns")
 
 
-def run_simulation(
-    num_games: int, num_players: int = 2, strategy1: str = "random", strategy2: str = "random"
+def run_simulation(  # noqa: PLR0913
+    num_games: int,
+    num_players: int = 2,
+    strategy1: str = "random",
+    strategy2: str = "random",
+    engine: str = "classic",
+    workers: int | None = None,
+    executor: str = "process",
+    seed: int | None = None,
+    output: str | None = None,
+    output_format: str = "jsonl",
+    rule: StoppingRule | None = None,
+    profile: bool = False,
+    replay_output: str | None = None,
+    checkpoint_path: str | None = None,
+    checkpoint_interval: float = CHECKPOINT_INTERVAL,
+    resume: bool = False,
+    cache_decisions: bool = False,
 ) -> None:
-    """Run multiple simulations and show statistics."""
-    display.display_info(f"Running {num_games} simulations...")
+    """Run multiple simulations and show statistics.
+
+    With a stopping rule, ``num_games`` is ignored and the run plays until the rule is met.
+    With ``profile``, the phase timings of the turns are shown after the results.
+    With ``replay_output``, the turns of every game are recorded to that replay file.
+    With ``checkpoint_path``, the statistics are saved to that file every
+    ``checkpoint_interval`` seconds, and with ``resume`` the run continues from them.
+    With ``cache_decisions``, the deterministic strategies cache their decisions.
+    """
+    from opaprikkie_sim.checkpoint import Checkpointer
+    from opaprikkie_sim.replay import ReplayWriter
+    from opaprikkie_sim.simulation import run_games, run_games_until, seat_strategies
+    from opaprikkie_sim.sinks import SINKS
+
+    if rule is None:
+        display.display_info(f"Running {num_games} simulations...")
+    else:
+        display.display_info("Running simulations until the stopping rule is met...")
     display.display_info(f"Players: {num_players}, Strategies: {strategy1} vs {strategy2}")
     display.display_separator(50)
 
-    wins = [0] * num_players
-    total_turns = 0
-    player_strategy_names = [""] * num_players
-
-    for i in range(num_games):
-        if (i + 1) % 100 == 0:
-            logger.info(f"Completed {i + 1} games...")
-
-        game = Game(num_players=num_players)
+    checkpoint = None
+    if checkpoint_path:
+        checkpoint = Checkpointer(checkpoint_path, checkpoint_interval, resume)
+    reason = None
+    with contextlib.ExitStack() as files:
+        sink = None
+        if output:
+            sink = files.enter_context(SINKS[output_format](output, num_players, seed))
+        recorder = None
+        if replay_output:
+            names = seat_strategies(num_players, strategy1, strategy2)
+            recorder = files.enter_context(ReplayWriter(replay_output, names, seed))
+        if rule is None:
+            stats = run_games(
+                num_games,
+                num_players,
+                strategy1,
+                strategy2,
+                engine,
+                workers,
+                executor,
+                seed,
+                sink,
+                profile,
+                recorder,
+                checkpoint,
+                cache_decisions,
+            )
+        else:
+            stats, reason = run_games_until(
+                rule,
+                num_players,
+                strategy1,
+                strategy2,
+                engine,
+                workers,
+                executor,
+                seed,
+                sink,
+                profile,
+                recorder,
+                checkpoint,
+                cache_decisions,
+            )
 
-        # Set strategies
-        game.set_player_strategy(0, create_strategy(strategy1))
-        if num_players > 1:
-            game.set_player_strategy(1, create_strategy(strategy2))
+    display_results(stats, reason)
+    if sink is not None:
+        display.display_info(f"Results of {sink.num_games} games written to {output}")
+    if recorder is not None:
+        display.display_info(f"Turns of {recorder.num_games} games recorded to {replay_output}")
+    if checkpoint is not None:
+        resumed = checkpoint.resumed_games
+        display.display_info(
+            f"Checkpoint of {stats.num_games} games saved to {checkpoint_path}"
+            + (f" (resumed after {resumed} games)" if resumed else "")
+        )
+    if stats.profile is not None:
+        display_profile(stats.profile)
+    avg_turns = stats.total_turns / stats.num_games
+    logger.info(f"Simulation completed: {stats.num_games} games, avg turns: {avg_turns:.1f}")
 
-        # Store strategy class names for display
-        for idx, player in enumerate(game.players):
-            player_strategy_names[idx] = player.strategy.__class__.__name__
 
-        # Play game
-        winner = game.play_game()
-        winner_index = game.players.index(winner)
-        wins[winner_index] += 1
-        total_turns += game.state.turn_count
+def display_results(stats: SimulationStats, reason: str | None = None) -> None:
+    """Show the wins per seat and the average turns, with intervals for runs that stopped early.
 
-    # Display results
+    Runs with decision caches also show the share of the decisions taken from the caches.
+    """
+    num_games = stats.num_games
     display.display_info(f"\nResults after {num_games} games:")
     display.display_separator(30)
-    for i, win_count in enumerate(wins):
+    for i, win_count in enumerate(stats.wins):
         percentage = (win_count / num_games) * 100
+        line = f"Player {i + 1} ({stats.strategy_names[i]}): {win_count} wins ({percentage:.1f}%)"
+        if reason is not None:
+            low, high = wilson_interval(win_count, num_games)
+            line += f", 95% CI {low * 100:.2f}%-{high * 100:.2f}%"
+        display.display_info(line)
+
+    avg_turns = stats.total_turns / num_games
+    display.display_info(f"\nAverage turns per game: {avg_turns:.1f}")
+    if reason is not None:
+        margin = Z_95 * stats.turn_moments.standard_error
+        display.display_info(f"95% CI of the average turns: +/-{margin:.2f}")
+        display.display_info(f"Stopped after {num_games} games: {reason}")
+    lookups = stats.cache_hits + stats.cache_misses
+    if lookups:
         display.display_info(
-            f"Player {i + 1} ({player_strategy_names[i]}): {win_count} wins ({percentage:.1f}%)"
+            f"Decision cache: {stats.cache_hits} hits of {lookups} decisions"
+            f" ({stats.cache_hits / lookups * 100:.1f}%)"
         )
 
-    avg_turns = total_turns / num_games
-    display.display_info(f"\nAverage turns per game: {avg_turns:.1f}")
-    logger.info(f"Simulation completed: {num_games} games, avg turns: {avg_turns:.1f}")
+
+def display_profile(profiler: Profiler) -> None:
+    """Show the time per phase, the event counts and the decision latencies of a profile."""
+    report = profiler.report()
+    display.display_info("\nProfile (time per phase):")
+    display.display_separator(50)
+    for phase, timing in report["phases"].items():
+        line = f"{phase:<16}{timing['calls']:>12,} calls {timing['mean_ns']:>10,.0f} ns/call"
+        if timing["share"] is not None:
+            line += f" {timing['share'] * 100:5.1f}%"
+        display.display_info(line)
+    display.display_info(
+        "Counts: " + ", ".join(f"{event} {times:,}" for event, times in report["counts"].items())
+    )
+    display.display_info("\nDecision latency per strategy:")
+    display.display_separator(50)
+    for name, latency in report["decisions"].items():
+        display.display_info(
+            f"{name:<24}mean {latency['mean_ns']:,.0f} ns, "
+            + ", ".join(f"p{p} <= {latency[f'p{p}_ns']:,} ns" for p in PERCENTILES)
+        )
+
+
+def replay_game(path: str, game_index: int, every_turn: bool = False, verify: bool = False) -> None:
+    """Show the recorded turns of one game of a replay file and the boards they lead to.
+
+    With ``every_turn``, the boards are shown after every turn instead of at the end only. With
+    ``verify``, the game of the seeded run is played again and compared to the recording.
+    """
+    from opaprikkie_sim.game import Game
+    from opaprikkie_sim.replay import read_replay, verify_game
+
+    replay = read_replay(path)
+    recorded = replay.game(game_index)
+    strategies = replay.header["strategies"]
+    game = Game(len(strategies), headless=True)  # the boards that the turns are replayed on
+    display.display_game_info(
+        f"Game {game_index} of {replay.num_games}: {' vs '.join(strategies)}, "
+        f"{len(recorded.turns)} turns"
+    )
+    display.display_separator()
+
+    turns = recorded.turns
+    for number, (seat, roll, target, moves) in enumerate(
+        zip(
+            turns["seat"].tolist(),
+            turns["roll"].tolist(),
+            turns["target"].tolist(),
+            turns["moves"].tolist(),
+            strict=True,
+        ),
+        start=1,
+    ):
+        player = game.players[seat]
+        display.display_turn_info(number, f"{player.name} ({strategies[seat]})")
+        display.display_dice_roll(roll)
+        if target == 0:
+            display.display_warning(f"{player.name} skipped turn (no_valid_target)")
+        else:
+            if moves > 0:
+                player.board.move_peg(target, moves)
+            display.display_target_selection(target, moves)
+        if every_turn:
+            display.display_board(game.display_boards())
+
+    if not every_turn:
+        display.display_board(game.display_boards())
+    display.display_winner(game.players[recorded.winner].name)
+    if verify:
+        if verify_game(replay, game_index):
+            display.display_success("The seeded game plays the same turns again")
+        else:
+            display.display_error("The seeded game plays different turns than recorded")
+            sys.exit(1)
+
+
+def run_matchups(num_games: int, num_players: int, strategy_names: list[str]) -> None:
+    """Show the win rates of every seat order of the strategies."""
+    from opaprikkie_sim.race import matchups, sample_turns_distribution
+    from opaprikkie_sim.simulation import create_batch_strategy
+
+    display.display_info(f"Sampling {num_games} single-player games per strategy...")
+    distributions = {
+        name: sample_turns_distribution(create_batch_strategy(name), num_games)
+        for name in dict.fromkeys(strategy_names)
+    }
+    display.display_separator(50)
+    for seats, result in matchups(distributions, num_players).items():
+        rates = " / ".join(f"{p * 100:.1f}%" for p in result.win_probabilities)
+        display.display_info(f"{' vs '.join(seats)}: {rates}")
+    logger.info(f"Matchups completed for {len(distributions)} strategies")
+
+
+def run_tournament_table(  # noqa: PLR0913
+    num_games: int,
+    strategy_names: list[str],
+    player_counts: list[int],
+    engine: str = "classic",
+    workers: int | None = None,
+    seed: int | None = None,
+) -> None:
+    """Play a round-robin tournament and show a win-rate matrix per number of players."""
+    from opaprikkie_sim.tournament import run_tournament
+
+    display.display_info(
+        f"Running a tournament of {', '.join(strategy_names)} with {num_games} games per lineup..."
+    )
+    result = run_tournament(num_games, strategy_names, player_counts, engine, workers, seed)
+
+    width = max(len(name) for name in result.strategy_names) + 2
+    for num_players in player_counts:
+        display.display_info(f"\n{num_players} players, win rate of the row against the columns:")
+        display.display_separator(50)
+        display.display_info(
+            " " * width + "".join(f"{name:>{width}}" for name in result.strategy_names)
+        )
+        matrix = result.win_rate_matrix(num_players)
+        for name, row in zip(result.strategy_names, matrix, strict=True):
+            cells = "".join(
+                f"{'-':>{width}}" if rate is None else f"{rate * 100:>{width - 1}.1f}%"
+                for rate in row
+            )
+            display.display_info(f"{name:<{width}}{cells}")
+    logger.info(f"Tournament completed: {len(result.stats)} lineups")
+
+
+def run_comparison(  # noqa: PLR0913
+    num_pairs: int,
+    strategy_a: str,
+    strategy_b: str,
+    opponent: str = "greedy",
+    seed: int | None = None,
+    workers: int | None = None,
+) -> None:
+    """Compare two strategies with paired games and show the difference in win rate."""
+    from opaprikkie_sim.comparison import compare_strategies
+
+    display.display_info(
+        f"Running {num_pairs} pairs of games: {strategy_a} and {strategy_b} vs {opponent}..."
+    )
+    display.display_separator(50)
+
+    stats, seed = compare_strategies(num_pairs, strategy_a, strategy_b, opponent, seed, workers)
+
+    display.display_info(f"\nResults after {num_pairs} pairs (seed {seed}):")
+    display.display_separator(30)
+    for name, wins, rate in zip(stats.strategy_names, stats.wins, stats.win_rates, strict=True):
+        display.display_info(f"{name}: {wins} wins ({rate * 100:.1f}%)")
+    display.display_info(
+        f"\nDifference: {stats.difference * 100:+.2f}% "
+        f"(standard error {stats.standard_error * 100:.2f}%)"
+    )
+    display.display_info(
+        f"Independent games: standard error {stats.independent_standard_error * 100:.2f}%, "
+        f"{stats.variance_reduction:.1f}x as many games for the same confidence"
+    )
+    logger.info(f"Comparison completed: {num_pairs} pairs, difference {stats.difference:.4f}")
+
+
+def run_benchmark_suite(
+    patterns: list[str],
+    quick: bool = False,
+    output: str | None = None,
+    baseline: str | None = None,
+    tolerance: float = BENCH_TOLERANCE,
+) -> bool:
+    """Run the benchmarks, show them next to the baseline and write the JSON report.
+
+    Returns:
+        bool: Whether no benchmark regressed beyond the tolerance
+    """
+    from opaprikkie_sim.benchmark import (
+        benchmark_report,
+        compare_to_baseline,
+        load_report,
+        run_benchmarks,
+        save_report,
+    )
+
+    display.display_info("Running benchmarks...")
+    results = run_benchmarks(patterns, quick)
+    comparisons = {}
+    if baseline:
+        comparisons = {
+            comparison.name: comparison
+            for comparison in compare_to_baseline(results, load_report(baseline), tolerance)
+        }
+
+    display.display_separator(70)
+    for result in results:
+        line = f"{result.name:<36}{result.value:>12.3f} {result.unit}"
+        if result.peak_memory_kib is not None:
+            line += f" peak {result.peak_memory_kib:,.0f} KiB"
+        comparison = comparisons.get(result.name)
+        if comparison is not None:
+            line += (
+                f" ({comparison.change * 100:+.1f}%{' REGRESSION' if comparison.regressed else ''})"
+            )
+        display.display_info(line)
+
+    if output:
+        save_report(benchmark_report(results), output)
+        display.display_info(f"\nReport written to {output}")
+    regressions = [comparison.name for comparison in comparisons.values() if comparison.regressed]
+    if regressions:
+        display.display_error(
+            f"{len(regressions)} benchmarks regressed by more than {tolerance:.0%}: "
+            + ", ".join(regressions)
+        )
+    logger.info(f"Benchmarks completed: {len(results)} run, {len(regressions)} regressed")
+    return not regressions
 
 
 # Click CLI group and commands
 
 
+def check_engine_strategies(engine: str, strategies: Iterable[str], option: str) -> None:
+    """Reject the strategies that the batch and race engines cannot play.
+
+    Raises:
+        click.BadParameter: If a strategy has no batch version and the engine is not classic
+    """
+    unsupported = [name for name in strategies if name not in BATCH_STRATEGIES]
+    if engine != "classic" and unsupported:
+        raise click.BadParameter(
+            f"{', '.join(unsupported)} cannot be played by the {engine} engine, "
+            f"choose from {', '.join(BATCH_STRATEGIES)} or use the classic engine",
+            param_hint=option,
+        )
+
+
+def check_optimal_solution(strategies: Iterable[str], option: str) -> None:
+    """Reject the optimal strategy if its solution can be neither loaded nor solved on first use.
+
+    Raises:
+        click.BadParameter: With the command that stores the solution
+    """
+    if "optimal" not in strategies:
+        return
+    from opaprikkie_sim.solver import check_solution
+
+    try:
+        check_solution()
+    except FileNotFoundError as e:
+        raise click.BadParameter(str(e), param_hint=option) from e
+
+
 @click.group()
 @click.version_option(message="%(version)s")
 def cli() -> None:
@@ -192,20 +570,145 @@ def interactive(players: int) -> None:
     "--strategy1",
     default="random",
     show_default=True,
-    type=click.Choice(["random", "greedy", "smart"]),
+    type=click.Choice(list(STRATEGIES_NAME_MAPPING)),
     help="Strategy for player 1",
 )
 @click.option(
     "--strategy2",
     default="random",
     show_default=True,
-    type=click.Choice(["random", "greedy", "smart"]),
+    type=click.Choice(list(STRATEGIES_NAME_MAPPING)),
     help="Strategy for player 2",
 )
-def simulation(games: int, players: int, strategy1: str, strategy2: str) -> None:
-    """Run multiple simulations and show statistics."""
+@click.option(
+    "--engine",
+    default="classic",
+    show_default=True,
+    type=click.Choice(ENGINES),
+    help="Play games one by one (classic), vectorized in lockstep (batch) "
+    f"or race single-player runs (race), batch and race play {', '.join(BATCH_STRATEGIES)}",
+)
+@click.option("--workers", type=int, help="Number of workers (default: all cores)")
+@click.option(
+    "--executor",
+    default="process",
+    show_default=True,
+    type=click.Choice(EXECUTORS),
+    help="Run the workers as processes, or as threads on free-threaded Python builds",
+)
+@click.option(
+    "--seed",
+    type=click.IntRange(min=0),
+    help="Seed of the run, results do not depend on the number of workers",
+)
+@click.option(
+    "--target-ci",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Stop once the 95% interval of every win rate is at most +/- this wide",
+)
+@click.option("--max-seconds", type=click.FloatRange(min=0), help="Stop after this many seconds")
+@click.option("--max-games", type=click.IntRange(min=1), help="Stop after this many games")
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    help="File to stream the result of every game to",
+)
+@click.option(
+    "--output-format",
+    default="jsonl",
+    show_default=True,
+    type=click.Choice(OUTPUT_FORMATS),
+    help="One JSON object per line, or fixed-width binary records",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Time the phases of every turn and show them at the end (classic engine)",
+)
+@click.option(
+    "--replay",
+    "replay_output",
+    type=click.Path(dir_okay=False),
+    help="File to record the turns of every game to, see the replay command (classic engine)",
+)
+@click.option(
+    "--checkpoint",
+    "checkpoint_path",
+    type=click.Path(dir_okay=False),
+    help="File to save the progress of the run to, to continue it with --resume",
+)
+@click.option(
+    "--checkpoint-every",
+    default=CHECKPOINT_INTERVAL,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Seconds between checkpoints",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue the run from its --checkpoint file, if there is one",
+)
+@click.option(
+    "--cache-decisions",
+    is_flag=True,
+    help="Cache the decisions of the deterministic strategies and show hit rates (classic engine)",
+)
+def simulation(  # noqa: PLR0913
+    games: int,
+    players: int,
+    strategy1: str,
+    strategy2: str,
+    engine: str,
+    workers: int | None,
+    executor: str,
+    seed: int | None,
+    target_ci: float | None,
+    max_seconds: float | None,
+    max_games: int | None,
+    output: str | None,
+    output_format: str,
+    profile: bool,
+    replay_output: str | None,
+    checkpoint_path: str | None,
+    checkpoint_every: float,
+    resume: bool,
+    cache_decisions: bool,
+) -> None:
+    """Run multiple simulations and show statistics.
+
+    With --target-ci, --max-seconds or --max-games, games are played in chunks until the first
+    of these rules is met, and --games is ignored.
+    """
+    if resume and checkpoint_path is None:
+        display.display_error("Error: --resume needs the --checkpoint file of the run")
+        sys.exit(1)
+    for option, strategy in (("--strategy1", strategy1), ("--strategy2", strategy2)):
+        check_engine_strategies(engine, [strategy], option)
+        check_optimal_solution([strategy], option)
+    rule = None
+    if target_ci is not None or max_seconds is not None or max_games is not None:
+        rule = StoppingRule(target_ci, max_seconds, max_games)
     try:
-        run_simulation(games, players, strategy1, strategy2)
+        run_simulation(
+            games,
+            players,
+            strategy1,
+            strategy2,
+            engine,
+            workers,
+            executor,
+            seed,
+            output,
+            output_format,
+            rule,
+            profile,
+            replay_output,
+            checkpoint_path,
+            checkpoint_every,
+            resume,
+            cache_decisions,
+        )
     except KeyboardInterrupt:
         display.display_info("\nGame interrupted by user.")
         logger.info("Game interrupted by user")
@@ -216,5 +719,238 @@ def simulation(games: int, players: int, strategy1: str, strategy2: str) -> None
         sys.exit(1)
 
 
+@cli.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--game", "game_index", default=0, show_default=True, type=int, help="Game to show")
+@click.option("--every-turn", is_flag=True, help="Show the boards after every turn")
+@click.option("--verify", is_flag=True, help="Play the game of a seeded run again and compare")
+def replay(path: str, game_index: int, every_turn: bool, verify: bool) -> None:
+    """Show a game recorded with simulation --replay, turn by turn."""
+    try:
+        replay_game(path, game_index, every_turn, verify)
+    except KeyboardInterrupt:
+        display.display_info("\nReplay interrupted by user.")
+        logger.info("Replay interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        display.display_error(f"Error: {e}")
+        logger.exception("Unexpected error")
+        sys.exit(1)
+
+
+@cli.command("matchups")
+@click.option(
+    "--games",
+    default=100000,
+    show_default=True,
+    type=int,
+    help="Number of single-player games per strategy",
+)
+@click.option("--players", default=2, show_default=True, type=int, help="Number of players")
+@click.option(
+    "--strategy",
+    "strategies",
+    multiple=True,
+    default=["random", "greedy", "smart"],
+    show_default=True,
+    type=click.Choice(BATCH_STRATEGIES),
+    help="Strategy to include, can be repeated",
+)
+def matchups_command(games: int, players: int, strategies: tuple[str, ...]) -> None:
+    """Show the win rates of all seat orders of the strategies."""
+    check_optimal_solution(strategies, "--strategy")
+    try:
+        run_matchups(games, players, list(strategies))
+    except KeyboardInterrupt:
+        display.display_info("\nGame interrupted by user.")
+        logger.info("Game interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        display.display_error(f"Error: {e}")
+        logger.exception("Unexpected error")
+        sys.exit(1)
+
+
+@cli.command()
+@click.option(
+    "--games", default=1000, show_default=True, type=int, help="Number of games per lineup"
+)
+@click.option(
+    "--strategy",
+    "strategies",
+    multiple=True,
+    default=["random", "greedy", "smart"],
+    show_default=True,
+    type=click.Choice(list(STRATEGIES_NAME_MAPPING)),
+    help="Strategy to include, can be repeated",
+)
+@click.option(
+    "--players",
+    "player_counts",
+    multiple=True,
+    default=[2],
+    show_default=True,
+    type=click.IntRange(PVP_MIN_PLAYERS, PVP_MAX_PLAYERS),
+    help="Number of players per game, can be repeated",
+)
+@click.option(
+    "--engine",
+    default="classic",
+    show_default=True,
+    type=click.Choice(LINEUP_ENGINES),
+    help="Play games one by one (classic) or vectorized in lockstep (batch)",
+)
+@click.option("--workers", type=int, help="Number of worker processes (default: all cores)")
+@click.option("--seed", type=click.IntRange(min=0), help="Seed of the run")
+def tournament(  # noqa: PLR0913
+    games: int,
+    strategies: tuple[str, ...],
+    player_counts: tuple[int, ...],
+    engine: str,
+    workers: int | None,
+    seed: int | None,
+) -> None:
+    """Play every seating of the strategies, with at least two of them per game."""
+    check_engine_strategies(engine, strategies, "--strategy")
+    check_optimal_solution(strategies, "--strategy")
+    try:
+        run_tournament_table(games, list(strategies), list(player_counts), engine, workers, seed)
+    except KeyboardInterrupt:
+        display.display_info("\nGame interrupted by user.")
+        logger.info("Game interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        display.display_error(f"Error: {e}")
+        logger.exception("Unexpected error")
+        sys.exit(1)
+
+
+@cli.command()
+@click.option("--games", default=10000, show_default=True, type=int, help="Number of game pairs")
+@click.option(
+    "--strategy-a",
+    default="greedy",
+    show_default=True,
+    type=click.Choice(list(STRATEGIES_NAME_MAPPING)),
+    help="First strategy to compare",
+)
+@click.option(
+    "--strategy-b",
+    default="smart",
+    show_default=True,
+    type=click.Choice(list(STRATEGIES_NAME_MAPPING)),
+    help="Second strategy to compare",
+)
+@click.option(
+    "--opponent",
+    default="greedy",
+    show_default=True,
+    type=click.Choice(list(STRATEGIES_NAME_MAPPING)),
+    help="Strategy of the opponent in all games",
+)
+@click.option("--seed", type=click.IntRange(min=0), help="Seed of the run (default: random)")
+@click.option("--workers", type=int, help="Number of worker processes (default: all cores)")
+def compare(  # noqa: PLR0913
+    games: int,
+    strategy_a: str,
+    strategy_b: str,
+    opponent: str,
+    seed: int | None,
+    workers: int | None,
+) -> None:
+    """Compare two strategies on the same dice with paired games."""
+    for option, strategy in (
+        ("--strategy-a", strategy_a),
+        ("--strategy-b", strategy_b),
+        ("--opponent", opponent),
+    ):
+        check_optimal_solution([strategy], option)
+    try:
+        run_comparison(games, strategy_a, strategy_b, opponent, seed, workers)
+    except KeyboardInterrupt:
+        display.display_info("\nGame interrupted by user.")
+        logger.info("Game interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        display.display_error(f"Error: {e}")
+        logger.exception("Unexpected error")
+        sys.exit(1)
+
+
+@cli.command()
+@click.option(
+    "--row-height", default=MAX_ROW_HEIGHT, show_default=True, type=int, help="Height of the rows"
+)
+@click.option("--workers", type=int, help="Number of worker processes (default: all cores)")
+@click.option(
+    "--output",
+    required=True,
+    type=click.Path(file_okay=False),
+    help="Directory to write the solved tables to",
+)
+@click.option("--no-policy", is_flag=True, help="Only store the expected turns of every board")
+def solve(row_height: int, workers: int | None, output: str, no_policy: bool) -> None:
+    """Solve the single-player game exactly for the optimal strategy."""
+    from opaprikkie_sim import solver
+
+    try:
+        solution = solver.solve(
+            row_height, workers=workers, directory=output, with_policy=not no_policy
+        )
+        display.display_info(f"Expected turns from an empty board: {solution.values[0]:.4f}")
+        display.display_info(f"Tables written to {output}")
+    except KeyboardInterrupt:
+        display.display_info("\nSolver interrupted by user.")
+        logger.info("Solver interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        display.display_error(f"Error: {e}")
+        logger.exception("Unexpected error")
+        sys.exit(1)
+
+
+@cli.command()
+@click.option(
+    "--filter",
+    "patterns",
+    multiple=True,
+    help="Only run benchmarks whose name contains the text, can be repeated",
+)
+@click.option("--quick", is_flag=True, help="Fewer games and repeats, for a smoke test")
+@click.option("--output", type=click.Path(dir_okay=False), help="JSON file to write the report to")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON report of an earlier run to compare to, exits with 1 on a regression",
+)
+@click.option(
+    "--tolerance",
+    default=BENCH_TOLERANCE,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Relative slowdown or memory growth that still passes",
+)
+def bench(
+    patterns: tuple[str, ...],
+    quick: bool,
+    output: str | None,
+    baseline: str | None,
+    tolerance: float,
+) -> None:
+    """Benchmark the hot paths and compare them to a baseline."""
+    try:
+        passed = run_benchmark_suite(list(patterns), quick, output, baseline, tolerance)
+    except KeyboardInterrupt:
+        display.display_info("\nBenchmarks interrupted by user.")
+        logger.info("Benchmarks interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        display.display_error(f"Error: {e}")
+        logger.exception("Unexpected error")
+        sys.exit(1)
+    if not passed:
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     cli(obj={"version": get_version()})
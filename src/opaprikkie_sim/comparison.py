@@ -0,0 +1,154 @@
+"""Paired comparison of two strategies with common random numbers.
+
+Both strategies play the same seeded games against the same opponent. In both games of a pair the
+opponent plays with the same dice and choices, the compared seat gets the same roll to choose a
+target from on every turn, and the n-th turn for a target draws the n-th outcome of that target's
+stream (see ``TargetStreamDiceRoller``). The difference in wins is measured per pair, which cancels
+most of the luck that independent games have to average out: the standard error of the difference
+shrinks, and fewer games give the same confidence.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from opaprikkie_sim.simulation import MIN_PARALLEL_GAMES, create_seeded_game, split_games
+from opaprikkie_sim.utilities import init_logger
+
+logger = init_logger(__name__)
+
+
+@dataclass
+class PairedStats:
+    """Wins of two strategies over pairs of games with common random numbers, mergeable."""
+
+    strategy_names: tuple[str, str]
+    opponent: str
+    num_pairs: int = 0
+    wins: list[int] = field(default_factory=lambda: [0, 0])
+    differing_pairs: int = 0  # pairs won by exactly one of the strategies
+
+    def record(self, win_a: bool, win_b: bool) -> None:
+        """Add the result of one pair of games."""
+        self.num_pairs += 1
+        self.wins[0] += win_a
+        self.wins[1] += win_b
+        self.differing_pairs += win_a != win_b
+
+    def merge(self, other: PairedStats) -> None:
+        """Add the results of another chunk of pairs."""
+        self.num_pairs += other.num_pairs
+        self.wins = [a + b for a, b in zip(self.wins, other.wins, strict=True)]
+        self.differing_pairs += other.differing_pairs
+
+    @property
+    def win_rates(self) -> tuple[float, float]:
+        """Win rate of both strategies against the opponent."""
+        return self.wins[0] / self.num_pairs, self.wins[1] / self.num_pairs
+
+    @property
+    def difference(self) -> float:
+        """Win rate of the first strategy minus that of the second."""
+        rate_a, rate_b = self.win_rates
+        return rate_a - rate_b
+
+    @property
+    def standard_error(self) -> float:
+        """Standard error of the difference, from the per-pair differences."""
+        # the difference of a pair is -1, 0 or 1, so its square is 1 for differing pairs
+        mean_square = self.differing_pairs / self.num_pairs
+        variance = (mean_square - self.difference**2) * self.num_pairs / max(self.num_pairs - 1, 1)
+        return math.sqrt(max(variance, 0.0) / self.num_pairs)
+
+    @property
+    def independent_standard_error(self) -> float:
+        """Standard error of the difference if both win rates came from independent games."""
+        return math.sqrt(sum(rate * (1 - rate) for rate in self.win_rates) / self.num_pairs)
+
+    @property
+    def variance_reduction(self) -> float:
+        """Games that independent runs need for the same standard error, per paired game."""
+        if self.standard_error == 0:
+            return math.inf
+        return (self.independent_standard_error / self.standard_error) ** 2
+
+
+def play_paired_games(  # noqa: PLR0913
+    num_pairs: int,
+    strategy_a: str,
+    strategy_b: str,
+    opponent: str,
+    seed: int,
+    first_pair: int = 0,
+) -> PairedStats:
+    """Play pairs of seeded games, both strategies in the first seat against the opponent.
+
+    Args:
+        num_pairs: Number of pairs of games
+        strategy_a: First strategy to compare
+        strategy_b: Second strategy to compare
+        opponent: Strategy of the second seat in all games
+        seed: Seed of the run, shared by both games of a pair
+        first_pair: Index of the first pair in the run
+    """
+    stats = PairedStats((strategy_a, strategy_b), opponent)
+    for pair in range(first_pair, first_pair + num_pairs):
+        wins = []
+        for strategy in (strategy_a, strategy_b):
+            game = create_seeded_game(
+                seed, pair, [strategy, opponent], target_streams=True, headless=True
+            )
+            winner, _ = game.play_headless()
+            wins.append(winner is game.players[0])
+        stats.record(*wins)
+    return stats
+
+
+def _play_pairs_chunk(args: tuple[int, str, str, str, int, int]) -> PairedStats:
+    return play_paired_games(*args)
+
+
+def compare_strategies(  # noqa: PLR0913
+    num_pairs: int,
+    strategy_a: str,
+    strategy_b: str,
+    opponent: str = "greedy",
+    seed: int | None = None,
+    workers: int | None = None,
+) -> tuple[PairedStats, int]:
+    """Compare the win rates of two strategies against an opponent with paired games.
+
+    Args:
+        num_pairs: Number of pairs of games
+        strategy_a: First strategy to compare
+        strategy_b: Second strategy to compare
+        opponent: Strategy of the second seat in all games
+        seed: Seed of the run (default: a fresh seed, which is returned)
+        workers: Number of worker processes (default: all cores)
+
+    Returns:
+        tuple[PairedStats, int]: Merged statistics of all pairs and the seed of the run
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)  # type: ignore[arg-type]
+    logger.info(f"Comparing {strategy_a} and {strategy_b} against {opponent}, seed {seed}")
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or num_pairs < MIN_PARALLEL_GAMES["classic"]:
+        return play_paired_games(num_pairs, strategy_a, strategy_b, opponent, seed), seed
+
+    chunks = [
+        (size, strategy_a, strategy_b, opponent, seed, start)
+        for start, size in split_games(num_pairs, workers)
+    ]
+    stats = PairedStats((strategy_a, strategy_b), opponent)
+    with ProcessPoolExecutor(workers) as pool:
+        for chunk_stats in pool.map(_play_pairs_chunk, chunks):
+            stats.merge(chunk_stats)
+            logger.info(f"Completed {stats.num_pairs} pairs...")
+    return stats, seed
@@ -8,3 +8,15 @@ MAX_DICE_NUM: int = 6
 
 PVP_MIN_PLAYERS: int = 2
 PVP_MAX_PLAYERS: int = 4
+
+# Names of the CLI choices, kept here so that the CLI starts without importing the engines
+LINEUP_ENGINES: tuple[str, ...] = ("classic", "batch")  # engines that play every game
+ENGINES: tuple[str, ...] = (*LINEUP_ENGINES, "race")
+EXECUTORS: tuple[str, ...] = ("process", "thread")
+OUTPUT_FORMATS: tuple[str, ...] = ("jsonl", "binary")
+# strategies of the batch and race engines, the names of BATCH_STRATEGIES_NAME_MAPPING
+BATCH_STRATEGIES: tuple[str, ...] = ("random", "greedy", "smart", "optimal")
+# Allowed slowdown before a benchmark counts as a regression, above the noise between runs
+BENCH_TOLERANCE: float = 0.2
+# Seconds between the checkpoints of a run
+CHECKPOINT_INTERVAL: float = 60.0
@@ -1,14 +1,49 @@
 """Dice rolling functionality for Opa Prikkie game."""
 
+from __future__ import annotations
+
 import random
-from collections import Counter
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Protocol, TypeVar
 
 from opaprikkie_sim.constants import MAX_DICE_NUM, MAX_ROW_HEIGHT, MIN_DICE_NUM, NUMBER_OF_DICE
+from opaprikkie_sim.roll_table import (
+    count_face,
+    face_count_key,
+    face_values,
+    key_to_face_counts,
+    pairs_for_target,
+    sample_face_key,
+    targets_for_key,
+)
+from opaprikkie_sim.turn_table import get_outcome_table
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    import numpy as np
+
+    from opaprikkie_sim.profiling import Profiler
 
 # Allow randomnumber generators in this context
 # ruff: noqa: S311
 
+_T = TypeVar("_T")
+
+# Faces and uniforms drawn per refill of a BufferedDiceRoller
+DICE_BLOCK_SIZE: int = 65536
+
+
+class RandomSource(Protocol):
+    """Random number generator interface, implemented by ``random.Random`` and the module."""
+
+    def random(self) -> float: ...
+
+    def randint(self, a: int, b: int) -> int: ...
+
+    def choice(self, seq: Sequence[_T]) -> _T: ...
+
 
 @dataclass
 class DiceRoll:
@@ -16,106 +51,137 @@ class DiceRoll:
 
     values: list[int]
     target_number: int | None = None
+    _face_key: int | None = field(default=None, init=False, repr=False, compare=False)
+    _available_targets: dict[int, int] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_face_key(cls, key: int) -> DiceRoll:
+        """Create a roll from its face histogram, see ``roll_table.face_count_key``.
+
+        The ``values`` view lists the dice in ascending order.
+        """
+        roll = cls(values=list(face_values(key)))
+        roll._face_key = key
+        return roll
+
+    @property
+    def face_key(self) -> int:
+        """Face-count key of this roll, equal for all orderings of the same dice."""
+        if self._face_key is None:
+            self._face_key = face_count_key(self.values)
+        return self._face_key
+
+    @property
+    def face_counts(self) -> tuple[int, ...]:
+        """Number of dice showing each face, from 1 to 6."""
+        return key_to_face_counts(self.face_key)
 
     def count_target(self, target: int) -> int:
         """Count how many times the target number appears in this roll."""
+        if self._face_key is not None and MIN_DICE_NUM <= target <= MAX_DICE_NUM:
+            return count_face(self._face_key, target)
         return self.values.count(target)
 
+    def count_combinations(self, target: int) -> int:
+        """Count how many times the target can be formed, each die is used only once."""
+        return self.get_available_targets().get(target, 0)
+
     def get_combinations_for_target(self, target: int) -> list[list[int]]:
         """Get all possible combinations that sum to the target number.
         Each die is used only once per combination and duplicate pairs are avoided.
         """
+        count = self.count_combinations(target)
         if target <= MAX_DICE_NUM:
             # Single dice combinations
-            return [[val] for val in self.values if val == target]
-        else:
-            combinations: list[list[int]] = []
-            used_indices: set[int] = set()
-            n = len(self.values)
-            # To avoid duplicates, always use i < j
-            for i in range(n):
-                if i in used_indices:
-                    continue
-                for j in range(i + 1, n):
-                    if j in used_indices:
-                        continue
-                    if self.values[i] + self.values[j] == target:
-                        combinations.append([self.values[i], self.values[j]])
-                        used_indices.add(i)
-                        used_indices.add(j)
-                        break  # move to next i after finding a pair
-            return combinations
+            return [[target] for _ in range(count)]
+
+        face_counts = self.face_counts
+        combinations: list[list[int]] = []
+        for a, b in pairs_for_target(target):
+            count_a = face_counts[a - MIN_DICE_NUM]
+            count_b = face_counts[b - MIN_DICE_NUM]
+            num_pairs = count_a // 2 if a == b else min(count_a, count_b)
+            combinations.extend([a, b] for _ in range(num_pairs))
+        return combinations
 
     def get_available_targets(self) -> dict[int, int]:
         """Get all possible target numbers and the max number of combinations for each target.
-        Returns a dict[int, int]: {target: count}
-        """
-        result: dict[int, int] = {}
-        # Single dice targets
-        single_counts = Counter(self.values)
-        result = dict(single_counts.items())
-
-        # Double dice targets
-        n = len(self.values)
-
-        # keep track of if a dice is already been used for a specific target
-        # each dice can only be used once for a specific target
-        # dict: key is target, value is list of dice index
-        used_for_target: dict[int, list[int]] = {}
-
-        for i in range(n):
-            for j in range(i + 1, n):
-                total = self.values[i] + self.values[j]
-                if not (MAX_DICE_NUM + 1 <= total <= MAX_DICE_NUM * 2):
-                    continue
-
-                # a dice can only be used once for a specific target
-                # example: we have 6, 1, 1 --> only one 7 can be formed
-                # example 2: we have 5, 5, 5 --> only one 10 can be formed
-                dice_used_for_target = used_for_target.get(total, [])
-                if i in dice_used_for_target or j in dice_used_for_target:
-                    continue
-
-                result[total] = result.get(total, 0) + 1
-                if total not in used_for_target:
-                    used_for_target[total] = [i, j]
-                else:
-                    used_for_target[total].extend([i, j])
+        Returns a dict[int, int]: {target: count}, in ascending order of target.
 
-        return result
+        The targets are looked up by the multiset of rolled faces and cached on the roll,
+        so strategies and the game share a single lookup.
+        """
+        if self._available_targets is None:
+            self._available_targets = dict(targets_for_key(self.face_key))
+        return self._available_targets
 
 
 class DiceRoller:
     """Handles dice rolling for the Opa Prikkie game."""
 
-    def __init__(self, num_dice: int = NUMBER_OF_DICE):
+    def __init__(
+        self,
+        num_dice: int = NUMBER_OF_DICE,
+        use_outcome_table: bool = True,
+        histogram: bool = False,
+        rng: RandomSource | None = None,
+    ):
+        """Initialize the dice roller.
+
+        Args:
+            num_dice: Number of dice rolled at the start of a turn
+            use_outcome_table: Draw turn outcomes from the exact outcome table (default),
+                or play every turn die by die with ``simulate_turn_reference``
+            histogram: Draw every roll as a face histogram with a single random number,
+                instead of rolling the dice one by one. The ``values`` of such rolls are sorted.
+            rng: Generator owned by this roller (default: the shared ``random`` module)
+        """
         self.num_dice = num_dice
+        self.use_outcome_table = use_outcome_table
+        self.histogram = histogram
+        self.rng: RandomSource = rng if rng is not None else random
+        self.profiler: Profiler | None = None  # see ``Game.set_profiler``
 
     def roll(self) -> DiceRoll:
         """Roll all dice and return the result."""
-        values = [random.randint(MIN_DICE_NUM, MAX_DICE_NUM) for _ in range(self.num_dice)]
-        return DiceRoll(values=values)
+        return self.roll_remaining(self.num_dice)
 
     def roll_remaining(self, remaining_dice: int) -> DiceRoll:
         """Roll the remaining dice after some have been set aside."""
-        values = [random.randint(MIN_DICE_NUM, MAX_DICE_NUM) for _ in range(remaining_dice)]
+        if self.histogram:
+            return DiceRoll.from_face_key(sample_face_key(remaining_dice, self.rng.random()))
+        values = [self.rng.randint(MIN_DICE_NUM, MAX_DICE_NUM) for _ in range(remaining_dice)]
         return DiceRoll(values=values)
 
     def simulate_turn(self, target: int) -> int:
         """Simulate a complete turn for a given target number."""
+        if not self.use_outcome_table:
+            return self.simulate_turn_reference(target)
+        if self.profiler:
+            self.profiler.count("table_turns")
+        return get_outcome_table(self.num_dice).sample(target, self.rng.random())
+
+    def simulate_turn_reference(self, target: int) -> int:
+        """Simulate a complete turn for a given target number by rolling die by die."""
         total_count = 0
         available_dice = self.num_dice
+        profiler = self.profiler
 
         while available_dice > 0:
+            start = time.perf_counter_ns() if profiler else 0
             roll = self.roll_remaining(available_dice)
+            if profiler:
+                profiler.lap("turn_rolls", start)
+                profiler.count("rolls")
 
             if target <= MAX_DICE_NUM:
                 # Single dice target
                 count = roll.count_target(target)
             else:
                 # Two dice target
-                combinations = roll.get_combinations_for_target(target)
-                count = len(combinations)
+                count = roll.count_combinations(target)
                 # Each combination uses 2 dice
                 count = min(count, available_dice // 2)
 
@@ -135,5 +201,97 @@ class DiceRoller:
             # If we used all dice, we can roll again
             if available_dice == 0:
                 available_dice = self.num_dice
+                if profiler:
+                    profiler.count("rerolls")
 
         return total_count
+
+
+class BufferedDiceRoller(DiceRoller):
+    """Dice roller that draws faces and uniforms in large blocks from a NumPy generator.
+
+    A block of faces is drawn as one uint8 array and converted to a list once, rolls are slices
+    of that list. Turns sampled from the outcome table and histogram rolls take their uniform
+    draws from a buffer as well. Swap it in with ``Game(dice_roller=BufferedDiceRoller())``.
+    """
+
+    def __init__(
+        self,
+        num_dice: int = NUMBER_OF_DICE,
+        use_outcome_table: bool = True,
+        histogram: bool = False,
+        generator: np.random.Generator | None = None,
+        block_size: int = DICE_BLOCK_SIZE,
+    ):
+        """Initialize the dice roller.
+
+        Args:
+            num_dice: Number of dice rolled at the start of a turn
+            use_outcome_table: Draw turn outcomes from the exact outcome table (default)
+            histogram: Draw every roll as a face histogram, see ``DiceRoller``
+            generator: Generator of the blocks (default: a fresh ``SFC64`` generator)
+            block_size: Number of faces and of uniforms drawn per refill
+        """
+        # NumPy is only imported by the rollers that draw from it, not by every game
+        import numpy as np
+
+        from opaprikkie_sim.rng import GeneratorRandom
+
+        self.generator = generator or np.random.Generator(np.random.SFC64())
+        self.block_size = block_size
+        super().__init__(
+            num_dice, use_outcome_table, histogram, GeneratorRandom(self.generator, block_size)
+        )
+        self._faces: list[int] = []
+        self._next_face = 0
+
+    def roll_remaining(self, remaining_dice: int) -> DiceRoll:
+        """Roll the remaining dice after some have been set aside."""
+        if self.histogram:
+            return super().roll_remaining(remaining_dice)
+        if self._next_face + remaining_dice > len(self._faces):
+            size = max(self.block_size, remaining_dice)
+            faces = self.generator.integers(MIN_DICE_NUM, MAX_DICE_NUM + 1, size, dtype="uint8")
+            self._faces = faces.tolist()
+            self._next_face = 0
+        start = self._next_face
+        self._next_face += remaining_dice
+        return DiceRoll(values=self._faces[start : self._next_face])
+
+
+class TargetStreamDiceRoller(DiceRoller):
+    """Dice roller with its own random stream for the turns of every target.
+
+    The n-th turn for a target always draws from the same place of that target's stream,
+    whatever was chosen before. Two strategies playing with the same streams then get the same
+    outcome whenever they go for the same target: common random numbers for paired comparisons.
+    """
+
+    def __init__(
+        self,
+        rng: RandomSource,
+        target_rng: Callable[[int], RandomSource],
+        num_dice: int = NUMBER_OF_DICE,
+        use_outcome_table: bool = True,
+    ):
+        """Initialize the dice roller.
+
+        Args:
+            rng: Generator of the rolls that the strategy chooses a target from
+            target_rng: Creates the generator of the turns for a target, on first use
+            num_dice: Number of dice rolled at the start of a turn
+            use_outcome_table: Draw turn outcomes from the exact outcome table (default)
+        """
+        super().__init__(num_dice, use_outcome_table, rng=rng)
+        self.target_rng = target_rng
+        self._target_rollers: dict[int, DiceRoller] = {}
+
+    def simulate_turn(self, target: int) -> int:
+        """Simulate a complete turn for a given target number, from the stream of the target."""
+        if target not in self._target_rollers:
+            self._target_rollers[target] = DiceRoller(
+                self.num_dice, self.use_outcome_table, rng=self.target_rng(target)
+            )
+        roller = self._target_rollers[target]
+        roller.profiler = self.profiler
+        return roller.simulate_turn(target)
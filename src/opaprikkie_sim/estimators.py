@@ -0,0 +1,114 @@
+"""Streaming estimators and stopping rules for runs that play until their results are precise.
+
+The turn counts are summarized by their mean and variance, built from the turn histogram of a
+run or kept with Welford's running update and merged with the parallel update of Chan et al. The
+win rate of every seat gets a Wilson score interval, which stays inside [0, 1] and is reliable
+for rates close to 0 or 1 and for small runs.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+# Normal quantile of a two-sided 95% interval
+Z_95: float = 1.959963984540054
+
+
+@dataclass
+class RunningMoments:
+    """Welford's running count, mean and sum of squared deviations."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: RunningMoments) -> None:
+        """Add the observations of another summary."""
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+
+    @classmethod
+    def from_histogram(cls, histogram: list[int]) -> RunningMoments:
+        """Summary of the observations of a histogram, where element ``n`` counts value ``n``."""
+        count = sum(histogram)
+        if count == 0:
+            return cls()
+        mean = sum(value * games for value, games in enumerate(histogram)) / count
+        m2 = sum(games * (value - mean) ** 2 for value, games in enumerate(histogram))
+        return cls(count, mean, m2)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        """Standard error of the mean."""
+        return math.sqrt(self.variance / self.count) if self.count else math.inf
+
+
+def wilson_interval(successes: int, trials: int, z: float = Z_95) -> tuple[float, float]:
+    """Wilson score interval of a binomial proportion.
+
+    Args:
+        successes: Number of successes
+        trials: Number of trials
+        z: Normal quantile of the confidence level (default: 95%)
+
+    Returns:
+        tuple[float, float]: Lower and upper bound, (0, 1) without trials
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z**2 / trials
+    center = (rate + z**2 / (2 * trials)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / trials + z**2 / (4 * trials**2)) / denominator
+    return max(center - half_width, 0.0), min(center + half_width, 1.0)
+
+
+@dataclass
+class StoppingRule:
+    """When a run has played enough games, checked after every chunk."""
+
+    target_ci: float | None = None  # half-width of the 95% interval of every seat's win rate
+    max_seconds: float | None = None
+    max_games: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.target_ci is None and self.max_seconds is None and self.max_games is None:
+            raise ValueError("A stopping rule needs a target interval, a time or a game budget")
+
+    def reason(self, wins: list[int], num_games: int, elapsed: float) -> str | None:
+        """Why the run should stop now, or ``None`` to keep playing.
+
+        Args:
+            wins: Wins per seat so far
+            num_games: Games played so far
+            elapsed: Seconds since the start of the run
+        """
+        if self.target_ci is not None and num_games > 0:
+            widest = max(
+                (high - low) / 2 for low, high in (wilson_interval(w, num_games) for w in wins)
+            )
+            if widest <= self.target_ci:
+                return f"confidence interval of +/-{widest:.4f} reached"
+        if self.max_games is not None and num_games >= self.max_games:
+            return f"maximum of {self.max_games} games played"
+        if self.max_seconds is not None and elapsed >= self.max_seconds:
+            return f"time budget of {self.max_seconds:g} s used"
+        return None
@@ -0,0 +1,258 @@
+"""Exact evaluation of single-player strategies: the distribution of the turns to finish.
+
+For a deterministic strategy the boards of one player form a Markov chain: the strategy's choice
+only depends on the board and the multiset of rolled faces, and the moves of a turn only depend
+on the chosen target. Probability mass is pushed forward from the empty board, layer by layer
+of total progress, so every board is handled once. Turns without progress keep the mass on its
+board, which is a geometric delay before it moves on to the next layers.
+
+Next to the probability of every number of turns up to a cutoff, the exact mean and variance
+are tracked as moments of the arrival time at every board, so they do not suffer from the
+cutoff. Boards are stored per layer and released once handled, but the number of boards grows
+as ``(row_height + 1) ** 12``: a complete distribution is quick up to a row height of 2.
+"""
+
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from opaprikkie_sim.batch import BatchStrategy, StrategyAdapter
+from opaprikkie_sim.constants import MAX_ROW_HEIGHT, MIN_DICE_NUM, NUMBER_OF_DICE
+from opaprikkie_sim.roll_table import multiset_probabilities, targets_for_key
+from opaprikkie_sim.solver import (
+    MAX_ON_DEMAND_STATES,
+    NUM_TARGETS,
+    BoardLayers,
+    move_probabilities,
+    num_states,
+)
+from opaprikkie_sim.utilities import init_logger
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from opaprikkie_sim.strategy import Strategy
+
+logger = init_logger(__name__)
+
+DEFAULT_MAX_TURNS: int = 200
+
+# Boards per strategy call, every board is asked for all 462 rolls at once
+_CHUNK_BOARDS: int = 2048
+
+
+@dataclass
+class PolicyEvaluation:
+    """Exact distribution of the number of turns a strategy needs to finish its board."""
+
+    row_height: int
+    pmf: npt.NDArray[np.float64]  # pmf[n] = P(T = n) for n up to the cutoff
+    mean: float
+    variance: float
+
+    @property
+    def max_turns(self) -> int:
+        """Cutoff of the distribution."""
+        return self.pmf.size - 1
+
+    @property
+    def tail(self) -> float:
+        """Probability of needing more turns than the cutoff."""
+        return max(0.0, 1.0 - float(self.pmf.sum()))
+
+    def cdf(self) -> npt.NDArray[np.float64]:
+        """P(T <= n) for n up to the cutoff."""
+        return np.minimum(np.cumsum(self.pmf), 1.0)
+
+    def survival(self) -> npt.NDArray[np.float64]:
+        """P(T > n) for n up to the cutoff."""
+        return np.maximum(1.0 - np.cumsum(self.pmf), 0.0)
+
+
+@functools.cache
+def _roll_table(num_dice: int) -> tuple[npt.NDArray[np.int8], npt.NDArray[np.float64]]:
+    """Target counts and probability of every multiset roll of the dice."""
+    probabilities = multiset_probabilities(num_dice)
+    counts = np.zeros((len(probabilities), NUM_TARGETS), dtype=np.int8)
+    for row, key in enumerate(probabilities):
+        for target, count in targets_for_key(key).items():
+            counts[row, target - MIN_DICE_NUM] = count
+    return counts, np.array(list(probabilities.values()))
+
+
+def choice_probabilities(
+    strategy: BatchStrategy, positions: npt.NDArray[np.int8], num_dice: int = NUMBER_OF_DICE
+) -> npt.NDArray[np.float64]:
+    """Probability that the strategy saves for every target, over all rolls of the dice.
+
+    Returns:
+        ``(boards, 13)`` array, column 0 is skipping the turn and column ``t`` is target ``t``.
+    """
+    counts, probabilities = _roll_table(num_dice)
+    num_boards, num_rolls = positions.shape[0], counts.shape[0]
+    # deterministic strategies do not use the generator
+    choice = strategy.choose_targets(
+        np.repeat(positions, num_rolls, axis=0),
+        np.tile(counts, (num_boards, 1)),
+        np.random.default_rng(0),
+    ).reshape(num_boards, num_rolls)
+
+    cells = np.arange(num_boards)[:, None] * (NUM_TARGETS + 1) + choice
+    weights = np.broadcast_to(probabilities, choice.shape)
+    return np.bincount(
+        cells.ravel(), weights=weights.ravel(), minlength=num_boards * (NUM_TARGETS + 1)
+    ).reshape(num_boards, NUM_TARGETS + 1)
+
+
+@dataclass
+class _Layer:
+    """Arrival distribution and moments of the boards of one layer."""
+
+    index: npt.NDArray[np.int64]  # sorted board indices
+    arrival: npt.NDArray[np.float64]  # (boards, turns) P(arriving at the board after turn n)
+    moments: npt.NDArray[np.float64]  # (boards, 3) E[1], E[N], E[N**2] of the arrival turn N
+
+
+class _ForwardPass:
+    """Pushes the probability mass of one player's board forward, layer by layer."""
+
+    def __init__(self, strategy: BatchStrategy, row_height: int, max_turns: int, num_dice: int):
+        self.strategy = strategy
+        self.row_height = row_height
+        self.num_turns = max_turns + 1
+        self.num_dice = num_dice
+        self.board_layers = BoardLayers(row_height)
+        # probability of exactly d moves, and of at least d moves (which reach the top of a peg)
+        moves = move_probabilities(num_dice)
+        padded = np.zeros((max(moves.shape[0], row_height + 1), NUM_TARGETS))
+        padded[: moves.shape[0]] = moves
+        self.moves = padded
+        self.at_least = np.cumsum(padded[::-1], axis=0)[::-1]
+        self.layers: dict[int, _Layer] = {}
+
+    def get_layer(self, progress: int) -> _Layer:
+        if progress not in self.layers:
+            index = self.board_layers.layer(progress)
+            arrival = np.zeros((index.size, self.num_turns))
+            self.layers[progress] = _Layer(index, arrival, np.zeros((index.size, 3)))
+        return self.layers[progress]
+
+    def step_probabilities(
+        self, positions: npt.NDArray[np.int64], choice: npt.NDArray[np.float64]
+    ) -> list[npt.NDArray[np.float64]]:
+        """Probability to move every peg up by d positions, for d = 1 .. row height."""
+        remaining = self.row_height - positions
+        steps = []
+        for d in range(1, self.row_height + 1):
+            p_move = np.where(
+                d < remaining, self.moves[d], np.where(d == remaining, self.at_least[d], 0.0)
+            )
+            steps.append(choice[:, 1:] * p_move)
+        return steps
+
+    def push(self, progress: int, layer: _Layer, rows: slice) -> None:
+        """Move the mass of some boards of a layer to the boards they lead to."""
+        reached = layer.moments[rows, 0] > 0
+        if not reached.any():
+            return
+        index = layer.index[rows][reached]
+        positions = self.board_layers.positions(index)
+        choice = choice_probabilities(self.strategy, positions.astype(np.int8), self.num_dice)
+        steps = self.step_probabilities(positions, choice)
+        leave = np.sum([step.sum(axis=1) for step in steps], axis=0)
+        if np.any(leave <= 0):
+            stuck = positions[np.argmax(leave <= 0)].tolist()
+            raise ValueError(f"Strategy never makes progress on the board {stuck}")
+        stay = 1.0 - leave
+
+        # mass waiting on the board after every turn, it leaves with the next turn
+        arrival = layer.arrival[rows][reached]
+        waiting = np.empty_like(arrival)
+        waiting[:, 0] = arrival[:, 0]
+        for turn in range(1, self.num_turns):
+            waiting[:, turn] = arrival[:, turn] + stay * waiting[:, turn - 1]
+
+        # moments of the turn the board is left, a geometric delay after arriving
+        delay = 1.0 / leave
+        delay_squared = (1.0 + stay) / leave**2
+        m0, m1, m2 = layer.moments[rows][reached].T
+        departure = (
+            np.stack([m0, m1 + m0 * delay, m2 + 2 * m1 * delay + m0 * delay_squared], axis=1)
+            / leave[:, None]
+        )
+
+        for d, step in enumerate(steps, start=1):
+            for column in np.nonzero(step.any(axis=0))[0]:
+                successor = self.get_layer(progress + d)
+                moving = step[:, column] > 0
+                target_rows = np.searchsorted(
+                    successor.index, index[moving] + d * self.board_layers.powers[column]
+                )
+                # one offset of one peg maps distinct boards to distinct successors
+                p = step[moving, column, None]
+                successor.arrival[target_rows, 1:] += p * waiting[moving, :-1]
+                successor.moments[target_rows] += p * departure[moving]
+
+    def run(self) -> PolicyEvaluation:
+        start = self.get_layer(0)
+        start.arrival[0, 0] = 1.0
+        start.moments[0, 0] = 1.0
+
+        last = self.board_layers.num_layers - 1
+        for progress in range(last):
+            layer = self.layers.pop(progress)
+            for first in range(0, layer.index.size, _CHUNK_BOARDS):
+                self.push(progress, layer, slice(first, first + _CHUNK_BOARDS))
+            logger.debug(f"Evaluated layer {progress}")
+
+        finished = self.layers.pop(last)
+        m0, m1, m2 = finished.moments[0]
+        mean = m1 / m0
+        return PolicyEvaluation(
+            row_height=self.row_height,
+            pmf=finished.arrival[0],
+            mean=float(mean),
+            variance=float(m2 / m0 - mean**2),
+        )
+
+
+def evaluate_policy(
+    strategy: Strategy | BatchStrategy,
+    row_height: int = MAX_ROW_HEIGHT,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    num_dice: int = NUMBER_OF_DICE,
+    max_states: int = MAX_ON_DEMAND_STATES,
+) -> PolicyEvaluation:
+    """Compute the exact distribution of the turns a deterministic strategy needs to finish.
+
+    Args:
+        strategy: Batch strategy, classic strategies are asked board by board
+        row_height: Height of the board rows
+        max_turns: Cutoff of the probability mass function
+        num_dice: Number of dice of a roll
+        max_states: Largest number of boards to evaluate, the full game has about 2.2 billion
+
+    Returns:
+        PolicyEvaluation: Distribution, mean and variance of the number of turns
+
+    Raises:
+        ValueError: If the game has more than ``max_states`` boards, or if the strategy can get
+            stuck on a board that is not finished.
+    """
+    if num_states(row_height) > max_states:
+        raise ValueError(
+            f"Row height {row_height} has {num_states(row_height)} boards, more than "
+            f"{max_states}: pass a smaller row height or a larger max_states"
+        )
+    if not isinstance(strategy, BatchStrategy):
+        strategy = StrategyAdapter(strategy, row_height)
+    elif strategy.row_height != row_height:
+        raise ValueError(f"Strategy plays row height {strategy.row_height}, not {row_height}")
+
+    evaluation = _ForwardPass(strategy, row_height, max_turns, num_dice).run()
+    logger.info(f"Expected turns with {strategy.__class__.__name__}: {evaluation.mean:.4f}")
+    return evaluation
@@ -0,0 +1,264 @@
+"""Depth-limited expectimax search over the boards of all players, see ``ExpectimaxStrategy``.
+
+A turn of the search is a chance node over the rolls, the decision of the player to move and a
+chance node over the moves of the turn:
+
+- the multisets of the dice are grouped by the targets they offer on the board of the mover, so
+  a roll node has one child per distinct set of valid targets, weighted by its probability;
+- the moves of a turn follow ``turn_outcome_distribution``, capped at the steps the peg has left.
+
+The searching player maximizes its probability to win, the opponents minimize it. Without
+opponents, the player maximizes minus its turns to finish instead: every turn costs one.
+
+Boards are packed integers with three bits per peg, as ``PackedBoard.key``, held in one list for
+the whole search: a move adds to the key of the mover and is undone by subtracting it again, so no
+board is ever copied. Roll nodes are stored in a transposition table keyed by the packed boards,
+the mover and the turns left to search.
+
+Beyond the last turn of the search, a leaf estimates the turns every board still needs from its
+open pegs and turns the differences into a win probability with a normal approximation of the
+race, or scores minus the estimate of a player alone. The search deepens one turn at a time and
+stops when the node budget is spent: the decision of the last completed depth is played.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+from opaprikkie_sim.constants import MAX_DICE_NUM, MIN_DICE_NUM, NUMBER_OF_DICE
+from opaprikkie_sim.roll_table import multiset_probabilities, targets_for_key
+from opaprikkie_sim.turn_table import turn_outcome_distribution
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from opaprikkie_sim.board import Board
+
+NUM_TARGETS: int = 2 * MAX_DICE_NUM
+BITS_PER_PEG: int = 3
+# Bits of a packed board in the key of a game state
+_BOARD_BITS: int = BITS_PER_PEG * NUM_TARGETS
+# Leaf estimate of the turns a board needs, fitted to greedy play from random boards:
+# the spread of the steps left over the pegs, and the peg that is slowest to finish on its own
+_SPREAD_WEIGHT: float = 1.25
+_BOTTLENECK_WEIGHT: float = 0.6
+# Variance of the turns a board needs, per turn it needs, fitted to the same games
+_TURN_VARIANCE_RATIO: float = 6.0
+
+
+class _BudgetSpentError(Exception):
+    """The node budget of a decision is spent."""
+
+
+def pack_board(board: Board) -> int:
+    """Positions of any board as ``PackedBoard.key``, pegs that are not on the board at the top."""
+    key = 0
+    for number in range(MIN_DICE_NUM, NUM_TARGETS + 1):
+        peg = board.get_peg(number)
+        position = board.row_height if peg is None else min(peg.position, board.row_height)
+        key |= position << (BITS_PER_PEG * (number - MIN_DICE_NUM))
+    return key
+
+
+class ExpectimaxSearch:
+    """Search state of one player: the packed boards, the tables and the node counters."""
+
+    def __init__(
+        self,
+        row_height: int,
+        max_depth: int,
+        node_budget: int,
+        table_entries: int,
+        num_dice: int = NUMBER_OF_DICE,
+    ):
+        """Precompute the roll and move distributions of the game.
+
+        Args:
+            row_height: Row height of the boards
+            max_depth: Turns to search at most, the decision of the player included
+            node_budget: Roll nodes and leaves per decision, the first turn is always searched
+            table_entries: Entries of the transposition table, which is cleared when full
+            num_dice: Number of dice
+        """
+        self.row_height = row_height
+        self.max_depth = max_depth
+        self.node_budget = node_budget
+        self.table_entries = table_entries
+        self.nodes = 0
+        self.table_hits = 0
+        self.table: dict[int, float] = {}
+        self._limit = math.inf
+        self._keys: list[int] = []
+        self._open: list[int] = []
+        self._solo = False
+        self._roll_masks: dict[int, float] = {}
+        for key, probability in multiset_probabilities(num_dice).items():
+            mask = sum(1 << (target - MIN_DICE_NUM) for target in targets_for_key(key))
+            self._roll_masks[mask] = self._roll_masks.get(mask, 0.0) + probability
+        self._groups: dict[int, list[tuple[int, float]]] = {}
+        self._estimates: dict[int, float] = {}
+
+        # outcomes[target][steps left] lists the moves of a turn that move, and their chance
+        self._stay: list[float] = [0.0]
+        self._outcomes: list[list[list[tuple[int, float]]]] = [[]]
+        rates, finish_rates = [], []
+        for target in range(MIN_DICE_NUM, NUM_TARGETS + 1):
+            distribution = [float(p) for p in turn_outcome_distribution(target, num_dice)]
+            self._stay.append(distribution[0])
+            self._outcomes.append(
+                [
+                    [(moves, distribution[moves]) for moves in range(1, left)]
+                    + [(left, sum(distribution[left:]))]
+                    for left in range(row_height + 1)
+                ]
+            )
+            rate = sum(moves * p for moves, p in enumerate(distribution))
+            bit = 1 << (target - MIN_DICE_NUM)
+            rolled = sum(p for mask, p in self._roll_masks.items() if mask & bit)
+            rates.append(rate)
+            finish_rates.append(rate * rolled)
+        self._rates = rates
+        self._finish_rates = finish_rates
+
+    def choose_target(self, boards: Sequence[Board], targets: list[int]) -> int:
+        """Target of the first board, the player to move, with the best chance to win.
+
+        Args:
+            boards: Board of the player, then the boards of the opponents in order of play
+            targets: Valid targets of the roll of the player
+        """
+        self._keys = [pack_board(board) for board in boards]
+        self._solo = len(self._keys) == 1
+        self._open = [self._open_mask(key) for key in self._keys]
+        keys, open_masks = list(self._keys), list(self._open)
+        valid = sum(1 << (target - MIN_DICE_NUM) for target in targets)
+        self.nodes = 0
+        self._limit = math.inf
+        best = targets[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                _, best = self._decide(0, valid, depth)
+            except _BudgetSpentError:
+                # the moves of the stopped search are still on the boards
+                self._keys, self._open = keys, open_masks
+                break
+            self._limit = self.node_budget
+        return best
+
+    def _open_mask(self, key: int) -> int:
+        """Pegs of a packed board that are not at the top."""
+        mask = 0
+        for peg in range(NUM_TARGETS):
+            if (key >> (BITS_PER_PEG * peg)) & 7 < self.row_height:
+                mask |= 1 << peg
+        return mask
+
+    def _roll_groups(self, open_mask: int) -> list[tuple[int, float]]:
+        """Valid targets of the rolls on a board with these open pegs, and their chance."""
+        groups = self._groups.get(open_mask)
+        if groups is None:
+            merged: dict[int, float] = {}
+            for mask, probability in self._roll_masks.items():
+                merged[mask & open_mask] = merged.get(mask & open_mask, 0.0) + probability
+            groups = self._groups[open_mask] = list(merged.items())
+        return groups
+
+    def _turn(self, mover: int, depth: int) -> float:
+        """Chance to win before the roll of ``mover``, with ``depth`` turns left to search."""
+        if depth == 0:
+            return self._leaf(mover)
+        keys = self._keys
+        state = mover | depth << 2
+        for key in keys:
+            state = state << _BOARD_BITS | key
+        value = self.table.get(state)
+        if value is not None:
+            self.table_hits += 1
+            return value
+
+        self._count()
+        value = 0.0
+        for valid, probability in self._roll_groups(self._open[mover]):
+            value += probability * self._decide(mover, valid, depth)[0]
+        if self._solo:
+            value -= 1.0
+        if len(self.table) >= self.table_entries:
+            self.table.clear()
+        self.table[state] = value
+        return value
+
+    def _decide(self, mover: int, valid: int, depth: int) -> tuple[float, int]:
+        """Best chance and target of ``mover`` for the valid targets of its roll."""
+        if not valid:
+            return self._turn((mover + 1) % len(self._keys), depth - 1), 0
+        best_value, best_target = 0.0, 0
+        maximize = mover == 0
+        for target in range(MIN_DICE_NUM, NUM_TARGETS + 1):
+            if not valid >> (target - MIN_DICE_NUM) & 1:
+                continue
+            value = self._move(mover, target, depth)
+            if not best_target or (value > best_value if maximize else value < best_value):
+                best_value, best_target = value, target
+        return best_value, best_target
+
+    def _move(self, mover: int, target: int, depth: int) -> float:
+        """Chance to win after ``mover`` saves for the target, over the moves of the turn."""
+        keys, open_masks = self._keys, self._open
+        following = (mover + 1) % len(keys)
+        shift = BITS_PER_PEG * (target - MIN_DICE_NUM)
+        left = self.row_height - ((keys[mover] >> shift) & 7)
+        value = self._stay[target] * self._turn(following, depth - 1)
+        for moves, probability in self._outcomes[target][left]:
+            # make the move, search, unmake it
+            keys[mover] += moves << shift
+            if moves == left:
+                open_masks[mover] ^= 1 << (target - MIN_DICE_NUM)
+            if open_masks[mover]:
+                value += probability * self._turn(following, depth - 1)
+            elif mover == 0 and not self._solo:
+                value += probability
+            if moves == left:
+                open_masks[mover] ^= 1 << (target - MIN_DICE_NUM)
+            keys[mover] -= moves << shift
+        return value
+
+    def _leaf(self, mover: int) -> float:
+        """Normal approximation of the race between the estimated turns of the boards.
+
+        Without opponents: minus the estimated turns of the board of the player.
+        """
+        self._count()
+        keys = self._keys
+        players = len(keys)
+        mine = self._estimate(keys[0])
+        if self._solo:
+            return -mine
+        # the player moves before the opponents that come after it counting from the mover
+        my_order = -mover % players
+        chance = 1.0
+        for opponent in range(1, players):
+            theirs = self._estimate(keys[opponent])
+            lead = theirs - mine + (0.5 if my_order < (opponent - mover) % players else -0.5)
+            spread = math.sqrt(_TURN_VARIANCE_RATIO * (mine + theirs) + 1.0)
+            chance *= 0.5 * math.erfc(-lead / (spread * math.sqrt(2)))
+        return chance
+
+    def _estimate(self, key: int) -> float:
+        """Estimated turns a packed board needs to finish."""
+        estimate = self._estimates.get(key)
+        if estimate is None:
+            spread = bottleneck = 0.0
+            for peg in range(NUM_TARGETS):
+                left = self.row_height - ((key >> (BITS_PER_PEG * peg)) & 7)
+                if left > 0:
+                    spread += left / self._rates[peg]
+                    bottleneck = max(bottleneck, left / self._finish_rates[peg])
+            estimate = _SPREAD_WEIGHT * spread + _BOTTLENECK_WEIGHT * bottleneck
+            self._estimates[key] = estimate
+        return estimate
+
+    def _count(self) -> None:
+        self.nodes += 1
+        if self.nodes > self._limit:
+            raise _BudgetSpentError
@@ -1,11 +1,16 @@
 """Main game logic for Opa Prikkie."""
 
+import logging
+import time
+from collections.abc import Callable
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Any
 
 from opaprikkie_sim.board import Board
-from opaprikkie_sim.dice import DiceRoller
-from opaprikkie_sim.strategy import RandomStrategy, Strategy
+from opaprikkie_sim.dice import DiceRoll, DiceRoller
+from opaprikkie_sim.profiling import Profiler
+from opaprikkie_sim.strategy import OpponentAwareStrategy, RandomStrategy, Strategy
 from opaprikkie_sim.utilities import init_logger
 
 logger = init_logger(__name__)
@@ -18,6 +23,7 @@ class Player:
     name: str
     board: Board = field(default_factory=Board)
     strategy: Strategy | None = None
+    dice_roller: DiceRoller | None = None  # own dice of this player, instead of the game's
 
     def is_winner(self) -> bool:
         """Check if this player has won the game."""
@@ -48,58 +54,108 @@ class GameState:
 class Game:
     """Main game class that manages the Opa Prikkie game."""
 
-    def __init__(self, num_players: int = 2, dice_roller: DiceRoller | None = None):
+    def __init__(
+        self,
+        num_players: int = 2,
+        dice_roller: DiceRoller | None = None,
+        board_factory: Callable[[], Board] = Board,
+        logger: logging.Logger | None = None,
+        headless: bool = False,
+    ):
+        """Initialize the game.
+
+        Args:
+            num_players: Number of players
+            dice_roller: Dice roller shared by all players (default: DiceRoller())
+            board_factory: Creates the board of every player, e.g. ``PackedBoard``
+            logger: Logger of this game (default: the module logger), e.g. one per worker
+            headless: Log nothing when setting up the game, for games that are played with
+                ``play_headless``
+        """
+        self.headless = headless
+        self.logger = logger or logging.getLogger(__name__)
         self.dice_roller = dice_roller or DiceRoller()
-        self.players = [Player(f"Player {i + 1}") for i in range(num_players)]
+        self.board_factory = board_factory
+        self.players = [Player(f"Player {i + 1}", board_factory()) for i in range(num_players)]
         self.state = GameState(players=self.players)
+        self.profiler: Profiler | None = None
+        # records of the turns, see ``replay.TURN_DTYPE``, for games that are recorded only
+        self.turn_log: bytearray | None = None
 
         # Assign random strategy to all players by default
         for player in self.players:
             player.strategy = RandomStrategy()
 
-        logger.info(f"Game initialized with {num_players} players")
+        if not headless:
+            self.logger.info(f"Game initialized with {num_players} players")
 
     def set_player_strategy(self, player_index: int, strategy: Strategy) -> None:
         """Set the strategy for a specific player."""
         if 0 <= player_index < len(self.players):
             self.players[player_index].strategy = strategy
-            logger.debug(f"Player {player_index + 1} strategy set to {strategy.__class__.__name__}")
+            if not self.headless:
+                self.logger.debug(
+                    f"Player {player_index + 1} strategy set to {strategy.__class__.__name__}"
+                )
+
+    def set_profiler(self, profiler: Profiler | None) -> None:
+        """Time the phases of every turn with the profiler, or stop profiling with ``None``.
+
+        The profiler is attached to the dice of the game and of every player as well.
+        """
+        self.profiler = profiler
+        self.dice_roller.profiler = profiler
+        for player in self.players:
+            if player.dice_roller is not None:
+                player.dice_roller.profiler = profiler
 
     def play_turn(self) -> dict[str, Any]:
         """Play a single turn for the current player."""
         if self.state.game_over:
             return {"status": "game_over", "winner": self.state.winner}
 
+        profiler = self.profiler
+        start = time.perf_counter_ns() if profiler else 0
         current_player = self.state.get_current_player()
-        roll = self.dice_roller.roll()
-        logger.debug(f"Player {current_player.name} rolled: {roll.values}")
+        dice_roller = current_player.dice_roller or self.dice_roller
+        roll = dice_roller.roll()
+        self.logger.debug(f"Player {current_player.name} rolled: {roll.values}")
+        if profiler:
+            profiler.count("turns")
+            start = profiler.lap("roll", start)
 
         # Choose target using player's strategy
-        target = None
-        if current_player.strategy:
-            target = current_player.strategy.choose_target(current_player.board, roll)
-            logger.debug(f"Player {current_player.name} chose target: {target}")
+        target = self._choose_target(current_player, roll, start)
 
         if target is None:
             # No valid target found, skip turn
-            logger.info(f"Player {current_player.name} skipped turn - no valid target")
+            self.logger.info(f"Player {current_player.name} skipped turn - no valid target")
+            self._record_turn(roll, 0, 0)
             self.state.next_player()
             return {"status": "skipped", "player": current_player.name, "reason": "no_valid_target"}
 
         # Simulate the turn for the chosen target
-        moves = self._simulate_turn_for_target(target)
-        logger.debug(f"Player {current_player.name} made {moves} moves for target {target}")
+        start = time.perf_counter_ns() if profiler else 0
+        moves = self._simulate_turn_for_target(target, dice_roller)
+        self.logger.debug(f"Player {current_player.name} made {moves} moves for target {target}")
+        if profiler:
+            start = profiler.lap("simulate_turn", start)
 
         # Apply moves to the board
         if moves > 0:
             current_player.board.move_peg(target, moves)
-            logger.info(f"Player {current_player.name} moved peg {target} by {moves} positions")
+            self.logger.info(
+                f"Player {current_player.name} moved peg {target} by {moves} positions"
+            )
+        if profiler:
+            profiler.lap("board_update", start)
+        self._record_turn(roll, target, moves)
 
         # Check if player won
         if current_player.is_winner():
             self.state.game_over = True
             self.state.winner = current_player
-            logger.info(f"Player {current_player.name} won the game!")
+            self.logger.info(f"Player {current_player.name} won the game!")
             return {
                 "status": "winner",
                 "player": current_player.name,
@@ -118,21 +174,104 @@ class Game:
             "roll": roll.values,
         }
 
-    def _simulate_turn_for_target(self, target: int) -> int:
+    def _choose_target(self, player: Player, roll: DiceRoll, start: int) -> int | None:
+        """Target chosen by the strategy of the player, ``None`` to skip the turn."""
+        if not player.strategy:
+            return None
+        if isinstance(player.strategy, OpponentAwareStrategy):
+            opponents = self.opponent_boards(self.state.current_player_index)
+            target = player.strategy.choose_target_against(player.board, roll, opponents)
+        else:
+            target = player.strategy.choose_target(player.board, roll)
+        self.logger.debug(f"Player {player.name} chose target: {target}")
+        if self.profiler:
+            self.profiler.lap_decision(player.strategy.__class__.__name__, start)
+            if target is None:
+                self.profiler.count("skipped_turns")
+        return target
+
+    def opponent_boards(self, player_index: int) -> list[Board]:
+        """Boards of the opponents of a player, in the order in which they play after it."""
+        count = len(self.players)
+        return [self.players[(player_index + i) % count].board for i in range(1, count)]
+
+    def _decider(self, player_index: int) -> Callable[[Board, DiceRoll], int | None] | None:
+        """Decision function of the strategy of a player, bound to its opponents if it sees them."""
+        strategy = self.players[player_index].strategy
+        if not strategy:
+            return None
+        if isinstance(strategy, OpponentAwareStrategy):
+            opponents = self.opponent_boards(player_index)
+            return partial(strategy.choose_target_against, opponents=opponents)
+        return strategy.choose_target
+
+    def _record_turn(self, roll: DiceRoll, target: int, moves: int) -> None:
+        """Append the turn of the current player to the turn log, if the game is recorded."""
+        if self.turn_log is not None:
+            self.turn_log.extend((self.state.current_player_index, *roll.values, target, moves))
+
+    def _simulate_turn_for_target(self, target: int, dice_roller: DiceRoller | None = None) -> int:
         """Simulate a complete turn for a given target number."""
-        return self.dice_roller.simulate_turn(target)
+        return (dice_roller or self.dice_roller).simulate_turn(target)
 
     def play_game(self) -> Player:
         """Play the complete game until someone wins."""
-        logger.info("Starting game...")
+        self.logger.info("Starting game...")
         while not self.state.game_over:
             result = self.play_turn()
             if result["status"] == "winner":
                 break
 
-        logger.info(f"Game completed in {self.state.turn_count} turns")
+        self.logger.info(f"Game completed in {self.state.turn_count} turns")
         return self.state.winner or self.players[0]
 
+    def play_headless(self) -> tuple[Player, int]:
+        """Play the complete game without logging or per-turn results, the fast path of runs.
+
+        The turns are the same as with ``play_game``: the same dice give the same game and the
+        same final state, and the same turn log. The profiler is not used, profiled games are
+        played with ``play_game``.
+
+        Returns:
+            tuple[Player, int]: Winner and turn count
+        """
+        state = self.state
+        if state.game_over:
+            return state.winner or self.players[0], state.turn_count
+        players = self.players
+        rollers = [player.dice_roller or self.dice_roller for player in players]
+        deciders = [self._decider(index) for index in range(len(players))]
+        index = state.current_player_index
+        turn_count = state.turn_count
+        turn_log = self.turn_log
+        while True:
+            player = players[index]
+            roller = rollers[index]
+            decide = deciders[index]
+            roll = roller.roll()
+            target = decide(player.board, roll) if decide else None
+            if target is None:
+                if turn_log is not None:
+                    turn_log.extend((index, *roll.values, 0, 0))
+            else:
+                moves = roller.simulate_turn(target)
+                if moves > 0:
+                    player.board.move_peg(target, moves)
+                if turn_log is not None:
+                    turn_log.extend((index, *roll.values, target, moves))
+                if player.is_winner():
+                    break
+            index += 1
+            if index == len(players):
+                index = 0
+                turn_count += 1
+
+        state.current_player_index = index
+        state.turn_count = turn_count
+        state.game_over = True
+        state.winner = player
+        return player, turn_count
+
     def get_game_state(self) -> dict[str, Any]:
         """Get the current state of the game."""
         return {
@@ -162,6 +301,6 @@ class Game:
     def reset(self) -> None:
         """Reset the game to initial state."""
         for player in self.players:
-            player.board = Board()
+            player.board = self.board_factory()
         self.state = GameState(players=self.players)
-        logger.info("Game reset to initial state")
+        self.logger.info("Game reset to initial state")
@@ -0,0 +1,135 @@
+"""Per-phase timers, event counters and decision latency histograms of classic games.
+
+Instrumentation is off unless a ``Profiler`` is attached with ``Game.set_profiler``: the
+instrumented code then only checks that its profiler is ``None``. With a profiler, every phase of
+a turn is timed with ``time.perf_counter_ns``, and the latency of every decision is added to the
+histogram of its strategy class, with one bucket per power of two nanoseconds. Profiles merge like
+``SimulationStats``, so workers send theirs back with their chunk of games.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+# Phases of a turn in the order of play, see ``Game.play_turn``
+TURN_PHASES: tuple[str, ...] = ("roll", "choose_target", "simulate_turn", "board_update")
+# Percentiles of the decision latencies in reports
+PERCENTILES: tuple[int, ...] = (50, 90, 99)
+
+
+@dataclass
+class LatencyHistogram:
+    """Latencies in buckets of powers of two, bucket ``b`` holds latencies below ``2**b`` ns."""
+
+    buckets: list[int] = field(default_factory=list[int])
+    count: int = 0
+    total_ns: int = 0
+
+    def add(self, latency_ns: int) -> None:
+        """Add one latency."""
+        bucket = latency_ns.bit_length()
+        if bucket >= len(self.buckets):
+            self.buckets.extend([0] * (bucket + 1 - len(self.buckets)))
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total_ns += latency_ns
+
+    def merge(self, other: LatencyHistogram) -> None:
+        """Add the latencies of another histogram."""
+        if len(other.buckets) > len(self.buckets):
+            self.buckets.extend([0] * (len(other.buckets) - len(self.buckets)))
+        for bucket, count in enumerate(other.buckets):
+            self.buckets[bucket] += count
+        self.count += other.count
+        self.total_ns += other.total_ns
+
+    def percentile(self, percent: float) -> int:
+        """Upper bound in nanoseconds of the bucket that holds the percentile."""
+        threshold = percent / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= threshold:
+                return 1 << bucket
+        return 0
+
+    def report(self) -> dict[str, Any]:
+        """Count, mean, percentiles and the non-empty buckets by their upper bound in ns."""
+        return {
+            "count": self.count,
+            "mean_ns": self.total_ns / self.count if self.count else 0.0,
+            **{f"p{percent}_ns": self.percentile(percent) for percent in PERCENTILES},
+            "histogram": {
+                str(1 << bucket): count for bucket, count in enumerate(self.buckets) if count
+            },
+        }
+
+
+@dataclass
+class Profiler:
+    """Nanoseconds and calls per phase, event counts and decision latencies, mergeable."""
+
+    phase_ns: dict[str, int] = field(default_factory=dict[str, int])
+    phase_calls: dict[str, int] = field(default_factory=dict[str, int])
+    counts: dict[str, int] = field(default_factory=dict[str, int])
+    decisions: dict[str, LatencyHistogram] = field(default_factory=dict[str, LatencyHistogram])
+
+    def add_phase(self, phase: str, elapsed_ns: int) -> None:
+        """Add one call of a phase."""
+        self.phase_ns[phase] = self.phase_ns.get(phase, 0) + elapsed_ns
+        self.phase_calls[phase] = self.phase_calls.get(phase, 0) + 1
+
+    def lap(self, phase: str, start_ns: int) -> int:
+        """Add the time since ``start_ns`` to a phase and return the current time."""
+        now = time.perf_counter_ns()
+        self.add_phase(phase, now - start_ns)
+        return now
+
+    def lap_decision(self, strategy_name: str, start_ns: int) -> int:
+        """Add the time since ``start_ns`` to the decisions of a strategy, see ``lap``."""
+        now = time.perf_counter_ns()
+        self.add_phase("choose_target", now - start_ns)
+        if strategy_name not in self.decisions:
+            self.decisions[strategy_name] = LatencyHistogram()
+        self.decisions[strategy_name].add(now - start_ns)
+        return now
+
+    def count(self, event: str, times: int = 1) -> None:
+        """Count an event, e.g. ``rolls``."""
+        self.counts[event] = self.counts.get(event, 0) + times
+
+    def merge(self, other: Profiler) -> None:
+        """Add the measurements of another profiler."""
+        for phase, elapsed_ns in other.phase_ns.items():
+            self.phase_ns[phase] = self.phase_ns.get(phase, 0) + elapsed_ns
+        for phase, calls in other.phase_calls.items():
+            self.phase_calls[phase] = self.phase_calls.get(phase, 0) + calls
+        for event, times in other.counts.items():
+            self.count(event, times)
+        for strategy_name, histogram in other.decisions.items():
+            self.decisions.setdefault(strategy_name, LatencyHistogram()).merge(histogram)
+
+    def report(self) -> dict[str, Any]:
+        """Measurements as a JSON-serializable dict.
+
+        Every phase has its calls, total and mean nanoseconds and its share of the time of the
+        turn phases. Phases that are not part of a turn, like ``turn_rolls`` within
+        ``simulate_turn``, have no share.
+        """
+        turn_ns = sum(self.phase_ns.get(phase, 0) for phase in TURN_PHASES)
+        phases = {}
+        for phase, elapsed_ns in self.phase_ns.items():
+            calls = self.phase_calls[phase]
+            phases[phase] = {
+                "calls": calls,
+                "total_ns": elapsed_ns,
+                "mean_ns": elapsed_ns / calls,
+                "share": elapsed_ns / turn_ns if phase in TURN_PHASES and turn_ns else None,
+            }
+        return {
+            "phases": phases,
+            "counts": dict(self.counts),
+            "decisions": {name: hist.report() for name, hist in self.decisions.items()},
+        }
@@ -0,0 +1,100 @@
+"""Win probabilities of N-player games from single-player turn distributions.
+
+Players never interact in Opa Prikkie: a player's board, rolls and choices ignore the opponents.
+A game is therefore a race between independent single-player runs, where the players take turns
+in seat order (see ``GameState.next_player``) and the first player to finish wins. With ``T_i``
+the number of turns seat ``i`` needs, seat ``i`` wins on its ``n``-th turn when every earlier seat
+needed more than ``n`` turns and every later seat more than ``n - 1``:
+
+    P(seat i wins) = sum_n P(T_i = n) * prod_{j < i} P(T_j > n) * prod_{j > i} P(T_j > n - 1)
+
+So one turns-to-finish distribution per strategy, sampled or computed exactly with
+``evaluate_policy``, gives the win rates of every seat order.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from opaprikkie_sim.batch import BatchGame, BatchStrategy
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    import numpy.typing as npt
+
+
+@dataclass
+class RaceResult:
+    """Outcome probabilities of a game, by seat."""
+
+    win_probabilities: list[float]
+    expected_turn_count: float  # expected GameState.turn_count at the end of the game
+
+
+def sample_turns_distribution(
+    strategy: BatchStrategy, num_games: int, rng: np.random.Generator | None = None
+) -> npt.NDArray[np.float64]:
+    """Estimate the distribution of the turns one player needs to finish its board.
+
+    Returns:
+        Array where element ``n`` is the fraction of games finished on turn ``n``.
+    """
+    result = BatchGame(num_games, 1, [strategy], rng=rng, row_height=strategy.row_height).play()
+    # a single player completes a round every turn, the finishing turn is not counted
+    return np.bincount(result.turn_counts + 1) / num_games
+
+
+def race(distributions: Sequence[npt.NDArray[np.float64]]) -> RaceResult:
+    """Combine the turns-to-finish distributions of the seats into win probabilities.
+
+    Args:
+        distributions: One distribution per seat in turn order, element ``n`` is ``P(T = n)``
+
+    Returns:
+        RaceResult: Win probability of every seat and the expected length of the game
+    """
+    length = max(distribution.size for distribution in distributions)
+    pmf = np.zeros((len(distributions), length))
+    for seat, distribution in enumerate(distributions):
+        pmf[seat, : distribution.size] = distribution
+    # survival[j, n] = P(T_j > n), survival_before[j, n] = P(T_j > n - 1)
+    survival = np.maximum(1.0 - np.cumsum(pmf, axis=1), 0.0)
+    survival_before = np.concatenate([np.ones((len(distributions), 1)), survival[:, :-1]], axis=1)
+
+    wins = np.empty_like(pmf)
+    for seat in range(len(distributions)):
+        wins[seat] = (
+            pmf[seat]
+            * np.prod(survival[:seat], axis=0)
+            * np.prod(survival_before[seat + 1 :], axis=0)
+        )
+
+    # the game ends in round n - 1 of GameState.turn_count when a seat finishes on turn n
+    rounds = np.arange(length) - 1
+    return RaceResult(
+        win_probabilities=wins.sum(axis=1).tolist(),
+        expected_turn_count=float((wins.sum(axis=0) * rounds).sum() / wins.sum()),
+    )
+
+
+def matchups(
+    distributions: Mapping[str, npt.NDArray[np.float64]], num_players: int = 2
+) -> dict[tuple[str, ...], RaceResult]:
+    """Race every seat order of the strategies against each other.
+
+    Args:
+        distributions: Turns-to-finish distribution by strategy name
+        num_players: Number of seats per game
+
+    Returns:
+        dict[tuple[str, ...], RaceResult]: {strategy name per seat: race result}
+    """
+    return {
+        seats: race([distributions[name] for name in seats])
+        for seats in itertools.product(distributions, repeat=num_players)
+    }
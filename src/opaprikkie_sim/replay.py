@@ -0,0 +1,205 @@
+"""Compact binary logs of every turn of a run, with random access to any game.
+
+A game with a ``turn_log`` appends one fixed-width record of ``TURN_DTYPE`` per turn to it: the
+seat, the roll that the target was chosen from, the target (0 for a skipped turn) and the number
+of moves. The turns of the default dice are drawn from the outcome table with a single number, so
+the moves are the whole outcome of a turn. Games append to the same bytes, the ``TurnLog`` of a
+chunk only adds an index entry per game, so recording costs little more than the append.
+
+A ``ReplayWriter`` appends the turns of every chunk to its file as they come in, and the index
+entries of their games to a temporary file next to it, which it copies behind the turns when it
+is closed, so the memory of a run does not grow with its games::
+
+    magic | header length | JSON header | turn records | game index | index offset, games
+
+``read_replay`` maps the turns and the index without loading them, and looks games up by their
+index in the run with a binary search of the index.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import struct
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, BinaryIO, Self
+
+import numpy as np
+
+from opaprikkie_sim.constants import NUMBER_OF_DICE
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    import numpy.typing as npt
+
+REPLAY_MAGIC: bytes = b"OPAREP1\n"
+# Record of one turn, as appended by ``Game``
+TURN_DTYPE: np.dtype[Any] = np.dtype(
+    [("seat", "u1"), ("roll", "u1", (NUMBER_OF_DICE,)), ("target", "u1"), ("moves", "u1")]
+)
+# Index entry of one game, ``first_turn`` counts records from the first turn of the file
+GAME_DTYPE: np.dtype[Any] = np.dtype(
+    [("game", "<u8"), ("first_turn", "<u8"), ("num_turns", "<u4"), ("winner", "u1")]
+)
+# Offset of the game index and number of games, at the end of the file
+_TRAILER = struct.Struct("<QQ")
+# Bytes per write of the replay files
+_WRITE_BUFFER: int = 1 << 20
+
+
+@dataclass
+class TurnLog:
+    """Turn records of a chunk of games and the index of its games."""
+
+    turns: bytearray = field(default_factory=bytearray)
+    games: list[tuple[int, int, int, int]] = field(default_factory=list[tuple[int, int, int, int]])
+
+    @property
+    def num_turns(self) -> int:
+        """Number of turn records."""
+        return len(self.turns) // TURN_DTYPE.itemsize
+
+    def add_game(self, game_index: int, first_turn: int, winner: int) -> None:
+        """Index a game whose turns were appended from record ``first_turn`` on."""
+        self.games.append((game_index, first_turn, self.num_turns - first_turn, winner))
+
+
+class ReplayWriter:
+    """Appends the turns of chunks of games to a replay file, used as a context manager."""
+
+    def __init__(self, path: str | Path, strategy_names: list[str], seed: int | None = None):
+        """Open the file.
+
+        Args:
+            path: File to write to, an existing file is replaced
+            strategy_names: Strategy name per seat
+            seed: Seed of the run, which replays its games with ``verify_game``
+        """
+        self.path = Path(path)
+        self.strategy_names = strategy_names
+        self.seed = seed
+        self.num_games = 0
+        self.num_turns = 0
+        self.file: BinaryIO = self.path.open("wb", buffering=_WRITE_BUFFER)
+        # entries of the game index until the file is closed
+        self._index: IO[bytes] = tempfile.TemporaryFile(  # noqa: SIM115
+            dir=self.path.parent, buffering=_WRITE_BUFFER
+        )
+        header = json.dumps(
+            {"num_players": len(strategy_names), "seed": seed, "strategies": strategy_names}
+        ).encode()
+        self.file.write(REPLAY_MAGIC + struct.pack("<I", len(header)) + header)
+
+    def write(self, log: TurnLog) -> None:
+        """Append the turns of a chunk of games."""
+        index = np.array(log.games, dtype=GAME_DTYPE)
+        index["first_turn"] += self.num_turns
+        self.file.write(log.turns)
+        self._index.write(index.tobytes())
+        self.num_games += len(index)
+        self.num_turns += log.num_turns
+
+    def close(self) -> None:
+        """Copy the game index behind the turns and close the files."""
+        offset = self.file.tell()
+        self._index.seek(0)
+        shutil.copyfileobj(self._index, self.file, _WRITE_BUFFER)
+        self._index.close()
+        self.file.write(_TRAILER.pack(offset, self.num_games))
+        self.file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+@dataclass
+class ReplayedGame:
+    """Recorded turns of one game."""
+
+    game: int
+    winner: int
+    turns: npt.NDArray[np.void]
+
+
+@dataclass
+class Replay:
+    """Turns and game index of a replay file."""
+
+    header: dict[str, Any]
+    turns: npt.NDArray[np.void]
+    index: npt.NDArray[np.void]
+
+    @property
+    def num_games(self) -> int:
+        """Number of recorded games."""
+        return len(self.index)
+
+    def game(self, game_index: int) -> ReplayedGame:
+        """Turns of the game with this index in the run, without reading the other games.
+
+        Raises:
+            KeyError: If the game is not in the file.
+        """
+        games = self.index["game"]
+        position = int(np.searchsorted(games, game_index))
+        if position == len(games) or games[position] != game_index:
+            raise KeyError(f"Game {game_index} is not in the replay")
+        entry = self.index[position]
+        first = int(entry["first_turn"])
+        return ReplayedGame(
+            game_index, int(entry["winner"]), self.turns[first : first + int(entry["num_turns"])]
+        )
+
+
+def read_replay(path: str | Path) -> Replay:
+    """Map the turns and the game index of a ``ReplayWriter`` file without loading them.
+
+    Raises:
+        ValueError: If the file is not a complete replay file.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    with path.open("rb") as file:
+        if file.read(len(REPLAY_MAGIC)) != REPLAY_MAGIC:
+            raise ValueError(f"Not a replay file: {path}")
+        (length,) = struct.unpack("<I", file.read(4))
+        header: dict[str, Any] = json.loads(file.read(length))
+        file.seek(size - _TRAILER.size)
+        index_offset, num_games = _TRAILER.unpack(file.read(_TRAILER.size))
+    turns_offset = len(REPLAY_MAGIC) + 4 + length
+    if index_offset + num_games * GAME_DTYPE.itemsize + _TRAILER.size != size:
+        raise ValueError(f"Replay file without a valid game index, was it closed? {path}")
+
+    num_turns = (index_offset - turns_offset) // TURN_DTYPE.itemsize
+    turns: npt.NDArray[np.void] = np.empty(0, dtype=TURN_DTYPE)
+    index: npt.NDArray[np.void] = np.empty(0, dtype=GAME_DTYPE)
+    if num_turns:
+        turns = np.memmap(path, TURN_DTYPE, "r", turns_offset, (num_turns,))
+    if num_games:
+        index = np.memmap(path, GAME_DTYPE, "r", index_offset, (num_games,))
+    return Replay(header, turns, index)
+
+
+def verify_game(replay: Replay, game_index: int) -> bool:
+    """Play a game of a seeded run again and check that it has the recorded turns."""
+    # imported here, the simulation imports this module
+    from opaprikkie_sim.simulation import create_seeded_game
+
+    seed = replay.header["seed"]
+    if seed is None:
+        raise ValueError("Only the games of a seeded run can be played again")
+    game = create_seeded_game(seed, game_index, replay.header["strategies"], headless=True)
+    game.turn_log = bytearray()
+    game.play_headless()
+    return bytes(game.turn_log) == replay.game(game_index).turns.tobytes()
@@ -0,0 +1,80 @@
+"""Counter-based random streams, so that every game of a seeded run can be regenerated on its own.
+
+A Philox generator encrypts a 256-bit counter with the key. The run seed is the key, and the
+game index, the player and the kind of stream are placed in the high words of the counter: the
+stream of any game starts at a known counter. Game ``k`` is regenerated without drawing the games
+before it, whatever the number of workers or the chunking of the run. The low word counts the
+draws of a stream, which would take 2**64 blocks to run into another stream.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, TypeVar
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+_T = TypeVar("_T")
+
+# Kinds of streams, the third word of the counter
+DICE_STREAM: int = 0  # rolls and turns of a player
+CHOICE_STREAM: int = 1  # choices of a random strategy
+BATCH_STREAM: int = 2  # a block of lockstep games, the game word is the block index
+RACE_STREAM: int = 3  # single-player sample of a strategy, the game word is the strategy index
+TURN_STREAM: int = 16  # turns of a player for target t use stream TURN_STREAM + t
+
+# Uniforms drawn per refill of a GeneratorRandom
+DEFAULT_BLOCK_SIZE: int = 256
+
+
+def philox_generator(
+    seed: int, game: int, player: int = 0, stream: int = DICE_STREAM
+) -> np.random.Generator:
+    """NumPy generator of one stream of a seeded run.
+
+    Args:
+        seed: Seed of the run, the Philox key (up to 128 bits)
+        game: Index of the game in the run
+        player: Seat of the player
+        stream: Kind of stream, e.g. ``DICE_STREAM``
+
+    Returns:
+        np.random.Generator: Generator positioned at the start of the stream
+    """
+    return np.random.Generator(np.random.Philox(key=seed, counter=[0, stream, player, game]))
+
+
+class GeneratorRandom:
+    """``RandomSource`` drawing from a NumPy generator, refilled in blocks of uniforms."""
+
+    def __init__(self, generator: np.random.Generator, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.generator = generator
+        self.block_size = block_size
+        self._buffer: list[float] = []
+        self._next = 0
+
+    def random(self) -> float:
+        """Uniform float in [0, 1)."""
+        if self._next == len(self._buffer):
+            self._buffer = self.generator.random(self.block_size).tolist()
+            self._next = 0
+        value = self._buffer[self._next]
+        self._next += 1
+        return value
+
+    def randint(self, a: int, b: int) -> int:
+        """Uniform integer in [a, b], both included."""
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq: Sequence[_T]) -> _T:
+        """Uniform element of a non-empty sequence."""
+        return seq[int(self.random() * len(seq))]
+
+
+def game_random(
+    seed: int, game: int, player: int = 0, stream: int = DICE_STREAM
+) -> GeneratorRandom:
+    """``RandomSource`` of one stream of a seeded run, see ``philox_generator``."""
+    return GeneratorRandom(philox_generator(seed, game, player, stream))
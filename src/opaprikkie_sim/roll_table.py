@@ -0,0 +1,147 @@
+"""Lookup tables for dice rolls, indexed by the multiset of faces that was rolled.
+
+What can be done with a roll only depends on how many dice show each face, not on their order.
+A roll of six dice has only 462 distinct face multisets, so the targets of every multiset are
+computed once and looked up by a face-count key: four bits per face, holding how many dice
+show that face.
+"""
+
+import bisect
+import functools
+import itertools
+import math
+from collections.abc import Iterable, Iterator
+
+from opaprikkie_sim.constants import MAX_DICE_NUM, MIN_DICE_NUM, NUMBER_OF_DICE
+
+NUM_FACES: int = MAX_DICE_NUM - MIN_DICE_NUM + 1
+
+_BITS_PER_FACE: int = 4
+_FACE_MASK: int = (1 << _BITS_PER_FACE) - 1
+
+# key increment for a single die showing the face, indexed by face value
+_FACE_KEY: tuple[int, ...] = (0, *(1 << (_BITS_PER_FACE * i) for i in range(NUM_FACES)))
+
+
+def face_count_key(values: Iterable[int]) -> int:
+    """Face-count key of a roll, equal for all orderings of the same dice."""
+    return sum(map(_FACE_KEY.__getitem__, values))
+
+
+def key_to_face_counts(key: int) -> tuple[int, ...]:
+    """Number of dice per face (1 to 6) encoded in a face-count key."""
+    return tuple((key >> (_BITS_PER_FACE * i)) & _FACE_MASK for i in range(NUM_FACES))
+
+
+def count_face(key: int, face: int) -> int:
+    """Number of dice showing the face in a face-count key."""
+    return (key >> (_BITS_PER_FACE * (face - MIN_DICE_NUM))) & _FACE_MASK
+
+
+@functools.cache
+def face_values(key: int) -> tuple[int, ...]:
+    """Dice values of a face-count key, in ascending order."""
+    return tuple(
+        face
+        for face, count in enumerate(key_to_face_counts(key), start=MIN_DICE_NUM)
+        for _ in range(count)
+    )
+
+
+def face_counts_to_key(face_counts: Iterable[int]) -> int:
+    """Face-count key for the given number of dice per face (1 to 6)."""
+    return sum(count << (_BITS_PER_FACE * i) for i, count in enumerate(face_counts))
+
+
+def iter_face_counts(num_dice: int, num_faces: int = NUM_FACES) -> Iterator[tuple[int, ...]]:
+    """Yield every way to distribute the dice over the faces (the roll multisets)."""
+    if num_faces == 1:
+        yield (num_dice,)
+        return
+    for count in range(num_dice, -1, -1):
+        for rest in iter_face_counts(num_dice - count, num_faces - 1):
+            yield (count, *rest)
+
+
+def pairs_for_target(target: int) -> list[tuple[int, int]]:
+    """Face pairs (a, b) with a <= b that sum up to a two-dice target."""
+    return [
+        (a, target - a) for a in range(max(MIN_DICE_NUM, target - MAX_DICE_NUM), target // 2 + 1)
+    ]
+
+
+def count_matches(face_counts: tuple[int, ...], target: int) -> int:
+    """Number of times the target can be formed, each die is used only once."""
+    if target <= MAX_DICE_NUM:
+        return face_counts[target - MIN_DICE_NUM]
+
+    matches = 0
+    for a, b in pairs_for_target(target):
+        count_a = face_counts[a - MIN_DICE_NUM]
+        count_b = face_counts[b - MIN_DICE_NUM]
+        matches += count_a // 2 if a == b else min(count_a, count_b)
+    return matches
+
+
+def _compute_targets(face_counts: tuple[int, ...]) -> dict[int, int]:
+    """All targets that can be formed and their counts, in ascending order of target."""
+    targets: dict[int, int] = {}
+    for target in range(MIN_DICE_NUM, 2 * MAX_DICE_NUM + 1):
+        count = count_matches(face_counts, target)
+        if count:
+            targets[target] = count
+    return targets
+
+
+@functools.cache
+def _targets_table() -> dict[int, dict[int, int]]:
+    """Targets of every multiset of up to ``NUMBER_OF_DICE`` dice, by face-count key."""
+    return {
+        face_counts_to_key(face_counts): _compute_targets(face_counts)
+        for num_dice in range(NUMBER_OF_DICE + 1)
+        for face_counts in iter_face_counts(num_dice)
+    }
+
+
+def targets_for_key(key: int) -> dict[int, int]:
+    """Available targets and their counts for a face-count key.
+
+    The returned dict is shared by all rolls with the same dice and must not be modified.
+    Rolls with more dice than ``NUMBER_OF_DICE`` are added to the table on first use.
+    """
+    table = _targets_table()
+    targets = table.get(key)
+    if targets is None:
+        targets = table[key] = _compute_targets(key_to_face_counts(key))
+    return targets
+
+
+@functools.cache
+def multiset_probabilities(num_dice: int) -> dict[int, float]:
+    """Probability of every roll of the dice, by face-count key."""
+    probabilities: dict[int, float] = {}
+    for face_counts in iter_face_counts(num_dice):
+        orderings = math.factorial(num_dice)
+        for count in face_counts:
+            orderings //= math.factorial(count)
+        probabilities[face_counts_to_key(face_counts)] = orderings / NUM_FACES**num_dice
+    return probabilities
+
+
+@functools.cache
+def _multiset_cdf(num_dice: int) -> tuple[tuple[int, ...], tuple[float, ...]]:
+    """Face-count keys of all rolls of the dice and their cumulative probabilities."""
+    probabilities = multiset_probabilities(num_dice)
+    cdf = list(itertools.accumulate(probabilities.values()))
+    # the last key is returned for any draw beyond the rounded final cumulative probability
+    return tuple(probabilities), tuple(cdf[:-1])
+
+
+def sample_face_key(num_dice: int, uniform: float) -> int:
+    """Map a uniform draw in [0, 1) to the face-count key of a roll of the dice.
+
+    Every multiset is drawn with its multinomial probability, so a whole roll costs a single
+    random number instead of one per die.
+    """
+    keys, cdf = _multiset_cdf(num_dice)
+    return keys[bisect.bisect_right(cdf, uniform)]
@@ -0,0 +1,185 @@
+"""Monte Carlo rollouts: the turns a board needs to finish after saving for each target.
+
+A rollout of a target plays the turn of the target from the outcome table, then plays the board
+to the end under a base policy, the way a one-player ``BatchGame`` does. The rollouts of all
+targets of a decision are played at once, as rows of the same arrays. The turns of the rollouts
+estimate the expected turns to finish after every target, which ``RolloutStrategy`` minimizes.
+
+Rollout ``r`` of every target uses the same rolls and the same uniforms of the outcome table:
+with these common random numbers, the differences between targets are estimated with far less
+noise than with independent rollouts, whose turns vary by tens of turns from game to game.
+
+Rollouts are played in rounds of ``batch`` rollouts per target until the rollout budget or the
+time budget of the decision is spent. With an executor, every round is split over its workers,
+each playing its part with its own generator.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from opaprikkie_sim.batch import (
+    BATCH_STRATEGIES_NAME_MAPPING,
+    NUM_TARGETS,
+    BatchGame,
+    sample_turn_outcomes,
+)
+from opaprikkie_sim.constants import MAX_ROW_HEIGHT, MIN_DICE_NUM, NUMBER_OF_DICE
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from concurrent.futures import Executor
+
+    import numpy.typing as npt
+
+    from opaprikkie_sim.board import Board
+    from opaprikkie_sim.dice import RandomSource
+
+# Seeds of the generators of the rollouts are drawn below this
+_MAX_SEED: int = 2**63 - 1
+
+
+@dataclass
+class RolloutEstimate:
+    """Turns of the rollouts of every target of a decision."""
+
+    targets: list[int]
+    total_turns: npt.NDArray[np.int64]  # (targets,) summed over the rollouts
+    rollouts: int  # per target
+
+    @property
+    def mean_turns(self) -> npt.NDArray[np.float64]:
+        """Estimated turns to finish after saving for every target, this turn included."""
+        return self.total_turns / max(self.rollouts, 1)
+
+    @property
+    def best_target(self) -> int:
+        """Target with the fewest estimated turns, the lowest target on ties."""
+        return self.targets[int(self.mean_turns.argmin())]
+
+
+def board_positions(board: Board) -> npt.NDArray[np.int8]:
+    """Peg positions of any board as a ``(12,)`` row, pegs that are not on the board at the top."""
+    positions = np.full(NUM_TARGETS, board.row_height, dtype=np.int8)
+    for peg in board.pegs:
+        positions[peg.number - MIN_DICE_NUM] = min(peg.position, board.row_height)
+    return positions
+
+
+def play_rollouts(  # noqa: PLR0913
+    positions: npt.NDArray[np.int8],
+    targets: Sequence[int],
+    rollouts: int,
+    base: str,
+    num_dice: int,
+    row_height: int,
+    seed: int,
+) -> npt.NDArray[np.int64]:
+    """Play rollouts of every target from a board, the work of one round or of one worker.
+
+    Args:
+        positions: ``(12,)`` peg positions, see ``board_positions``
+        targets: Targets to save for this turn
+        rollouts: Rollouts per target
+        base: Name of the batch strategy that plays the rest of the board
+        num_dice: Number of dice
+        row_height: Row height of the board
+        seed: Seed of the generator of the rollouts
+
+    Returns:
+        ``(targets,)`` turns to finish summed over the rollouts of every target
+    """
+    rng = np.random.default_rng(seed)
+    strategy = BATCH_STRATEGIES_NAME_MAPPING[base](row_height=row_height)
+    dice = BatchGame(rollouts, 1, [strategy], num_dice, rng=rng, row_height=row_height)
+    # the first turn saves for the target of the row, the others for the choice of the base
+    chosen = np.repeat(np.asarray(targets, dtype=np.int8), rollouts)
+    rows = np.arange(chosen.size)
+    boards = np.repeat(positions[None], chosen.size, axis=0)
+    turns = np.zeros(chosen.size, dtype=np.int64)
+
+    while rows.size:
+        # rollout r of every target draws the same numbers
+        shared = rows % rollouts
+        moves = sample_turn_outcomes(chosen, rng.random(rollouts)[shared], num_dice)
+        columns = np.maximum(chosen, MIN_DICE_NUM) - MIN_DICE_NUM
+        index = np.arange(rows.size)
+        boards[index, columns] = np.minimum(boards[index, columns] + moves, row_height)
+        turns[rows] += 1
+
+        open_boards = (boards < row_height).any(axis=1)
+        rows, boards = rows[open_boards], boards[open_boards]
+        counts = dice.count_targets(dice.roll(rollouts))[rows % rollouts]
+        chosen = strategy.choose_targets(boards, counts, rng)
+    return turns.reshape(len(targets), rollouts).sum(axis=1)
+
+
+def estimate_targets(  # noqa: PLR0913
+    positions: npt.NDArray[np.int8],
+    targets: list[int],
+    rng: RandomSource,
+    base: str,
+    rollouts: int,
+    batch: int,
+    time_budget: float | None = None,
+    num_dice: int = NUMBER_OF_DICE,
+    row_height: int = MAX_ROW_HEIGHT,
+    executor: Executor | None = None,
+    workers: int = 1,
+) -> RolloutEstimate:
+    """Play rollouts of every target in rounds until the rollout or the time budget is spent.
+
+    At least one round is played. The seeds of the rounds are drawn from ``rng``, so the same
+    generator gives the same estimate when the rollout budget ends the decision.
+
+    Args:
+        positions: ``(12,)`` peg positions, see ``board_positions``
+        targets: Targets to compare
+        rng: Generator of the seeds of the rounds
+        base: Name of the batch strategy that plays the rest of the board
+        rollouts: Rollouts per target of the whole decision
+        batch: Rollouts per target of a round
+        time_budget: Seconds of the decision, no more rounds are started after it
+        num_dice: Number of dice
+        row_height: Row height of the board
+        executor: Pool that plays the parts of a round, in this thread without one
+        workers: Parts of a round, one per worker of the executor
+
+    Returns:
+        RolloutEstimate: Summed turns of the rollouts of every target
+    """
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    estimate = RolloutEstimate(targets, np.zeros(len(targets), dtype=np.int64), 0)
+    while estimate.rollouts < rollouts:
+        size = min(batch, rollouts - estimate.rollouts)
+        if executor is None:
+            seed = rng.randint(0, _MAX_SEED)
+            estimate.total_turns += play_rollouts(
+                positions, targets, size, base, num_dice, row_height, seed
+            )
+        else:
+            parts = [size // workers + (part < size % workers) for part in range(workers)]
+            futures = [
+                executor.submit(
+                    play_rollouts,
+                    positions,
+                    targets,
+                    part_size,
+                    base,
+                    num_dice,
+                    row_height,
+                    rng.randint(0, _MAX_SEED),
+                )
+                for part_size in parts
+                if part_size
+            ]
+            for future in futures:
+                estimate.total_turns += future.result()
+        estimate.rollouts += size
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+    return estimate
@@ -0,0 +1,907 @@
+"""Running many games, in parallel worker processes, and aggregating their statistics.
+
+Workers play chunks of games and only send back a ``SimulationStats`` with the wins per seat,
+the sum and a histogram of the turn counts, which the parent merges. No per-game objects cross
+the process boundary.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from opaprikkie_sim.batch import (
+    BATCH_STRATEGIES_NAME_MAPPING,
+    NUM_TARGETS,
+    BatchGame,
+    BatchStrategy,
+)
+from opaprikkie_sim.constants import ENGINES, EXECUTORS
+from opaprikkie_sim.dice import DiceRoller, TargetStreamDiceRoller
+from opaprikkie_sim.estimators import RunningMoments, StoppingRule
+from opaprikkie_sim.game import Game
+from opaprikkie_sim.profiling import Profiler
+from opaprikkie_sim.race import race, sample_turns_distribution
+from opaprikkie_sim.replay import TurnLog
+from opaprikkie_sim.rng import (
+    BATCH_STREAM,
+    CHOICE_STREAM,
+    DICE_STREAM,
+    RACE_STREAM,
+    TURN_STREAM,
+    game_random,
+    philox_generator,
+)
+from opaprikkie_sim.sinks import result_dtype, strategy_codes
+from opaprikkie_sim.strategy import (
+    STRATEGIES_NAME_MAPPING,
+    CachedStrategy,
+    OpponentAwareStrategy,
+    StochasticStrategy,
+    Strategy,
+)
+from opaprikkie_sim.utilities import init_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable, Iterator
+
+    import numpy.typing as npt
+
+    from opaprikkie_sim.checkpoint import Checkpointer
+    from opaprikkie_sim.dice import RandomSource
+    from opaprikkie_sim.replay import ReplayWriter
+    from opaprikkie_sim.sinks import ResultSink
+
+logger = init_logger(__name__)
+
+# Smaller runs are played in the calling process, a pool costs more than it saves
+MIN_PARALLEL_GAMES: dict[str, int] = {"classic": 200, "batch": 20000}
+# Games per counter-based generator of a seeded batch run
+SEED_BLOCK_GAMES: int = 4096
+# Games per chunk of a run with a stopping rule, the rule is checked after every chunk
+STOPPING_CHUNK_GAMES: dict[str, int] = {"classic": 500, "batch": 50000}
+# Games per chunk of a run with a result sink, which bounds the memory of the records
+SINK_CHUNK_GAMES: int = 1 << 16
+# Games per chunk of a run with a replay, the turns of a game take about 1.5 KiB
+REPLAY_CHUNK_GAMES: int = 1 << 12
+# Games per chunk of a run with checkpoints, the progress that is lost when a run stops
+CHECKPOINT_CHUNK_GAMES: dict[str, int] = {"classic": 1000, "batch": 1 << 17}
+# Chunks per worker, so that workers that finish early can pick up more work
+_CHUNKS_PER_WORKER: int = 4
+# Decision caches of the deterministic strategies, shared by the games of a thread
+_decision_caches = threading.local()
+
+
+def create_strategy(
+    strategy_name: str, rng: RandomSource | None = None, cached: bool = False
+) -> Strategy:
+    """Create a strategy based on the name, stochastic strategies draw from the given generator.
+
+    With ``cached``, a deterministic strategy that does not see the opponents is the
+    ``shared_cached_strategy`` of its name.
+    """
+    strategy_class = STRATEGIES_NAME_MAPPING.get(strategy_name.lower())
+    if not strategy_class:
+        raise ValueError(f"Unknown strategy: {strategy_name}")
+
+    if issubclass(strategy_class, StochasticStrategy):
+        return strategy_class(rng) if rng is not None else strategy_class()
+    if cached and _cacheable(strategy_class):
+        return shared_cached_strategy(strategy_name)
+    return strategy_class()
+
+
+def _cacheable(strategy_class: type[Strategy]) -> bool:
+    """Whether the decisions of a strategy depend on the board and the roll only."""
+    return not issubclass(strategy_class, StochasticStrategy | OpponentAwareStrategy)
+
+
+def shared_cached_strategy(strategy_name: str) -> CachedStrategy:
+    """Cached deterministic strategy of this name, shared by all games of the calling thread.
+
+    Every worker process or thread fills its own caches, which last as long as the worker.
+    """
+    caches: dict[str, CachedStrategy] | None = getattr(_decision_caches, "caches", None)
+    if caches is None:
+        caches = _decision_caches.caches = {}
+    name = strategy_name.lower()
+    if name not in caches:
+        caches[name] = CachedStrategy(create_strategy(name))
+    return caches[name]
+
+
+def _cache_counts(strategy_names: list[str]) -> tuple[int, int]:
+    """Hits and misses so far of the shared decision caches of these strategies."""
+    caches = [
+        shared_cached_strategy(name)
+        for name in set(strategy_names)
+        if _cacheable(STRATEGIES_NAME_MAPPING[name.lower()])
+    ]
+    return sum(cache.hits for cache in caches), sum(cache.misses for cache in caches)
+
+
+def strategy_display_name(strategy: Strategy | None) -> str:
+    """Class name of a strategy, of the wrapped strategy for a cached one."""
+    if isinstance(strategy, CachedStrategy):
+        strategy = strategy.strategy
+    return strategy.__class__.__name__
+
+
+def create_batch_strategy(strategy_name: str) -> BatchStrategy:
+    """Create an array-native strategy for the batch engine based on the name."""
+    strategy_class = BATCH_STRATEGIES_NAME_MAPPING.get(strategy_name.lower())
+    if not strategy_class:
+        raise ValueError(f"Unknown strategy: {strategy_name}")
+
+    return strategy_class()
+
+
+def seat_strategies(num_players: int, strategy1: str, strategy2: str) -> list[str]:
+    """Strategy name per seat: the first two are given, the other players play randomly."""
+    return [strategy1, strategy2, *["random"] * max(num_players - 2, 0)][:num_players]
+
+
+@dataclass
+class SimulationStats:
+    """Aggregated results of a number of games, mergeable across chunks."""
+
+    num_players: int
+    strategy_names: list[str] = field(default_factory=list[str])
+    num_games: int = 0
+    wins: list[int] = field(default_factory=list[int])
+    total_turns: int = 0
+    turn_histogram: list[int] = field(default_factory=list[int])  # games per turn count
+    # per-game results of a chunk, see ``sinks.result_dtype``, for the sink of the run only
+    records: npt.NDArray[np.void] | None = field(default=None, repr=False, compare=False)
+    # phase timings of the classic engine, for runs with profiling only
+    profile: Profiler | None = field(default=None, repr=False, compare=False)
+    # decisions taken from and added to the decision caches, for runs with caches only
+    cache_hits: int = field(default=0, compare=False)
+    cache_misses: int = field(default=0, compare=False)
+    # turns of every game of a chunk, for the replay of the run only
+    turn_log: TurnLog | None = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not self.wins:
+            self.wins = [0] * self.num_players
+
+    def record(self, winner: int, turn_count: int) -> None:
+        """Add the result of one game."""
+        self.num_games += 1
+        self.wins[winner] += 1
+        self.total_turns += turn_count
+        if turn_count >= len(self.turn_histogram):
+            self.turn_histogram.extend([0] * (turn_count + 1 - len(self.turn_histogram)))
+        self.turn_histogram[turn_count] += 1
+
+    def merge(self, other: SimulationStats) -> None:
+        """Add the results of another chunk of games."""
+        self.strategy_names = self.strategy_names or other.strategy_names
+        self.num_games += other.num_games
+        self.wins = [a + b for a, b in zip(self.wins, other.wins, strict=True)]
+        self.total_turns += other.total_turns
+        if len(other.turn_histogram) > len(self.turn_histogram):
+            missing = len(other.turn_histogram) - len(self.turn_histogram)
+            self.turn_histogram.extend([0] * missing)
+        for turn_count, games in enumerate(other.turn_histogram):
+            self.turn_histogram[turn_count] += games
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        if other.profile is not None:
+            if self.profile is None:
+                self.profile = Profiler()
+            self.profile.merge(other.profile)
+
+    @property
+    def average_turns(self) -> float:
+        """Average turn count per game."""
+        return self.total_turns / self.num_games if self.num_games else 0.0
+
+    @property
+    def turn_moments(self) -> RunningMoments:
+        """Mean and variance of the turn counts.
+
+        Built from the histogram, so they do not depend on how a run was split into chunks or
+        where it was resumed.
+        """
+        return RunningMoments.from_histogram(self.turn_histogram)
+
+
+def _turn_streams(seed: int, game_index: int, seat: int) -> Callable[[int], RandomSource]:
+    def target_rng(target: int) -> RandomSource:
+        return game_random(seed, game_index, seat, TURN_STREAM + target)
+
+    return target_rng
+
+
+def create_seeded_game(  # noqa: PLR0913
+    seed: int,
+    game_index: int,
+    strategy_names: list[str],
+    game_logger: logging.Logger | None = None,
+    target_streams: bool = False,
+    headless: bool = False,
+    cached: bool = False,
+) -> Game:
+    """Create game ``game_index`` of a seeded run, independent of the games before it.
+
+    Every player rolls its own dice and makes its own random choices from counter-based streams
+    keyed by the seed, the game index and the seat, see ``rng.game_random``.
+
+    Args:
+        seed: Seed of the run
+        game_index: Index of the game in the run
+        strategy_names: Strategy name per seat
+        game_logger: Logger of the game (default: the ``game`` module logger)
+        target_streams: Draw the turns for every target from its own stream, see
+            ``TargetStreamDiceRoller``
+        headless: Create the game without logging, to be played with ``Game.play_headless``
+        cached: Deterministic strategies share the decision caches of the thread, see
+            ``shared_cached_strategy``
+    """
+    game = Game(num_players=len(strategy_names), logger=game_logger, headless=headless)
+    for seat, (player, name) in enumerate(zip(game.players, strategy_names, strict=True)):
+        rng = game_random(seed, game_index, seat, DICE_STREAM)
+        if target_streams:
+            player.dice_roller = TargetStreamDiceRoller(rng, _turn_streams(seed, game_index, seat))
+        else:
+            player.dice_roller = DiceRoller(rng=rng)
+        choice_rng = game_random(seed, game_index, seat, CHOICE_STREAM)
+        game.set_player_strategy(seat, create_strategy(name, choice_rng, cached))
+    return game
+
+
+def play_classic_games(  # noqa: PLR0913
+    num_games: int,
+    num_players: int,
+    strategy1: str,
+    strategy2: str,
+    seed: int | None = None,
+    first_game: int = 0,
+    with_records: bool = False,
+    profile: bool = False,
+    record_turns: bool = False,
+    cache_decisions: bool = False,
+    rng: RandomSource | None = None,
+    game_logger: logging.Logger | None = None,
+) -> SimulationStats:
+    """Play the games one by one with ``Game``.
+
+    Args:
+        num_games: Number of games
+        num_players: Number of players per game
+        strategy1: Strategy of the first player
+        strategy2: Strategy of the second player, the others play randomly
+        seed: Seed of the run, every game is created with ``create_seeded_game``
+        first_game: Index of the first game in the run
+        with_records: Keep the result of every game in ``SimulationStats.records``
+        profile: Time the phases of every turn in ``SimulationStats.profile``
+        record_turns: Log the turns of every game in ``SimulationStats.turn_log``
+        cache_decisions: Deterministic strategies take their decisions from the decision caches
+            of the thread, with the hits and misses in ``SimulationStats``
+        rng: Generator for the dice and random strategies of an unseeded run
+            (default: the shared ``random`` module)
+        game_logger: Logger of the games (default: the ``game`` module logger)
+    """
+    names = seat_strategies(num_players, strategy1, strategy2)
+    return play_classic_lineup(
+        num_games,
+        names,
+        seed,
+        first_game,
+        with_records,
+        profile,
+        record_turns,
+        cache_decisions,
+        rng,
+        game_logger,
+    )
+
+
+def play_classic_lineup(  # noqa: PLR0913
+    num_games: int,
+    names: list[str],
+    seed: int | None = None,
+    first_game: int = 0,
+    with_records: bool = False,
+    profile: bool = False,
+    record_turns: bool = False,
+    cache_decisions: bool = False,
+    rng: RandomSource | None = None,
+    game_logger: logging.Logger | None = None,
+) -> SimulationStats:
+    """Play the games one by one with ``Game``, with the strategy of every seat given by name.
+
+    See ``play_classic_games`` for the other arguments.
+    """
+    num_players = len(names)
+    stats = SimulationStats(num_players)
+    run_logger = game_logger or logger
+    if profile:
+        stats.profile = Profiler()
+    if with_records:
+        stats.records = np.zeros(num_games, dtype=result_dtype(num_players))
+        stats.records["game"] = np.arange(first_game, first_game + num_games)
+        stats.records["seats"] = strategy_codes(names)
+    if record_turns:
+        stats.turn_log = TurnLog()
+    hits, misses = _cache_counts(names) if cache_decisions else (0, 0)
+
+    for i in range(num_games):
+        if (i + 1) % 100 == 0:
+            run_logger.info(f"Completed {i + 1} games...")
+
+        # profiled games play the instrumented turns of play_game, the others the fast path
+        headless = stats.profile is None
+        game = _create_game(
+            names, seed, first_game + i, rng, game_logger, headless=headless, cached=cache_decisions
+        )
+        game.set_profiler(stats.profile)
+        first_turn = 0
+        if stats.turn_log is not None:
+            game.turn_log = stats.turn_log.turns
+            first_turn = stats.turn_log.num_turns
+
+        # Store strategy class names for display
+        stats.strategy_names = [strategy_display_name(player.strategy) for player in game.players]
+
+        if headless:
+            winner, _ = game.play_headless()
+        else:
+            winner = game.play_game()
+        _record_game(stats, i, first_game + i, game, game.players.index(winner), first_turn)
+
+    if cache_decisions:
+        total_hits, total_misses = _cache_counts(names)
+        stats.cache_hits, stats.cache_misses = total_hits - hits, total_misses - misses
+    return stats
+
+
+def _create_game(  # noqa: PLR0913
+    names: list[str],
+    seed: int | None,
+    game_index: int,
+    rng: RandomSource | None,
+    game_logger: logging.Logger | None,
+    headless: bool,
+    cached: bool,
+) -> Game:
+    """Game of a chunk, from the seed of the run or drawing from the generator of the chunk."""
+    if seed is not None:
+        return create_seeded_game(
+            seed, game_index, names, game_logger, headless=headless, cached=cached
+        )
+    game = Game(len(names), dice_roller=DiceRoller(rng=rng), logger=game_logger, headless=headless)
+    for seat, name in enumerate(names):
+        game.set_player_strategy(seat, create_strategy(name, rng, cached))
+    return game
+
+
+def _record_game(  # noqa: PLR0913
+    stats: SimulationStats, i: int, game_index: int, game: Game, winner: int, first_turn: int
+) -> None:
+    """Add a played game to the statistics, the records and the turn log of its chunk."""
+    stats.record(winner, game.state.turn_count)
+    if stats.turn_log is not None:
+        stats.turn_log.add_game(game_index, first_turn, winner)
+    if stats.records is not None:
+        record = stats.records[i]
+        record["winner"] = winner
+        record["turn_count"] = game.state.turn_count
+        record["positions"] = [
+            [positions.get(number, 0) for number in range(1, NUM_TARGETS + 1)]
+            for positions in (player.board.get_peg_positions() for player in game.players)
+        ]
+
+
+def play_batch_games(  # noqa: PLR0913
+    num_games: int,
+    num_players: int,
+    strategy1: str,
+    strategy2: str,
+    seed: int | None = None,
+    first_game: int = 0,
+    with_records: bool = False,
+    profile: bool = False,
+    record_turns: bool = False,
+    cache_decisions: bool = False,
+) -> SimulationStats:
+    """Play all games in lockstep with ``BatchGame``.
+
+    A seeded run is played in blocks of ``SEED_BLOCK_GAMES`` games, each with its own
+    counter-based generator, so the results do not depend on the chunking of the run.
+    With ``with_records``, the result of every game is kept in ``SimulationStats.records``.
+    The games have no turns of their own to time or to record and their strategies decide for
+    all games at once: ``profile``, ``record_turns`` and ``cache_decisions`` are not supported.
+    """
+    if profile:
+        raise ValueError("Profiling times the turns of Game, use the classic engine")
+    if record_turns:
+        raise ValueError("Replays record the turns of Game, use the classic engine")
+    if cache_decisions:
+        raise ValueError("Decision caches wrap the strategies of Game, use the classic engine")
+    names = seat_strategies(num_players, strategy1, strategy2)
+    return play_batch_lineup(num_games, names, seed, first_game, with_records)
+
+
+def play_batch_lineup(
+    num_games: int,
+    names: list[str],
+    seed: int | None = None,
+    first_game: int = 0,
+    with_records: bool = False,
+) -> SimulationStats:
+    """Play all games in lockstep with ``BatchGame``, with the strategy of every seat by name.
+
+    See ``play_batch_games`` for the other arguments.
+
+    Raises:
+        ValueError: If a seeded run does not start at a block, whose games would be played twice
+    """
+    if seed is not None and first_game % SEED_BLOCK_GAMES:
+        raise ValueError(f"Seeded batch runs start at a multiple of {SEED_BLOCK_GAMES} games")
+    num_players = len(names)
+    strategies = [create_batch_strategy(name) for name in names]
+    blocks: list[tuple[int, int, np.random.Generator | None]]
+    if seed is None:
+        blocks = [(first_game, num_games, None)]
+    else:
+        blocks = [
+            (
+                start,
+                min(SEED_BLOCK_GAMES, first_game + num_games - start),
+                philox_generator(seed, start // SEED_BLOCK_GAMES, stream=BATCH_STREAM),
+            )
+            for start in range(first_game, first_game + num_games, SEED_BLOCK_GAMES)
+        ]
+
+    stats = SimulationStats(
+        num_players, strategy_names=[strategy.__class__.__name__ for strategy in strategies]
+    )
+    records = []
+    for start, block_games, generator in blocks:
+        result = BatchGame(block_games, num_players, strategies, rng=generator).play()
+        stats.merge(
+            SimulationStats(
+                num_players,
+                num_games=block_games,
+                wins=np.bincount(result.winners, minlength=num_players).tolist(),
+                total_turns=int(result.turn_counts.sum()),
+                turn_histogram=np.bincount(result.turn_counts).tolist(),
+            )
+        )
+        if with_records:
+            block_records = np.zeros(block_games, dtype=result_dtype(num_players))
+            block_records["game"] = np.arange(start, start + block_games)
+            block_records["seats"] = strategy_codes(names)
+            block_records["winner"] = result.winners
+            block_records["turn_count"] = result.turn_counts
+            block_records["positions"] = result.boards
+            records.append(block_records)
+    if with_records:
+        stats.records = np.concatenate(records)
+    logger.info(f"Completed {num_games} games...")
+    return stats
+
+
+def race_games(
+    num_games: int, num_players: int, strategy1: str, strategy2: str, seed: int | None = None
+) -> SimulationStats:
+    """Expected results of the games, from one sampled single-player distribution per strategy.
+
+    Wins and turns are the expected values for the number of games, rounded to whole games:
+    the games are shared out over the seats by largest remainder, so the wins add up to them.
+    """
+    names = seat_strategies(num_players, strategy1, strategy2)
+    # every strategy plays its own board, one distribution per strategy covers all seats
+    distributions = {
+        name: sample_turns_distribution(
+            create_batch_strategy(name),
+            num_games,
+            None if seed is None else philox_generator(seed, index, stream=RACE_STREAM),
+        )
+        for index, name in enumerate(dict.fromkeys(names))
+    }
+    logger.info(f"Sampled {num_games} single-player games per strategy")
+
+    result = race([distributions[name] for name in names])
+    return SimulationStats(
+        num_players,
+        strategy_names=[create_batch_strategy(name).__class__.__name__ for name in names],
+        num_games=num_games,
+        wins=_share_games(result.win_probabilities, num_games),
+        total_turns=round(result.expected_turn_count * num_games),
+    )
+
+
+def _share_games(probabilities: list[float], num_games: int) -> list[int]:
+    """Whole games per seat closest to the expected wins, adding up to ``num_games``."""
+    expected = [p * num_games for p in probabilities]
+    wins = [math.floor(games) for games in expected]
+    by_remainder = sorted(range(len(wins)), key=lambda seat: wins[seat] - expected[seat])
+    for seat in by_remainder[: num_games - sum(wins)]:
+        wins[seat] += 1
+    return wins
+
+
+def split_games(
+    num_games: int, workers: int, block: int = 1, max_size: int | None = None
+) -> list[tuple[int, int]]:
+    """Split a run into chunks of whole blocks, several per worker.
+
+    Args:
+        num_games: Number of games of the run
+        workers: Number of workers
+        block: Chunks hold a multiple of this number of games, except the last one
+        max_size: Upper bound of the chunk size, rounded up to whole blocks
+
+    Returns:
+        list[tuple[int, int]]: Index of the first game and number of games of every chunk
+    """
+    chunk_size = math.ceil(num_games / (workers * _CHUNKS_PER_WORKER))
+    if max_size is not None:
+        chunk_size = min(chunk_size, max_size)
+    chunk_size = max(math.ceil(chunk_size / block), 1) * block
+    return [
+        (start, min(chunk_size, num_games - start)) for start in range(0, num_games, chunk_size)
+    ]
+
+
+_ENGINE_RUNNERS = {"classic": play_classic_games, "batch": play_batch_games}
+LINEUP_RUNNERS = {"classic": play_classic_lineup, "batch": play_batch_lineup}
+
+
+def _init_worker() -> None:
+    # forked workers inherit the state of the parent's generator, draw fresh seeds instead
+    random.seed()
+
+
+_Chunk = tuple[str, int, int, str, str, int | None, int, bool, bool, bool, bool]
+
+
+def _play_chunk(args: _Chunk) -> SimulationStats:
+    engine, run_args = args[0], args[1:]
+    return _ENGINE_RUNNERS[engine](*run_args)
+
+
+def _play_chunk_in_thread(args: _Chunk) -> SimulationStats:
+    """Play a chunk without shared state: own generator, own logger, no display."""
+    engine, run_args = args[0], args[1:]
+    if engine == "batch":
+        # every BatchGame owns its NumPy generator
+        return play_batch_games(*run_args)
+    thread_logger = logging.getLogger(f"{logger.name}.{threading.current_thread().name}")
+    return play_classic_games(
+        *run_args,
+        rng=random.Random(),  # noqa: S311
+        game_logger=thread_logger,
+    )
+
+
+def run_games(  # noqa: PLR0913
+    num_games: int,
+    num_players: int = 2,
+    strategy1: str = "random",
+    strategy2: str = "random",
+    engine: str = "classic",
+    workers: int | None = None,
+    executor: str = "process",
+    seed: int | None = None,
+    sink: ResultSink | None = None,
+    profile: bool = False,
+    replay: ReplayWriter | None = None,
+    checkpoint: Checkpointer | None = None,
+    cache_decisions: bool = False,
+) -> SimulationStats:
+    """Play the games, split in chunks over a pool of worker processes or threads.
+
+    Args:
+        num_games: Number of games
+        num_players: Number of players per game
+        strategy1: Strategy of the first player
+        strategy2: Strategy of the second player, the others play randomly
+        engine: ``classic``, ``batch`` or ``race`` (always runs in the calling process)
+        workers: Number of workers (default: all cores)
+        executor: ``process`` pool, or ``thread`` pool for free-threaded Python builds, where
+            every worker owns its generator and logger
+        seed: Seed of the run, the results do not depend on the number of workers
+        sink: Destination of the result of every game, written chunk by chunk of at most
+            ``SINK_CHUNK_GAMES`` games
+        profile: Time the phases of every turn in ``SimulationStats.profile``, classic engine only
+        replay: Destination of the turns of every game, written chunk by chunk of at most
+            ``REPLAY_CHUNK_GAMES`` games, classic engine only
+        checkpoint: Saves the statistics after chunks of at most ``CHECKPOINT_CHUNK_GAMES``
+            games, and resumes from its checkpoint of the same run
+        cache_decisions: Cache the decisions of the deterministic strategies in every worker,
+            classic engine only
+
+    Returns:
+        SimulationStats: Merged statistics of all games
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    _check_options(engine, executor, profile, sink, replay, checkpoint, cache_decisions)
+    if engine == "race":
+        if sink is not None or checkpoint is not None:
+            raise ValueError("The race engine does not play games, it has no per-game results")
+        return race_games(num_games, num_players, strategy1, strategy2, seed)
+
+    workers = workers or os.cpu_count() or 1
+    parallel = workers > 1 and num_games >= MIN_PARALLEL_GAMES[engine]
+    if not parallel and sink is None and replay is None and checkpoint is None:
+        return _ENGINE_RUNNERS[engine](
+            num_games,
+            num_players,
+            strategy1,
+            strategy2,
+            seed,
+            profile=profile,
+            cache_decisions=cache_decisions,
+        )
+
+    stats = _start_run(
+        checkpoint,
+        num_players,
+        num_games=num_games,
+        strategies=[strategy1, strategy2],
+        engine=engine,
+        seed=seed,
+    )
+    first = stats.num_games
+    # chunks of whole blocks for seeded batch runs
+    block = SEED_BLOCK_GAMES if seed is not None and engine == "batch" else 1
+    max_size = _max_chunk_games(engine, sink, replay, checkpoint)
+    with_records = sink is not None
+    record_turns = replay is not None
+    chunks: list[_Chunk] = [
+        (
+            engine,
+            size,
+            num_players,
+            strategy1,
+            strategy2,
+            seed,
+            first + start,
+            with_records,
+            profile,
+            record_turns,
+            cache_decisions,
+        )
+        for start, size in split_games(
+            num_games - first, workers if parallel else 1, block, max_size
+        )
+    ]
+
+    if not parallel:
+        for chunk in chunks:
+            _merge_chunk(stats, _play_chunk(chunk), sink, replay, checkpoint)
+    else:
+        logger.info(f"Playing {num_games} games in {len(chunks)} chunks on {workers} workers")
+        pool, play = _create_pool(executor, workers)
+        with pool:
+            for chunk_stats in pool.map(play, chunks):
+                _merge_chunk(stats, chunk_stats, sink, replay, checkpoint)
+                logger.info(f"Completed {stats.num_games} games...")
+    if checkpoint is not None:
+        checkpoint.save(stats)
+    return stats
+
+
+def _start_run(
+    checkpoint: Checkpointer | None, num_players: int, **settings: object
+) -> SimulationStats:
+    """Statistics to start a run from: those of its checkpoint when it is resumed."""
+    stats = None
+    if checkpoint is not None:
+        stats = checkpoint.start({"num_players": num_players, **settings})
+    return stats or SimulationStats(num_players)
+
+
+def _check_options(  # noqa: PLR0913
+    engine: str,
+    executor: str,
+    profile: bool,
+    sink: ResultSink | None,
+    replay: ReplayWriter | None,
+    checkpoint: Checkpointer | None,
+    cache_decisions: bool = False,
+) -> None:
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor}")
+    if profile and engine != "classic":
+        raise ValueError("Profiling times the turns of Game, use the classic engine")
+    if replay is not None and engine != "classic":
+        raise ValueError("Replays record the turns of Game, use the classic engine")
+    if cache_decisions and engine != "classic":
+        raise ValueError("Decision caches wrap the strategies of Game, use the classic engine")
+    if checkpoint is not None and (sink is not None or replay is not None):
+        raise ValueError("A checkpoint cannot resume the files of a sink or a replay")
+
+
+def _max_chunk_games(
+    engine: str,
+    sink: ResultSink | None,
+    replay: ReplayWriter | None,
+    checkpoint: Checkpointer | None,
+) -> int | None:
+    """Upper bound of the chunk size: the memory of the records, the progress between saves."""
+    sizes = [
+        size
+        for size, used in (
+            (SINK_CHUNK_GAMES, sink is not None),
+            (REPLAY_CHUNK_GAMES, replay is not None),
+            (CHECKPOINT_CHUNK_GAMES[engine], checkpoint is not None),
+        )
+        if used
+    ]
+    return min(sizes, default=None)
+
+
+def _merge_chunk(
+    stats: SimulationStats,
+    chunk_stats: SimulationStats,
+    sink: ResultSink | None,
+    replay: ReplayWriter | None = None,
+    checkpoint: Checkpointer | None = None,
+) -> None:
+    if sink is not None and chunk_stats.records is not None:
+        sink.write(chunk_stats.records)
+    if replay is not None and chunk_stats.turn_log is not None:
+        replay.write(chunk_stats.turn_log)
+    stats.merge(chunk_stats)
+    if checkpoint is not None:
+        checkpoint.update(stats)
+
+
+def _create_pool(
+    executor: str, workers: int
+) -> tuple[Executor, Callable[[_Chunk], SimulationStats]]:
+    if executor == "thread":
+        return ThreadPoolExecutor(workers, thread_name_prefix="worker"), _play_chunk_in_thread
+    return ProcessPoolExecutor(workers, initializer=_init_worker), _play_chunk
+
+
+def run_games_until(  # noqa: PLR0913
+    rule: StoppingRule,
+    num_players: int = 2,
+    strategy1: str = "random",
+    strategy2: str = "random",
+    engine: str = "classic",
+    workers: int | None = None,
+    executor: str = "process",
+    seed: int | None = None,
+    sink: ResultSink | None = None,
+    profile: bool = False,
+    replay: ReplayWriter | None = None,
+    checkpoint: Checkpointer | None = None,
+    cache_decisions: bool = False,
+) -> tuple[SimulationStats, str]:
+    """Play chunks of games until the stopping rule is met.
+
+    The rule is checked after every chunk of ``STOPPING_CHUNK_GAMES`` games, in the order of the
+    games. Workers keep two chunks each in flight, chunks that are no longer needed are dropped.
+    A seeded run that stops on a game count or on its precision plays the same games for any
+    number of workers.
+
+    Args:
+        rule: When to stop
+        num_players: Number of players per game
+        strategy1: Strategy of the first player
+        strategy2: Strategy of the second player, the others play randomly
+        engine: ``classic`` or ``batch``
+        workers: Number of workers (default: all cores)
+        executor: ``process`` or ``thread`` pool
+        seed: Seed of the run
+        sink: Destination of the result of every game
+        profile: Time the phases of every turn, classic engine only
+        replay: Destination of the turns of every game, classic engine only
+        checkpoint: Saves the statistics and the seconds played, and resumes from its
+            checkpoint of the same run
+        cache_decisions: Cache the decisions of the deterministic strategies, classic engine only
+
+    Returns:
+        tuple[SimulationStats, str]: Merged statistics of the games played and why the run stopped
+    """
+    if engine not in _ENGINE_RUNNERS:
+        raise ValueError(f"Engine {engine} cannot stop early, use classic or batch")
+    _check_options(engine, executor, profile, sink, replay, checkpoint, cache_decisions)
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = STOPPING_CHUNK_GAMES[engine]
+    if seed is not None and engine == "batch":
+        chunk_size = math.ceil(chunk_size / SEED_BLOCK_GAMES) * SEED_BLOCK_GAMES
+    chunk_size = min(chunk_size, _max_chunk_games(engine, sink, replay, checkpoint) or chunk_size)
+
+    stats = _start_run(
+        checkpoint,
+        num_players,
+        rule=asdict(rule),
+        strategies=[strategy1, strategy2],
+        engine=engine,
+        seed=seed,
+    )
+    started = time.monotonic() - (checkpoint.elapsed_before if checkpoint is not None else 0.0)
+
+    def chunks() -> Iterator[_Chunk]:
+        start = stats.num_games
+        while rule.max_games is None or start < rule.max_games:
+            size = chunk_size if rule.max_games is None else min(chunk_size, rule.max_games - start)
+            with_records = sink is not None
+            record_turns = replay is not None
+            yield (
+                engine,
+                size,
+                num_players,
+                strategy1,
+                strategy2,
+                seed,
+                start,
+                with_records,
+                profile,
+                record_turns,
+                cache_decisions,
+            )
+            start += size
+
+    # a resumed run may have met its rule before it stopped
+    reason = rule.reason(stats.wins, stats.num_games, time.monotonic() - started)
+    if stats.num_games == 0 or reason is None:
+        if workers == 1:
+            results: Iterable[SimulationStats] = map(_play_chunk, chunks())
+            reason = _merge_until(rule, stats, results, sink, replay, checkpoint, started)
+        else:
+            pool, play = _create_pool(executor, workers)
+            with pool, contextlib.closing(_ahead(pool, play, chunks(), 2 * workers)) as ahead:
+                reason = _merge_until(rule, stats, ahead, sink, replay, checkpoint, started)
+    if checkpoint is not None:
+        checkpoint.save(stats)
+    return stats, reason
+
+
+def _ahead(
+    pool: Executor,
+    play: Callable[[_Chunk], SimulationStats],
+    chunks: Iterator[_Chunk],
+    in_flight: int,
+) -> Generator[SimulationStats]:
+    """Results of the chunks in order, with a bounded number submitted ahead to the pool."""
+    pending: deque[Future[SimulationStats]] = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(play, chunk))
+            if len(pending) >= in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _merge_until(  # noqa: PLR0913
+    rule: StoppingRule,
+    stats: SimulationStats,
+    results: Iterable[SimulationStats],
+    sink: ResultSink | None,
+    replay: ReplayWriter | None,
+    checkpoint: Checkpointer | None,
+    started: float,
+) -> str:
+    for chunk_stats in results:
+        _merge_chunk(stats, chunk_stats, sink, replay, checkpoint)
+        logger.info(f"Completed {stats.num_games} games...")
+        reason = rule.reason(stats.wins, stats.num_games, time.monotonic() - started)
+        if reason is not None:
+            return reason
+    return f"maximum of {stats.num_games} games played"
@@ -0,0 +1,172 @@
+"""Streaming sinks for per-game results, so that large runs never hold their results in memory.
+
+The engines describe the games of a chunk as a NumPy record array of ``result_dtype``: the index
+of the game, the strategy of every seat, the winning seat, the turn count and the final peg
+positions. A sink appends every chunk to its file as soon as it is played:
+
+- ``JsonlSink``: one JSON object per game and line, for any tool that reads JSON
+- ``BinarySink``: the fixed-width records as they are, behind a small JSON header. The file is
+  append-only and ``read_results`` maps it back without loading it.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Self, TextIO
+
+import numpy as np
+
+from opaprikkie_sim.batch import NUM_TARGETS
+from opaprikkie_sim.strategy import STRATEGIES_NAME_MAPPING
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    import numpy.typing as npt
+
+BINARY_MAGIC: bytes = b"OPASIM1\n"
+# Bytes per write of the text and binary files
+_WRITE_BUFFER: int = 1 << 20
+# The strategy of a seat is stored as its index in this list
+STRATEGY_CODES: list[str] = list(STRATEGIES_NAME_MAPPING)
+
+
+def result_dtype(num_players: int) -> np.dtype[Any]:
+    """Fixed-width record of one game with the given number of players."""
+    return np.dtype(
+        [
+            ("game", "<u8"),
+            ("seats", "u1", (num_players,)),
+            ("winner", "u1"),
+            ("turn_count", "<u4"),
+            ("positions", "u1", (num_players, NUM_TARGETS)),
+        ]
+    )
+
+
+def strategy_codes(strategy_names: list[str]) -> list[int]:
+    """Codes of the strategies of the seats, see ``STRATEGY_CODES``."""
+    return [STRATEGY_CODES.index(name.lower()) for name in strategy_names]
+
+
+class ResultSink(ABC):
+    """Destination of the per-game results of a run, used as a context manager."""
+
+    def __init__(self, path: str | Path, num_players: int, seed: int | None = None):
+        """Open the sink.
+
+        Args:
+            path: File to write to, an existing file is replaced
+            num_players: Number of players per game
+            seed: Seed of the run, stored with the results
+        """
+        self.path = Path(path)
+        self.num_players = num_players
+        self.seed = seed
+        self.num_games = 0
+
+    @abstractmethod
+    def write(self, records: npt.NDArray[np.void]) -> None:
+        """Append the records of a chunk of games."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and close the file."""
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class JsonlSink(ResultSink):
+    """Writes one JSON object per game and line."""
+
+    def __init__(self, path: str | Path, num_players: int, seed: int | None = None):
+        super().__init__(path, num_players, seed)
+        self.file: TextIO = self.path.open("w", buffering=_WRITE_BUFFER, encoding="utf-8")
+
+    def write(self, records: npt.NDArray[np.void]) -> None:
+        lines = [
+            json.dumps(
+                {
+                    "game": game,
+                    "seed": self.seed,
+                    "strategies": [STRATEGY_CODES[code] for code in seats],
+                    "winner": winner,
+                    "turn_count": turn_count,
+                    "positions": positions,
+                }
+            )
+            for game, seats, winner, turn_count, positions in zip(
+                records["game"].tolist(),
+                records["seats"].tolist(),
+                records["winner"].tolist(),
+                records["turn_count"].tolist(),
+                records["positions"].tolist(),
+                strict=True,
+            )
+        ]
+        if lines:
+            self.file.write("\n".join(lines) + "\n")
+        self.num_games += len(lines)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class BinarySink(ResultSink):
+    """Appends the fixed-width records to a binary file behind a JSON header."""
+
+    def __init__(self, path: str | Path, num_players: int, seed: int | None = None):
+        super().__init__(path, num_players, seed)
+        self.dtype = result_dtype(num_players)
+        self.file: BinaryIO = self.path.open("wb", buffering=_WRITE_BUFFER)
+        header = json.dumps(
+            {"num_players": num_players, "seed": seed, "strategies": STRATEGY_CODES}
+        ).encode()
+        self.file.write(BINARY_MAGIC + struct.pack("<I", len(header)) + header)
+
+    def write(self, records: npt.NDArray[np.void]) -> None:
+        self.file.write(records.astype(self.dtype, copy=False).tobytes())
+        self.num_games += len(records)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+SINKS: dict[str, type[ResultSink]] = {"jsonl": JsonlSink, "binary": BinarySink}
+
+
+def read_results(path: str | Path) -> tuple[dict[str, Any], npt.NDArray[np.void]]:
+    """Map the records of a ``BinarySink`` file without loading them.
+
+    Returns:
+        tuple[dict[str, Any], np.ndarray]: Header of the file and the records of all games
+
+    Raises:
+        ValueError: If the file was not written by a ``BinarySink``.
+    """
+    path = Path(path)
+    with path.open("rb") as file:
+        if file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"Not a binary results file: {path}")
+        (length,) = struct.unpack("<I", file.read(4))
+        header: dict[str, Any] = json.loads(file.read(length))
+    offset = len(BINARY_MAGIC) + 4 + length
+    dtype = result_dtype(header["num_players"])
+    records: npt.NDArray[np.void]
+    if path.stat().st_size == offset:
+        records = np.empty(0, dtype=dtype)
+    else:
+        records = np.memmap(path, dtype=dtype, mode="r", offset=offset)
+    return header, records
@@ -0,0 +1,471 @@
+"""Exact solver for the single-player game: the policy with the fewest expected turns.
+
+Peg positions only ever go up, so the boards of one player form a DAG. Boards are grouped in
+layers by their total progress (the sum of all peg positions); every move leads to a higher
+layer, so all layers can be solved in one backward pass, from the finished board down to the
+empty one. Within a board, a turn without progress stays on the same board, and that self-loop
+is solved exactly with a few rounds of policy iteration per board.
+
+For a board ``s`` and a target ``t`` with an open peg, let ``p0[t]`` be the probability that a
+turn for ``t`` makes no moves and ``R[t]`` the expected value of the boards the other outcomes
+lead to. Saving for ``t`` is then worth ``Q[t] = p0[t] * V(s) + R[t]``, and the best choice for
+a roll is the available target with the lowest ``Q``, or skipping the turn (worth ``V(s)``) when
+no target beats it. Sorting the targets by ``Q`` turns the expectation over all rolls into a sum
+over the sorted targets, weighted with the probability that a target is the first available one.
+Those weights come from ``P(none of the targets in S is available)`` for all 4096 target sets.
+
+Boards are indexed in mixed radix: peg ``t`` contributes ``position * (row_height + 1)**(t-1)``.
+The full game (row height 5) has ``6**12`` (about 2.2 billion) boards, which takes about 9 GB
+for the values and 17 GB for the policy, so the tables can be written straight into ``.npy``
+files that are memory-mapped by all worker processes.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+
+from opaprikkie_sim.constants import MAX_DICE_NUM, MAX_ROW_HEIGHT, MIN_DICE_NUM, NUMBER_OF_DICE
+from opaprikkie_sim.roll_table import multiset_probabilities, targets_for_key
+from opaprikkie_sim.turn_table import turn_outcome_distribution
+from opaprikkie_sim.utilities import init_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    import numpy.typing as npt
+
+    from opaprikkie_sim.board import Board
+
+logger = init_logger(__name__)
+
+NUM_TARGETS: int = 2 * MAX_DICE_NUM
+
+# The policy keeps the targets of every board in order of preference, four bits per rank.
+# Targets that are never worth saving for (finished pegs, or worse than skipping) are left out.
+RANK_BITS: int = 4
+NO_TARGET: int = (1 << RANK_BITS) - 1
+
+VALUES_FILE = "values.npy"
+POLICY_FILE = "policy.npy"
+
+# Environment variable with a directory of solved tables, one ``h<row height>`` directory each
+SOLUTION_DIR_ENV = "OPAPRIKKIE_SOLUTION_DIR"
+
+# Games with at most this many boards are solved on first use instead of loaded from disk
+MAX_ON_DEMAND_STATES: int = 4**NUM_TARGETS
+
+# Upper bound on the boards handled at once by one worker
+_CHUNK_STATES: int = 1 << 16
+_MAX_POLICY_ITERATIONS: int = 50
+_PARALLEL_MIN_STATES: int = 1 << 20
+
+
+def num_states(row_height: int) -> int:
+    """Number of distinct boards of one player."""
+    return int((row_height + 1) ** NUM_TARGETS)
+
+
+def state_index(positions: Iterable[int], row_height: int) -> int:
+    """Index of the board with the given positions of pegs 1 to 12 in the solver tables."""
+    index = 0
+    for position in reversed(list(positions)):
+        index = index * (row_height + 1) + position
+    return index
+
+
+def board_index(board: Board) -> int:
+    """Index of the board in the solver tables, missing pegs count as finished."""
+    return state_index(
+        (
+            board.get_position(target) if board.is_peg_movable(target) else board.row_height
+            for target in range(MIN_DICE_NUM, NUM_TARGETS + 1)
+        ),
+        board.row_height,
+    )
+
+
+@functools.cache
+def availability_table(num_dice: int = NUMBER_OF_DICE) -> npt.NDArray[np.float64]:
+    """Probability that a roll offers none of the targets in a set.
+
+    Returns:
+        ``(4096,)`` array indexed by a bit mask of targets, bit ``t - 1`` for target ``t``.
+    """
+    masks = []
+    probabilities = []
+    for key, probability in multiset_probabilities(num_dice).items():
+        masks.append(sum(1 << (target - 1) for target in targets_for_key(key)))
+        probabilities.append(probability)
+
+    target_sets = np.arange(1 << NUM_TARGETS, dtype=np.int64)
+    miss = (target_sets[:, None] & np.array(masks, dtype=np.int64)) == 0
+    availability: npt.NDArray[np.float64] = miss.astype(np.float64) @ np.array(probabilities)
+    return availability
+
+
+@functools.cache
+def move_probabilities(num_dice: int = NUMBER_OF_DICE) -> npt.NDArray[np.float64]:
+    """Probability of every number of moves of a turn.
+
+    Returns:
+        ``(moves, 12)`` array where column ``t - 1`` holds the distribution for target ``t``.
+    """
+    distributions = [
+        turn_outcome_distribution(target, num_dice)
+        for target in range(MIN_DICE_NUM, NUM_TARGETS + 1)
+    ]
+    table = np.zeros((max(map(len, distributions)), NUM_TARGETS))
+    for column, distribution in enumerate(distributions):
+        table[: len(distribution), column] = [float(p) for p in distribution]
+    return table
+
+
+def pack_policy(
+    order: npt.NDArray[np.intp], usable: npt.NDArray[np.bool_]
+) -> npt.NDArray[np.uint64]:
+    """Pack per-board target preferences (0-based target columns) into one integer per board."""
+    nibbles = np.where(usable, order, NO_TARGET).astype(np.uint64)
+    shifts = (RANK_BITS * np.arange(NUM_TARGETS)).astype(np.uint64)
+    packed: npt.NDArray[np.uint64] = np.bitwise_or.reduce(nibbles << shifts, axis=1)
+    return packed
+
+
+def unpack_policy(policy: npt.NDArray[np.uint64]) -> npt.NDArray[np.int8]:
+    """Unpack ``(...)`` policy integers into ``(..., 12)`` target columns, -1 after the last."""
+    shifts = (RANK_BITS * np.arange(NUM_TARGETS)).astype(np.uint64)
+    nibbles = ((policy[..., None] >> shifts) & np.uint64(NO_TARGET)).astype(np.int8)
+    nibbles[nibbles == NO_TARGET] = -1
+    return nibbles
+
+
+@dataclass
+class SolitaireSolution:
+    """Solved single-player game: the expected turns and best choices for every board."""
+
+    row_height: int
+    values: npt.NDArray[np.float32]  # (boards,) expected turns to finish with optimal play
+    policy: npt.NDArray[np.uint64] | None = None  # (boards,) packed target preferences
+
+    def expected_turns(self, board: Board) -> float:
+        """Expected number of turns to finish the board with optimal play."""
+        return float(self.values[board_index(board)])
+
+    def choose_target(self, board: Board, available_targets: Iterable[int]) -> int | None:
+        """Best target for the board among the rolled targets, None to skip the turn."""
+        available = set(available_targets)
+        for column in self.preferences(board_index(board)):
+            if column + 1 in available:
+                return column + 1
+        return None
+
+    def preferences(self, index: int) -> list[int]:
+        """Target columns of a board in order of preference, best first."""
+        if self.policy is not None:
+            return [int(c) for c in unpack_policy(self.policy[index]) if c >= 0]
+        order, usable = self._solver.rank_targets(np.array([index], dtype=np.int64))
+        return [int(c) for c, use in zip(order[0], usable[0], strict=True) if use]
+
+    @functools.cached_property
+    def _solver(self) -> _LayerSolver:
+        return _LayerSolver(self.row_height, self.values)
+
+    def save(self, directory: str | Path) -> None:
+        """Store the tables as ``.npy`` files in the directory."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / VALUES_FILE, self.values)
+        if self.policy is not None:
+            np.save(directory / POLICY_FILE, self.policy)
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap: bool = True) -> SolitaireSolution:
+        """Load tables stored with ``save`` or written by ``solve``, memory-mapped by default."""
+        directory = Path(directory)
+        mode: Literal["r"] | None = "r" if mmap else None
+        values = np.load(directory / VALUES_FILE, mmap_mode=mode)
+        policy = None
+        if (directory / POLICY_FILE).exists():
+            policy = np.load(directory / POLICY_FILE, mmap_mode=mode)
+        row_height = round(values.size ** (1 / NUM_TARGETS)) - 1
+        if num_states(row_height) != values.size:
+            raise ValueError(f"{directory} does not hold a complete value table")
+        return cls(row_height=row_height, values=values, policy=policy)
+
+
+class BoardLayers:
+    """All boards of a row height by solver index, in layers of total progress."""
+
+    def __init__(self, row_height: int, chunk_states: int = _CHUNK_STATES):
+        self.row_height = row_height
+        self.chunk_states = chunk_states
+        self.powers = (row_height + 1) ** np.arange(NUM_TARGETS, dtype=np.int64)
+        # boards are split in pegs 1-6 and 7-12, half boards are grouped by their progress
+        half = NUM_TARGETS // 2
+        half_digits = np.arange((row_height + 1) ** half)[:, None] // self.powers[:half]
+        half_progress = (half_digits % (row_height + 1)).sum(axis=1)
+        self.by_progress = [
+            np.nonzero(half_progress == progress)[0] for progress in range(half * row_height + 1)
+        ]
+        self.high_factor = int(self.powers[half])
+
+    @property
+    def num_layers(self) -> int:
+        """Number of layers, from the empty board (0) to the finished board."""
+        return NUM_TARGETS * self.row_height + 1
+
+    def positions(self, index: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        """``(boards, 12)`` peg positions of board indices."""
+        positions: npt.NDArray[np.int64] = index[:, None] // self.powers % (self.row_height + 1)
+        return positions
+
+    def chunks(self, progress: int) -> Iterator[tuple[int, int, int, int]]:
+        """Split a layer in chunks of ``(low progress, high progress, start, stop)``."""
+        max_half = len(self.by_progress) - 1
+        for low in range(max(0, progress - max_half), min(progress, max_half) + 1):
+            high = progress - low
+            step = max(1, self.chunk_states // self.by_progress[low].size)
+            for start in range(0, self.by_progress[high].size, step):
+                yield low, high, start, min(start + step, self.by_progress[high].size)
+
+    def layer(self, progress: int) -> npt.NDArray[np.int64]:
+        """Sorted indices of all boards of a layer."""
+        chunks = [self.indices(*chunk) for chunk in self.chunks(progress)]
+        return np.sort(np.concatenate(chunks))
+
+    def indices(self, low: int, high: int, start: int, stop: int) -> npt.NDArray[np.int64]:
+        """Board indices of a chunk."""
+        highs = self.by_progress[high][start:stop, None] * self.high_factor
+        index: npt.NDArray[np.int64] = (self.by_progress[low][None, :] + highs).ravel()
+        return index
+
+
+class _LayerSolver:
+    """Solves chunks of boards whose successors are already solved."""
+
+    def __init__(
+        self,
+        row_height: int,
+        values: npt.NDArray[np.float32],
+        policy: npt.NDArray[np.uint64] | None = None,
+        num_dice: int = NUMBER_OF_DICE,
+    ):
+        self.row_height = row_height
+        self.values = values
+        self.policy = policy
+        self.moves = move_probabilities(num_dice)
+        self.availability = availability_table(num_dice)
+        self.layers = BoardLayers(row_height)
+        self.powers = self.layers.powers
+
+    def successor_values(
+        self, index: npt.NDArray[np.int64]
+    ) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.float64]]:
+        """Open pegs and ``R``: expected value over the turns that make progress, per target."""
+        positions = self.layers.positions(index)
+        open_pegs = positions < self.row_height
+        remaining = self.row_height - positions
+        expected = np.zeros(positions.shape)
+        for moves in range(1, self.moves.shape[0]):
+            successors = index[:, None] + np.minimum(moves, remaining) * self.powers
+            expected += self.moves[moves] * self.values[successors]
+        # finished pegs point at the board itself, which is not solved yet
+        return open_pegs, np.where(open_pegs, expected, 0.0)
+
+    def rank_targets(
+        self, index: npt.NDArray[np.int64]
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.bool_]]:
+        """Targets of solved boards in order of preference, and which of them beat skipping."""
+        open_pegs, expected = self.successor_values(index)
+        value = self.values[index].astype(np.float64)
+        return self._rank(value, open_pegs, expected)
+
+    def _rank(
+        self,
+        value: npt.NDArray[np.float64],
+        open_pegs: npt.NDArray[np.bool_],
+        expected: npt.NDArray[np.float64],
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.bool_]]:
+        q = self.moves[0] * value[:, None] + expected
+        usable = open_pegs & (q < value[:, None])
+        # the best target always beats skipping, guard against rounding
+        best = np.where(open_pegs, q, np.inf).argmin(axis=1)
+        usable[np.arange(value.size), best] = True
+        order = np.argsort(np.where(usable, q, np.inf), axis=1, kind="stable")
+        return order, np.take_along_axis(usable, order, axis=1)
+
+    def _value(
+        self,
+        order: npt.NDArray[np.intp],
+        usable: npt.NDArray[np.bool_],
+        expected: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        """Value of every board when saving for the first available target in the order."""
+        target_sets = np.cumsum(np.where(usable, 1 << order, 0), axis=1)
+        none_available = self.availability[target_sets]
+        previous = np.concatenate([np.ones((order.shape[0], 1)), none_available[:, :-1]], axis=1)
+        # probability that each target is the first available one of the order
+        first = previous - none_available
+        progress = (first * (1 - self.moves[0][order])).sum(axis=1)
+        value: npt.NDArray[np.float64] = (
+            1 + (first * np.take_along_axis(expected, order, axis=1)).sum(axis=1)
+        ) / progress
+        return value
+
+    def solve_chunk(self, low: int, high: int, start: int, stop: int) -> None:
+        """Solve all boards of a chunk and store their values and policy."""
+        index = self.layers.indices(low, high, start, stop)
+        open_pegs, expected = self.successor_values(index)
+
+        # policy iteration, starting from the order of the expected turns per progress
+        initial = np.where(open_pegs, expected / (1 - self.moves[0]), np.inf)
+        order = np.argsort(initial, axis=1, kind="stable")
+        usable = np.take_along_axis(open_pegs, order, axis=1)
+        value = self._value(order, usable, expected)
+        for _ in range(_MAX_POLICY_ITERATIONS):
+            order, usable = self._rank(value, open_pegs, expected)
+            improved = self._value(order, usable, expected)
+            if np.all(improved >= value * (1 - 1e-12)):
+                break
+            value = np.minimum(value, improved)
+
+        self.values[index] = value
+        if self.policy is not None:
+            self.policy[index] = pack_policy(order, usable)
+
+
+# Solver of a worker process, attached to the memory-mapped tables
+_worker_solver: _LayerSolver | None = None
+
+
+def _init_worker(directory: str, row_height: int, num_dice: int, with_policy: bool) -> None:
+    global _worker_solver  # noqa: PLW0603
+    values = np.load(Path(directory) / VALUES_FILE, mmap_mode="r+")
+    policy = np.load(Path(directory) / POLICY_FILE, mmap_mode="r+") if with_policy else None
+    _worker_solver = _LayerSolver(row_height, values, policy, num_dice)
+
+
+def _solve_worker_chunk(chunk: tuple[int, int, int, int]) -> None:
+    assert _worker_solver is not None
+    _worker_solver.solve_chunk(*chunk)
+
+
+def _allocate_tables(
+    total: int, directory: Path | None, with_policy: bool
+) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.uint64] | None]:
+    """Value and policy tables, in memory or as ``.npy`` files in the directory."""
+    if directory is None:
+        policy = np.zeros(total, dtype=np.uint64) if with_policy else None
+        return np.zeros(total, dtype=np.float32), policy
+    directory.mkdir(parents=True, exist_ok=True)
+    values = np.lib.format.open_memmap(directory / VALUES_FILE, "w+", np.float32, (total,))
+    if with_policy:
+        return values, np.lib.format.open_memmap(directory / POLICY_FILE, "w+", np.uint64, (total,))
+    return values, None
+
+
+def solve(
+    row_height: int = MAX_ROW_HEIGHT,
+    num_dice: int = NUMBER_OF_DICE,
+    workers: int | None = None,
+    directory: str | Path | None = None,
+    with_policy: bool = True,
+) -> SolitaireSolution:
+    """Compute the expected turns and the optimal policy for every board.
+
+    Args:
+        row_height: Height of the board rows
+        num_dice: Number of dice of a roll
+        workers: Number of worker processes (default: all cores)
+        directory: Write the tables into ``.npy`` files in this directory instead of memory
+        with_policy: Also store the preferred targets of every board
+
+    Returns:
+        SolitaireSolution: Memory-mapped when a directory is given
+    """
+    workers = workers or os.cpu_count() or 1
+    total = num_states(row_height)
+    if total < _PARALLEL_MIN_STATES:
+        workers = 1
+    logger.info(f"Solving {total} boards of row height {row_height} with {workers} workers")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # worker processes share the tables through memory-mapped files
+        table_dir = Path(directory) if directory is not None else None
+        if table_dir is None and workers > 1:
+            table_dir = Path(scratch)
+        values, policy = _allocate_tables(total, table_dir, with_policy)
+
+        # the finished board needs no more turns and has no targets left
+        values[total - 1] = 0.0
+        if policy is not None:
+            no_targets = np.zeros((1, NUM_TARGETS), dtype=bool)
+            policy[total - 1] = pack_policy(no_targets.astype(np.intp), no_targets)[0]
+
+        solver = _LayerSolver(row_height, values, policy, num_dice)
+        layers = range(solver.layers.num_layers - 2, -1, -1)
+        if table_dir is None or workers == 1:
+            for progress in layers:
+                for chunk in solver.layers.chunks(progress):
+                    solver.solve_chunk(*chunk)
+        else:
+            init_args = (str(table_dir), row_height, num_dice, with_policy)
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=init_args) as pool:
+                for progress in layers:
+                    # every layer only depends on the layers above it
+                    list(pool.map(_solve_worker_chunk, solver.layers.chunks(progress)))
+                    logger.debug(f"Solved layer {progress}")
+
+        if directory is None and workers > 1:
+            # the scratch files are removed, keep the tables in memory
+            values = np.array(values)
+            policy = np.array(policy) if policy is not None else None
+
+    logger.info(f"Expected turns from an empty board: {values[0]:.4f}")
+    return SolitaireSolution(row_height=row_height, values=values, policy=policy)
+
+
+def _stored_solution(row_height: int) -> Path | None:
+    """Directory of the stored solution for the row height, if there is one."""
+    solution_dir = os.environ.get(SOLUTION_DIR_ENV)
+    if solution_dir:
+        directory = Path(solution_dir) / f"h{row_height}"
+        if (directory / VALUES_FILE).exists():
+            return directory
+    return None
+
+
+def check_solution(row_height: int = MAX_ROW_HEIGHT) -> None:
+    """Check that ``get_solution`` can load the solution for the row height or solve it.
+
+    Raises:
+        FileNotFoundError: If no solution is stored and the game is too large to solve on first use
+    """
+    if _stored_solution(row_height) is None and num_states(row_height) > MAX_ON_DEMAND_STATES:
+        raise FileNotFoundError(
+            f"No solution for row height {row_height}: run `solve --row-height {row_height} "
+            f"--output <dir>/h{row_height}` and set {SOLUTION_DIR_ENV}=<dir>"
+        )
+
+
+@functools.cache
+def get_solution(row_height: int = MAX_ROW_HEIGHT) -> SolitaireSolution:
+    """Solution for the row height, loaded from ``$OPAPRIKKIE_SOLUTION_DIR/h<row height>``.
+
+    Small games that were not solved ahead of time are solved on first use.
+
+    Raises:
+        FileNotFoundError: If no solution is stored and the game is too large to solve on first use
+    """
+    directory = _stored_solution(row_height)
+    if directory is not None:
+        return SolitaireSolution.load(directory)
+    check_solution(row_height)
+    return solve(row_height)
@@ -4,11 +4,20 @@ from __future__ import annotations
 
 import random
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
+from opaprikkie_sim.board import board_key
+from opaprikkie_sim.constants import NUMBER_OF_DICE
+
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from concurrent.futures import Executor
+
     from opaprikkie_sim.board import Board, Peg
-    from opaprikkie_sim.dice import DiceRoll
+    from opaprikkie_sim.dice import DiceRoll, RandomSource
+    from opaprikkie_sim.expectimax import ExpectimaxSearch
+    from opaprikkie_sim.solver import SolitaireSolution
 
 
 class Strategy(ABC):
@@ -25,7 +34,51 @@ class Strategy(ABC):
         pass
 
 
-class RandomStrategy(Strategy):
+class OpponentAwareStrategy(Strategy):
+    """Base class of the strategies that also see the boards of the opponents.
+
+    ``Game`` asks them with ``choose_target_against``. Called without opponents, e.g. by the
+    benchmarks, ``choose_target`` decides as if the player plays alone.
+    """
+
+    @abstractmethod
+    def choose_target_against(
+        self, board: Board, roll: DiceRoll, opponents: Sequence[Board]
+    ) -> int | None:
+        """Choose which target number to save for, knowing the boards of the opponents.
+
+        Args:
+            board: Board of the player
+            roll: Roll of the player
+            opponents: Boards of the opponents, in the order in which they play after the player
+
+        Returns:
+            int | None: The target number to save for in this turn.
+            None if no target can be chosen.
+        """
+        pass
+
+    def choose_target(self, board: Board, roll: DiceRoll) -> int | None:
+        """Choose the target as if there were no opponents."""
+        return self.choose_target_against(board, roll, ())
+
+
+class StochasticStrategy(Strategy):
+    """Base class of the strategies that draw from a generator.
+
+    The same board and roll can give another target, so their decisions are not cached.
+    """
+
+    def __init__(self, rng: RandomSource | None = None):
+        """Initialize the strategy.
+
+        Args:
+            rng: Generator owned by this strategy (default: the shared ``random`` module)
+        """
+        self.rng: RandomSource = rng if rng is not None else random
+
+
+class RandomStrategy(StochasticStrategy):
     """Random strategy - chooses targets randomly from available options."""
 
     def choose_target(self, board: Board, roll: DiceRoll) -> int | None:
@@ -33,20 +86,19 @@ class RandomStrategy(Strategy):
         available_targets = roll.get_available_targets()
 
         # Filter targets that have incomplete pegs
-        valid_targets: list[int] = []
-        for target in available_targets:
-            peg = board.get_peg(target)
-            if peg and not peg.is_at_top():
-                valid_targets.append(target)
+        valid_targets = [target for target in available_targets if board.is_peg_movable(target)]
 
         if not valid_targets:
             return None
 
-        return random.choice(valid_targets)  # noqa: S311
+        return self.rng.choice(valid_targets)
 
 
 class GreedyStrategy(Strategy):
-    """Greedy strategy - always chooses the target that will move a peg the furthest."""
+    """Greedy strategy - always chooses the target that will move a peg the furthest.
+
+    Ties go to the lowest target, the first one of ``DiceRoll.get_available_targets``.
+    """
 
     def choose_target(self, board: Board, roll: DiceRoll) -> int | None:
         """Choose the target that will move a peg the furthest."""
@@ -54,15 +106,12 @@ class GreedyStrategy(Strategy):
         best_target = None
         best_score = -1
 
-        for target in available_targets:
-            peg = board.get_peg(target)
-            if not peg or peg.is_at_top():
+        for target, potential_moves in available_targets.items():
+            if not board.is_peg_movable(target):
                 continue
 
-            potential_moves = available_targets[target]
-
             # Calculate score based on potential moves and current position
-            score = potential_moves * (peg.max_position - peg.position)
+            score = potential_moves * (board.row_height - board.get_position(target))
 
             if score > best_score:
                 best_score = score
@@ -74,7 +123,7 @@ class GreedyStrategy(Strategy):
 class FinishPegsStrategy(Strategy):
     """FinishPegsStrategy strategy - look at moving fast and finishing.
     This strategy prioritizes targets if they can be finished,
-    otherwise it looks to move a peg the furthest.
+    otherwise it looks to move a peg the furthest. Ties go to the lowest target.
     """
 
     def choose_target(self, board: Board, roll: DiceRoll) -> int | None:
@@ -114,9 +163,245 @@ class FinishPegsStrategy(Strategy):
         return base_score + completion_bonus
 
 
-# available strategies: random, greedy, smart
+class OptimalStrategy(Strategy):
+    """Optimal strategy - minimizes the expected number of turns to finish the board.
+    It plays the exact solution of the single-player game (see ``opaprikkie_sim.solver``)
+    and ignores the opponents.
+    """
+
+    def __init__(self, solution: SolitaireSolution | None = None):
+        """Initialize the strategy.
+
+        Args:
+            solution: Solved game to play (default: ``get_solution`` for the row height)
+        """
+        self.solution = solution
+
+    def choose_target(self, board: Board, roll: DiceRoll) -> int | None:
+        """Choose the target with the lowest expected number of remaining turns."""
+        if self.solution is None or self.solution.row_height != board.row_height:
+            from opaprikkie_sim.solver import get_solution
+
+            self.solution = get_solution(board.row_height)
+        return self.solution.choose_target(board, roll.get_available_targets())
+
+
+# Rollouts per target of a decision, and per round of rollouts, see ``RolloutStrategy``
+ROLLOUTS_PER_TARGET: int = 32
+ROLLOUT_BATCH: int = 32
+
+
+class RolloutStrategy(StochasticStrategy):
+    """Rollout strategy - minimizes the turns to finish estimated with Monte Carlo rollouts.
+    Every target is followed by rollouts of the board under a base policy, played in batches
+    (see ``opaprikkie_sim.rollout``), within a budget of rollouts or seconds per decision.
+    It ignores the opponents.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        rng: RandomSource | None = None,
+        base: str = "greedy",
+        rollouts: int = ROLLOUTS_PER_TARGET,
+        batch: int = ROLLOUT_BATCH,
+        time_budget: float | None = None,
+        executor: Executor | None = None,
+        workers: int = 1,
+        num_dice: int = NUMBER_OF_DICE,
+    ):
+        """Initialize the strategy.
+
+        Args:
+            rng: Generator of the seeds of the rollouts (default: the shared ``random`` module)
+            base: Name of the batch strategy that plays the rollouts
+            rollouts: Rollouts per target of a decision
+            batch: Rollouts per target of a round, the time budget is checked between rounds
+            time_budget: Seconds per decision, at least one round is played
+            executor: Pool that plays the rollouts of a round in ``workers`` parts
+            workers: Parts of a round, one per worker of the executor
+            num_dice: Number of dice of the game
+
+        Raises:
+            ValueError: If there is no batch strategy of the base name.
+        """
+        from opaprikkie_sim.batch import BATCH_STRATEGIES_NAME_MAPPING
+
+        if base not in BATCH_STRATEGIES_NAME_MAPPING:
+            raise ValueError(f"Unknown base strategy of the rollouts: {base}")
+        super().__init__(rng)
+        self.base = base
+        self.rollouts = rollouts
+        self.batch = batch
+        self.time_budget = time_budget
+        self.executor = executor
+        self.workers = workers
+        self.num_dice = num_dice
+        self.decisions = 0
+        self.rollouts_played = 0
+
+    def choose_target(self, board: Board, roll: DiceRoll) -> int | None:
+        """Choose the target with the fewest estimated turns to finish the board."""
+        available_targets = roll.get_available_targets()
+        targets = [target for target in available_targets if board.is_peg_movable(target)]
+        if len(targets) <= 1:
+            return targets[0] if targets else None
+
+        from opaprikkie_sim.rollout import board_positions, estimate_targets
+
+        estimate = estimate_targets(
+            board_positions(board),
+            targets,
+            self.rng,
+            self.base,
+            self.rollouts,
+            self.batch,
+            self.time_budget,
+            self.num_dice,
+            board.row_height,
+            self.executor,
+            self.workers,
+        )
+        self.decisions += 1
+        self.rollouts_played += estimate.rollouts * len(targets)
+        return estimate.best_target
+
+
+# Turns searched at most and nodes per decision, and entries of the transposition table
+EXPECTIMAX_DEPTH: int = 3
+EXPECTIMAX_NODES: int = 5000
+EXPECTIMAX_TABLE_ENTRIES: int = 1 << 20
+
+
+class ExpectimaxStrategy(OpponentAwareStrategy):
+    """Expectimax strategy - maximizes the chance to win against the boards of the opponents.
+    It searches the next turns of all players over the rolls and the moves of every turn (see
+    ``opaprikkie_sim.expectimax``), deepening until its node budget per decision is spent.
+    """
+
+    def __init__(
+        self,
+        max_depth: int = EXPECTIMAX_DEPTH,
+        node_budget: int = EXPECTIMAX_NODES,
+        table_entries: int = EXPECTIMAX_TABLE_ENTRIES,
+        num_dice: int = NUMBER_OF_DICE,
+    ):
+        """Initialize the strategy.
+
+        Args:
+            max_depth: Turns to search at most, the decision of the player included
+            node_budget: Nodes per decision, beyond the first turn which is always searched
+            table_entries: Entries of the transposition table, which is cleared when full
+            num_dice: Number of dice of the game
+        """
+        self.max_depth = max_depth
+        self.node_budget = node_budget
+        self.table_entries = table_entries
+        self.num_dice = num_dice
+        self.search: ExpectimaxSearch | None = None
+
+    def choose_target_against(
+        self, board: Board, roll: DiceRoll, opponents: Sequence[Board]
+    ) -> int | None:
+        """Choose the target with the best chance to win the game."""
+        available_targets = roll.get_available_targets()
+        targets = [target for target in available_targets if board.is_peg_movable(target)]
+        if len(targets) <= 1:
+            return targets[0] if targets else None
+
+        if self.search is None or self.search.row_height != board.row_height:
+            from opaprikkie_sim.expectimax import ExpectimaxSearch
+
+            self.search = ExpectimaxSearch(
+                board.row_height,
+                self.max_depth,
+                self.node_budget,
+                self.table_entries,
+                self.num_dice,
+            )
+        return self.search.choose_target([board, *opponents], targets)
+
+
+# Memory of a decision cache by default, and the memory of one entry: key, target and LRU links
+DECISION_CACHE_BYTES: int = 64 << 20
+DECISION_CACHE_ENTRY_BYTES: int = 150
+# Bits of the face-count key of a roll in the key of a decision, see ``roll_table``
+_FACE_KEY_BITS: int = 24
+# Marks a decision that is not in the cache, ``None`` is a cached skipped turn
+_MISSING = object()
+
+
+class CachedStrategy(Strategy):
+    """Remembers the decisions of a deterministic strategy in a bounded LRU cache.
+
+    A decision is looked up by the board (see ``board.board_key``) and the multiset of the
+    rolled faces, so the wrapped strategy must choose the same target for the same board and
+    faces, like the greedy, smart and optimal strategies. The least recently used decision is
+    dropped when the cache is full.
+    """
+
+    def __init__(self, strategy: Strategy, max_bytes: int = DECISION_CACHE_BYTES):
+        """Initialize the cache.
+
+        Args:
+            strategy: Deterministic strategy that makes the decisions
+            max_bytes: Memory of the cache, ``DECISION_CACHE_ENTRY_BYTES`` per decision
+
+        Raises:
+            TypeError: If the strategy makes random choices or sees the opponents.
+        """
+        name = strategy.__class__.__name__
+        if isinstance(strategy, StochasticStrategy):
+            raise TypeError(f"{name} makes random choices, its decisions cannot be cached")
+        if isinstance(strategy, OpponentAwareStrategy):
+            raise TypeError(f"{name} sees the opponents, its decisions cannot be cached")
+        self.strategy = strategy
+        self.max_entries = max(max_bytes // DECISION_CACHE_ENTRY_BYTES, 1)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._decisions: OrderedDict[int, int | None] = OrderedDict()
+
+    def choose_target(self, board: Board, roll: DiceRoll) -> int | None:
+        """Choose the cached target, or the target of the strategy on a miss."""
+        key = board_key(board) << _FACE_KEY_BITS | roll.face_key
+        decisions = self._decisions
+        target = decisions.get(key, _MISSING)
+        if target is not _MISSING:
+            self.hits += 1
+            decisions.move_to_end(key)
+            return target  # type: ignore[return-value]
+
+        self.misses += 1
+        target = self.strategy.choose_target(board, roll)
+        decisions[key] = target
+        if len(decisions) > self.max_entries:
+            decisions.popitem(last=False)
+            self.evictions += 1
+        return target
+
+    @property
+    def num_entries(self) -> int:
+        """Number of cached decisions."""
+        return len(self._decisions)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the decisions that came from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """Forget all decisions and reset the counters."""
+        self._decisions.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+# available strategies: random, greedy, smart, optimal, rollout, expectimax
 STRATEGIES_NAME_MAPPING: dict[str, type[Strategy]] = {
     "random": RandomStrategy,
     "greedy": GreedyStrategy,
     "smart": FinishPegsStrategy,
+    "optimal": OptimalStrategy,
+    "rollout": RolloutStrategy,
+    "expectimax": ExpectimaxStrategy,
 }
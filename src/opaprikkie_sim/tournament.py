@@ -0,0 +1,146 @@
+"""Round-robin tournaments of strategies, over several numbers of players, on one process pool.
+
+For every number of players ``n``, every ordered assignment of the strategies to the ``n`` seats
+is played, except the lineups of a single strategy: with three strategies and three players that
+includes the mixed lineups such as ``("random", "greedy", "smart")``. Every lineup is split in
+chunks of games that all go to one shared queue: a worker that finishes a chunk takes the next
+one, so a slow strategy never leaves the other workers idle. The workers live for the whole
+tournament and play a warm-up game per strategy when they start, so imports and precomputed
+tables are paid once per worker instead of once per matchup.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from opaprikkie_sim.simulation import LINEUP_RUNNERS, SEED_BLOCK_GAMES, SimulationStats, split_games
+from opaprikkie_sim.utilities import init_logger
+
+logger = init_logger(__name__)
+
+# Games per task of the shared queue, small enough to balance the workers
+TOURNAMENT_CHUNK_GAMES: dict[str, int] = {"classic": 100, "batch": 20000}
+
+
+def tournament_lineups(strategy_names: list[str], num_players: int) -> list[tuple[str, ...]]:
+    """Every seating of the strategies in ``num_players`` seats with at least two of them."""
+    return [
+        lineup
+        for lineup in itertools.product(strategy_names, repeat=num_players)
+        if len(set(lineup)) > 1
+    ]
+
+
+@dataclass
+class TournamentResult:
+    """Statistics of every lineup of a tournament."""
+
+    strategy_names: list[str]
+    stats: dict[tuple[str, ...], SimulationStats] = field(default_factory=dict)
+
+    def win_rate_matrix(self, num_players: int) -> list[list[float | None]]:
+        """Win rate of every strategy (row) in the lineups that also seat another one (column).
+
+        The win rate is averaged over all seats of the strategy in these lineups, ``None`` on the
+        diagonal.
+        """
+        lineups = [lineup for lineup in self.stats if len(lineup) == num_players]
+        matrix: list[list[float | None]] = []
+        for strategy in self.strategy_names:
+            row: list[float | None] = []
+            for opponent in self.strategy_names:
+                if opponent == strategy:
+                    row.append(None)
+                    continue
+                wins = games = 0
+                for lineup in lineups:
+                    if opponent not in lineup:
+                        continue
+                    stats = self.stats[lineup]
+                    for seat, name in enumerate(lineup):
+                        if name == strategy:
+                            wins += stats.wins[seat]
+                            games += stats.num_games
+                row.append(wins / games)
+            matrix.append(row)
+        return matrix
+
+
+def _warm_worker(engine: str, strategy_names: list[str]) -> None:
+    # forked workers inherit the state of the parent's generator, draw fresh seeds instead
+    random.seed()
+    # one game per strategy pays the imports and tables of every strategy up front
+    for name in strategy_names:
+        LINEUP_RUNNERS[engine](1, [name])
+
+
+def _play_lineup_chunk(
+    args: tuple[str, tuple[str, ...], int, int | None, int],
+) -> tuple[tuple[str, ...], SimulationStats]:
+    engine, lineup, num_games, seed, first_game = args
+    return lineup, LINEUP_RUNNERS[engine](num_games, list(lineup), seed, first_game)
+
+
+def run_tournament(  # noqa: PLR0913
+    num_games: int,
+    strategy_names: list[str],
+    player_counts: list[int],
+    engine: str = "classic",
+    workers: int | None = None,
+    seed: int | None = None,
+) -> TournamentResult:
+    """Play every lineup of the strategies for every number of players.
+
+    Args:
+        num_games: Number of games per lineup
+        strategy_names: Strategies of the tournament, at least two
+        player_counts: Numbers of players per game
+        engine: ``classic`` or ``batch``
+        workers: Number of worker processes (default: all cores)
+        seed: Seed of the run, all lineups play the same seeded games
+
+    Returns:
+        TournamentResult: Statistics of every lineup
+    """
+    if engine not in LINEUP_RUNNERS:
+        raise ValueError(f"Unknown engine: {engine}")
+    strategy_names = list(dict.fromkeys(strategy_names))
+    if len(strategy_names) < 2:  # noqa: PLR2004
+        raise ValueError("A tournament needs at least two strategies")
+
+    lineups = [
+        lineup
+        for num_players in player_counts
+        for lineup in tournament_lineups(strategy_names, num_players)
+    ]
+    # chunks of whole blocks for seeded batch runs
+    block = SEED_BLOCK_GAMES if seed is not None and engine == "batch" else 1
+    chunks = split_games(num_games, 1, block, max_size=TOURNAMENT_CHUNK_GAMES[engine])
+    tasks = [(engine, lineup, size, seed, start) for lineup in lineups for start, size in chunks]
+    logger.info(f"Playing {len(lineups)} lineups in {len(tasks)} tasks")
+
+    result = TournamentResult(strategy_names)
+    for lineup in lineups:
+        result.stats[lineup] = SimulationStats(len(lineup))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            lineup, stats = _play_lineup_chunk(task)
+            result.stats[lineup].merge(stats)
+        return result
+
+    with ProcessPoolExecutor(
+        workers, initializer=_warm_worker, initargs=(engine, strategy_names)
+    ) as pool:
+        futures = [pool.submit(_play_lineup_chunk, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            lineup, stats = future.result()
+            result.stats[lineup].merge(stats)
+            if done % len(lineups) == 0:
+                logger.info(f"Completed {done} of {len(tasks)} tasks...")
+    return result
@@ -0,0 +1,100 @@
+"""Exact turn-outcome distributions for the Opa Prikkie dice loop.
+
+The number of moves a turn produces only depends on the target and the rules: the player keeps
+re-rolling the leftover dice while they match, rolls all dice again when every die is used and
+stops at the first miss or when the row height is reached. This is a Markov chain over
+(dice left, matches so far), so the distribution of the moves can be computed exactly once per
+target and sampled with a single uniform draw instead of rolling die by die.
+"""
+
+import bisect
+import functools
+import math
+from fractions import Fraction
+
+from opaprikkie_sim.constants import MAX_DICE_NUM, MAX_ROW_HEIGHT, MIN_DICE_NUM, NUMBER_OF_DICE
+from opaprikkie_sim.roll_table import NUM_FACES, count_matches, iter_face_counts
+
+
+@functools.cache
+def roll_match_distribution(target: int, num_dice: int) -> dict[int, Fraction]:
+    """Exact distribution of the number of matches for the target in one roll.
+
+    Returns:
+        dict[int, Fraction]: {number of matches: probability}
+    """
+    distribution: dict[int, Fraction] = {}
+    total_outcomes = NUM_FACES**num_dice
+    for face_counts in iter_face_counts(num_dice):
+        orderings = math.factorial(num_dice)
+        for count in face_counts:
+            orderings //= math.factorial(count)
+        matches = count_matches(face_counts, target)
+        distribution[matches] = distribution.get(matches, 0) + Fraction(orderings, total_outcomes)
+    return distribution
+
+
+@functools.cache
+def turn_outcome_distribution(
+    target: int, num_dice: int = NUMBER_OF_DICE, max_moves: int = MAX_ROW_HEIGHT
+) -> tuple[Fraction, ...]:
+    """Exact distribution of the moves ``DiceRoller.simulate_turn`` returns for the target.
+
+    Returns:
+        tuple[Fraction, ...]: Element ``k`` is the probability that the turn makes ``k`` moves.
+    """
+    dice_per_match = 1 if target <= MAX_DICE_NUM else 2
+    outcomes: dict[int, Fraction] = {}
+
+    # Probability mass per (dice left, matches so far). Matches strictly increase with every
+    # roll that does not end the turn, so the states are handled in order of matches.
+    pending: dict[tuple[int, int], Fraction] = {(num_dice, 0): Fraction(1)}
+    for matches_so_far in range(max_moves):
+        for dice_left in range(num_dice, 0, -1):
+            probability = pending.pop((dice_left, matches_so_far), None)
+            if probability is None:
+                continue
+            for matches, p_matches in roll_match_distribution(target, dice_left).items():
+                total = matches_so_far + matches
+                if matches == 0 or total >= max_moves:
+                    outcomes[total] = outcomes.get(total, 0) + probability * p_matches
+                    continue
+                next_dice = dice_left - matches * dice_per_match or num_dice
+                key = (next_dice, total)
+                pending[key] = pending.get(key, 0) + probability * p_matches
+
+    return tuple(outcomes.get(moves, Fraction(0)) for moves in range(max(outcomes) + 1))
+
+
+class TurnOutcomeTable:
+    """Samples the moves of a turn from the exact outcome distribution of every target."""
+
+    def __init__(self, num_dice: int = NUMBER_OF_DICE, max_moves: int = MAX_ROW_HEIGHT):
+        self.num_dice = num_dice
+        self.max_moves = max_moves
+        # cumulative probabilities per target, the last entry is dropped so that
+        # rounding can never push a uniform draw past the end of the table
+        self._cdf: dict[int, list[float]] = {}
+        for target in range(MIN_DICE_NUM, 2 * MAX_DICE_NUM + 1):
+            cumulative = 0.0
+            cdf: list[float] = []
+            for p in turn_outcome_distribution(target, num_dice, max_moves):
+                cumulative += float(p)
+                cdf.append(cumulative)
+            self._cdf[target] = cdf[:-1]
+
+    def probabilities(self, target: int) -> list[float]:
+        """Probability of every number of moves for the target."""
+        return [float(p) for p in turn_outcome_distribution(target, self.num_dice, self.max_moves)]
+
+    def sample(self, target: int, uniform: float) -> int:
+        """Map a uniform draw in [0, 1) to a number of moves for the target."""
+        return bisect.bisect_right(self._cdf[target], uniform)
+
+
+@functools.cache
+def get_outcome_table(
+    num_dice: int = NUMBER_OF_DICE, max_moves: int = MAX_ROW_HEIGHT
+) -> TurnOutcomeTable:
+    """Shared outcome table, built on first use."""
+    return TurnOutcomeTable(num_dice, max_moves)
@@ -1,6 +1,12 @@
+from pathlib import Path
+
+import pytest
 from click.testing import CliRunner
 
+from opaprikkie_sim.benchmark import load_report, save_report
 from opaprikkie_sim.cli import cli
+from opaprikkie_sim.solver import SOLUTION_DIR_ENV
+from opaprikkie_sim.strategy import STRATEGIES_NAME_MAPPING
 
 
 def test_simulation_basic():
@@ -45,6 +51,28 @@ def test_simulation_larger():
     assert "Results after 50 games:" in result.output
 
 
+def test_simulation_batch_engine():
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        [
+            "simulation",
+            "--games", "50",
+            "--players", "3",
+            "--strategy1", "greedy",
+            "--strategy2", "smart",
+            "--engine", "batch",
+        ],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert result.stderr == ""
+    assert "Running 50 simulations..." in result.output
+    assert "Results after 50 games:" in result.output
+    assert "Player 3 (BatchRandomStrategy)" in result.output
+
+
 def test_short_interactive_game() -> None:
     runner = CliRunner()
     # Simulate choosing strategy 1 for player 1, strategy 2 for player 2,
@@ -74,10 +102,11 @@ def test_interactive_invalid_players() -> None:
     assert "Number of players must be between 2 and 4." in result.output
 
 
-def test_interactive_invalid_strategy_choice():
+def test_interactive_invalid_strategy_choice(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(SOLUTION_DIR_ENV, raising=False)
     runner = CliRunner()
-    # Simulate invalid strategy (e.g., 5), then valid (1), then valid (2), then 'q' to quit
-    user_input = "5\n1\n2\nq\n"
+    # Simulate invalid strategy (e.g., 9), then valid (1), then valid (2), then 'q' to quit
+    user_input = "9\n1\n2\nq\n"
     result = runner.invoke(
         cli,
         ["interactive", "--players", "2"],
@@ -85,7 +114,336 @@ def test_interactive_invalid_strategy_choice():
     )
     assert result.exit_code == 0
     assert result.stderr == ""
-    assert "Please enter a number between 1 and 3." in result.output
+    # the optimal strategy is not offered without its solution
+    offered = len(STRATEGIES_NAME_MAPPING) - 1
+    assert "optimal" not in result.output
+    assert f"Please enter a number between 1 and {offered}." in result.output
     assert "Choose strategy for Player 1:" in result.output
     assert "Choose strategy for Player 2:" in result.output
     assert "Game stopped by user." in result.output or "Game finished after" in result.output
+
+
+def test_solve_small_board(tmp_path: Path) -> None:
+    runner = CliRunner()
+    output = tmp_path / "h1"
+    result = runner.invoke(cli, ["solve", "--row-height", "1", "--output", str(output)])
+    assert result.exit_code == 0
+    assert result.stderr == ""
+    assert "Expected turns from an empty board:" in result.output
+    assert (output / "values.npy").exists()
+    assert (output / "policy.npy").exists()
+
+
+def test_simulation_race_engine() -> None:
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        [
+            "simulation",
+            "--games", "200",
+            "--players", "3",
+            "--strategy1", "greedy",
+            "--strategy2", "smart",
+            "--engine", "race",
+        ],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert result.stderr == ""
+    assert "Results after 200 games:" in result.output
+    assert "Player 3 (BatchRandomStrategy)" in result.output
+
+
+def test_matchups() -> None:
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        ["matchups", "--games", "200", "--strategy", "greedy", "--strategy", "smart"],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert result.stderr == ""
+    assert "greedy vs smart:" in result.output
+    assert "smart vs smart:" in result.output
+
+
+def test_batch_engines_reject_strategies_without_batch_version() -> None:
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        ["simulation", "--games", "10", "--engine", "batch", "--strategy1", "expectimax"],
+    )
+    # fmt: on
+    assert result.exit_code == 2
+    assert "Invalid value for --strategy1" in result.output
+    assert "expectimax cannot be played by the batch engine" in result.output
+    result = runner.invoke(cli, ["simulation", "--engine", "race", "--strategy2", "rollout"])
+    assert result.exit_code == 2
+    assert "--strategy2" in result.output
+    result = runner.invoke(cli, ["matchups", "--strategy", "rollout"])
+    assert result.exit_code == 2
+    assert "Invalid value for '--strategy'" in result.output
+
+
+def test_optimal_strategy_needs_its_solution(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(SOLUTION_DIR_ENV, raising=False)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["simulation", "--games", "1", "--strategy2", "optimal"])
+    assert result.exit_code == 2
+    assert "Invalid value for --strategy2: No solution for row height 5" in result.output
+    assert "solve --row-height 5" in result.output
+    result = runner.invoke(cli, ["compare", "--games", "1", "--opponent", "optimal"])
+    assert result.exit_code == 2
+    assert "Invalid value for --opponent" in result.output
+
+
+def test_simulation_workers() -> None:
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        [
+            "simulation",
+            "--games", "20",
+            "--strategy1", "greedy",
+            "--strategy2", "smart",
+            "--workers", "2",
+        ],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert result.stderr == ""
+    assert "Results after 20 games:" in result.output
+    assert "Player 1 (GreedyStrategy)" in result.output
+
+
+def test_simulation_thread_executor() -> None:
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        [
+            "simulation",
+            "--games", "20",
+            "--strategy1", "greedy",
+            "--workers", "2",
+            "--executor", "thread",
+        ],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert "Results after 20 games:" in result.output
+
+
+def test_simulation_seed_is_reproducible() -> None:
+    runner = CliRunner()
+    args = ["simulation", "--games", "30", "--strategy1", "greedy", "--seed", "42"]
+    first = runner.invoke(cli, [*args, "--workers", "1"])
+    second = runner.invoke(cli, [*args, "--workers", "2"])
+    assert first.exit_code == 0
+    assert first.output == second.output
+
+
+def test_simulation_cache_decisions() -> None:
+    runner = CliRunner()
+    args = ["simulation", "--games", "30", "--strategy1", "greedy", "--seed", "42"]
+    result = runner.invoke(cli, [*args, "--cache-decisions"])
+    assert result.exit_code == 0
+    assert "Decision cache:" in result.output
+    uncached = runner.invoke(cli, args).output
+    assert result.output.split("Decision cache")[0] in uncached
+
+
+def test_compare() -> None:
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        [
+            "compare",
+            "--games", "20",
+            "--strategy-a", "greedy",
+            "--strategy-b", "random",
+            "--seed", "3",
+        ],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert "Results after 20 pairs (seed 3):" in result.output
+    assert "Difference:" in result.output
+    assert "standard error" in result.output
+
+
+def test_simulation_output(tmp_path: Path) -> None:
+    runner = CliRunner()
+    path = tmp_path / "results.jsonl"
+    result = runner.invoke(cli, ["simulation", "--games", "20", "--output", str(path)])
+    assert result.exit_code == 0
+    assert f"Results of 20 games written to {path}" in result.output
+    assert len(path.read_text().splitlines()) == 20
+
+
+def test_simulation_replay(tmp_path: Path) -> None:
+    runner = CliRunner()
+    path = tmp_path / "games.replay"
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        [
+            "simulation",
+            "--games", "20",
+            "--strategy1", "greedy",
+            "--strategy2", "smart",
+            "--seed", "3",
+            "--replay", str(path),
+        ],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert f"Turns of 20 games recorded to {path}" in result.output
+
+    result = runner.invoke(cli, ["replay", str(path), "--game", "12", "--verify"])
+    assert result.exit_code == 0
+    assert "Game 12 of 20: greedy vs smart" in result.output
+    assert "Current player: Player 2 (smart)" in result.output
+    assert "wins!" in result.output
+    assert "The seeded game plays the same turns again" in result.output
+
+    result = runner.invoke(cli, ["replay", str(path), "--game", "20"])
+    assert result.exit_code == 1
+    assert "Game 20 is not in the replay" in result.output
+
+
+def test_simulation_checkpoint_and_resume(tmp_path: Path) -> None:
+    runner = CliRunner()
+    path = tmp_path / "run.checkpoint"
+    # fmt: off
+    args = [
+        "simulation",
+        "--games", "30",
+        "--seed", "5",
+        "--workers", "1",
+        "--checkpoint", str(path),
+        "--checkpoint-every", "0",
+    ]
+    # fmt: on
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert f"Checkpoint of 30 games saved to {path}" in result.output
+    results = result.output.split("Results after")[1].split("Average")[0]
+
+    result = runner.invoke(cli, [*args, "--resume"])
+    assert result.exit_code == 0
+    assert "(resumed after 30 games)" in result.output
+    assert results in result.output
+
+    result = runner.invoke(cli, ["simulation", "--resume"])
+    assert result.exit_code == 1
+    assert "--resume needs the --checkpoint file" in result.output
+
+
+def test_simulation_until_target_interval() -> None:
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        [
+            "simulation",
+            "--engine", "batch",
+            "--target-ci", "0.02",
+            "--max-games", "100000",
+            "--workers", "1",
+        ],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert "95% CI" in result.output
+    assert "Stopped after 50000 games: confidence interval" in result.output
+
+
+def test_tournament() -> None:
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        [
+            "tournament",
+            "--games", "10",
+            "--strategy", "random",
+            "--strategy", "greedy",
+            "--players", "2",
+            "--players", "3",
+            "--workers", "1",
+        ],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert "2 players, win rate of the row against the columns:" in result.output
+    assert "3 players, win rate of the row against the columns:" in result.output
+    assert "greedy" in result.output
+
+
+def test_tournament_defaults_and_engine_strategies() -> None:
+    runner = CliRunner()
+    result = runner.invoke(cli, ["tournament", "--games", "4", "--workers", "1"])
+    assert result.exit_code == 0
+    assert "Running a tournament of random, greedy, smart" in result.output
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        ["tournament", "--engine", "batch", "--strategy", "greedy", "--strategy", "expectimax"],
+    )
+    # fmt: on
+    assert result.exit_code == 2
+    assert "expectimax cannot be played by the batch engine" in result.output
+
+
+def test_bench(tmp_path: Path) -> None:
+    runner = CliRunner()
+    report = tmp_path / "report.json"
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        ["bench", "--quick", "--filter", "get_available_targets", "--output", str(report)],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert "dice.get_available_targets" in result.output
+    assert load_report(report)["results"][0]["name"] == "dice.get_available_targets"
+
+    # a baseline a thousand times faster is a regression
+    baseline = load_report(report)
+    baseline["results"][0]["value"] /= 1000
+    save_report(baseline, report)
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        ["bench", "--quick", "--filter", "get_available_targets", "--baseline", str(report)],
+    )
+    # fmt: on
+    assert result.exit_code == 1
+    assert "REGRESSION" in result.output
+
+
+def test_simulation_profile() -> None:
+    runner = CliRunner()
+    # fmt: off
+    result = runner.invoke(
+        cli,
+        [
+            "simulation",
+            "--games", "5",
+            "--strategy1", "greedy",
+            "--strategy2", "smart",
+            "--workers", "1",
+            "--profile",
+        ],
+    )
+    # fmt: on
+    assert result.exit_code == 0
+    assert "Profile (time per phase):" in result.output
+    assert "choose_target" in result.output
+    assert "GreedyStrategy" in result.output
@@ -0,0 +1,71 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import opaprikkie_sim
+from opaprikkie_sim.constants import LINEUP_ENGINES, OUTPUT_FORMATS
+from opaprikkie_sim.simulation import LINEUP_RUNNERS
+from opaprikkie_sim.sinks import SINKS
+
+# Cumulative import time of the CLI module in microseconds, about 35 ms when measured
+CLI_IMPORT_BUDGET_US = 150_000
+# Modules that only the commands that use them import
+HEAVY_MODULES = [
+    "numpy",
+    "concurrent.futures.process",
+    "opaprikkie_sim.batch",
+    "opaprikkie_sim.benchmark",
+    "opaprikkie_sim.simulation",
+    "opaprikkie_sim.solver",
+]
+
+
+def _imported_modules(statement: str) -> set[str]:
+    code = f"import json, sys; {statement}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return set(json.loads(result.stdout))
+
+
+@pytest.mark.parametrize(
+    "statement",
+    ["import opaprikkie_sim.cli", "import opaprikkie_sim; opaprikkie_sim.Game(headless=True)"],
+)
+def test_imports_leave_engines_unloaded(statement: str) -> None:
+    modules = _imported_modules(statement)
+    assert not modules & set(HEAVY_MODULES)
+
+
+def test_cli_import_time_budget() -> None:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", "import opaprikkie_sim.cli"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # lines of "import time: self [us] | cumulative | imported package"
+    cumulative = {
+        fields[2].strip(): int(fields[1])
+        for fields in (
+            line.removeprefix("import time:").split("|") for line in result.stderr.splitlines()
+        )
+        if fields[1].strip().isdigit()
+    }
+    assert cumulative["opaprikkie_sim.cli"] < CLI_IMPORT_BUDGET_US
+
+
+def test_lazy_package_attributes() -> None:
+    assert isinstance(opaprikkie_sim.__version__, str)
+    for name in opaprikkie_sim.__all__:
+        assert getattr(opaprikkie_sim, name).__name__ == name
+    assert set(opaprikkie_sim.__all__) <= set(dir(opaprikkie_sim))
+    with pytest.raises(AttributeError, match="no attribute"):
+        _ = opaprikkie_sim.NotAStrategy
+
+
+def test_cli_choices_match_the_engines() -> None:
+    assert tuple(SINKS) == OUTPUT_FORMATS
+    assert tuple(LINEUP_RUNNERS) == LINEUP_ENGINES
@@ -1,6 +1,11 @@
 """Basic tests for the Opa Prikkie game."""
 
-from opaprikkie_sim import Board, DiceRoller, Game, GreedyStrategy, RandomStrategy
+import logging
+import random
+
+import pytest
+
+from opaprikkie_sim import Board, DiceRoller, Game, GreedyStrategy, PackedBoard, RandomStrategy
 from opaprikkie_sim.constants import MAX_DICE_NUM, MAX_ROW_HEIGHT, MIN_DICE_NUM
 
 
@@ -93,6 +98,17 @@ def test_strategy_creation():
     assert target2 is None or (1 <= target2 <= 12)
 
 
+def test_game_with_packed_boards():
+    """Test that a game can be played on packed boards."""
+    game = Game(num_players=2, board_factory=PackedBoard)
+    game.set_player_strategy(0, GreedyStrategy())
+    winner = game.play_game()
+    assert isinstance(winner.board, PackedBoard)
+    assert winner.board.is_complete()
+    game.reset()
+    assert all(isinstance(player.board, PackedBoard) for player in game.players)
+
+
 def test_game_turn():
     """Test that a game turn can be played."""
     game = Game(num_players=1)
@@ -101,3 +117,30 @@ def test_game_turn():
     assert isinstance(result, dict)
     assert "status" in result
     assert result["status"] in ["continue", "winner", "skipped"]
+
+
+def test_headless_game_matches_verbose_game(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that the headless fast path plays the same game as play_game, without logging."""
+    games = []
+    for fast in (False, True):
+        game = Game(num_players=3, dice_roller=DiceRoller(rng=random.Random(7)), headless=fast)
+        game.set_player_strategy(0, GreedyStrategy())
+        game.set_player_strategy(1, RandomStrategy(random.Random(8)))
+        game.set_player_strategy(2, RandomStrategy(random.Random(9)))
+        game.turn_log = bytearray()
+        games.append(game)
+    verbose, headless = games
+
+    winner = verbose.play_game()
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG):
+        headless_winner, turn_count = headless.play_headless()
+    assert not caplog.records
+
+    assert headless.players.index(headless_winner) == verbose.players.index(winner)
+    assert turn_count == verbose.state.turn_count == headless.state.turn_count
+    assert headless.get_game_state() == verbose.get_game_state()
+    assert headless.turn_log
+    assert headless.turn_log == verbose.turn_log
+    # a finished game is not played again
+    assert headless.play_headless() == (headless_winner, turn_count)
@@ -0,0 +1,158 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from opaprikkie_sim.batch import (
+    BATCH_STRATEGIES_NAME_MAPPING,
+    BatchFinishPegsStrategy,
+    BatchGame,
+    BatchGreedyStrategy,
+    BatchOptimalStrategy,
+    BatchRandomStrategy,
+    pack_boards,
+    target_counts,
+    unpack_boards,
+)
+from opaprikkie_sim.board import Board, PackedBoard, Peg
+from opaprikkie_sim.constants import BATCH_STRATEGIES, MAX_ROW_HEIGHT
+from opaprikkie_sim.dice import DiceRoll, DiceRoller
+from opaprikkie_sim.simulation import play_classic_games
+from opaprikkie_sim.solver import solve
+from opaprikkie_sim.strategy import FinishPegsStrategy, GreedyStrategy, OptimalStrategy
+
+
+def _random_rolls(num_rolls: int) -> np.ndarray:
+    return np.random.default_rng(0).integers(1, 7, size=(num_rolls, 6), dtype=np.int8)
+
+
+def test_target_counts_matches_dice_roll():
+    faces = _random_rolls(500)
+    counts = target_counts(faces)
+    for roll_faces, roll_counts in zip(faces, counts, strict=True):
+        expected = DiceRoll(roll_faces.tolist()).get_available_targets()
+        actual = {t + 1: int(c) for t, c in enumerate(roll_counts) if c > 0}
+        assert actual == expected
+
+
+def test_target_counts_ignores_unrolled_dice():
+    faces = np.array([[6, 6, 1, 0, 0, 0]], dtype=np.int8)
+    assert target_counts(faces)[0].tolist() == [1, 0, 0, 0, 0, 2, 1, 0, 0, 0, 0, 1]
+
+
+@pytest.mark.parametrize(
+    ("strategy", "batch_strategy"),
+    [
+        (GreedyStrategy(), BatchGreedyStrategy()),
+        (FinishPegsStrategy(), BatchFinishPegsStrategy()),
+    ],
+)
+def test_batch_strategy_matches_classic(strategy, batch_strategy):
+    rng = np.random.default_rng(1)
+    faces = _random_rolls(300)
+    positions = rng.integers(0, MAX_ROW_HEIGHT + 1, size=(300, 12), dtype=np.int8)
+    chosen = batch_strategy.choose_targets(positions, target_counts(faces), rng)
+    for i in range(300):
+        board = Board([Peg(number=n + 1, position=int(p)) for n, p in enumerate(positions[i])])
+        expected = strategy.choose_target(board, DiceRoll(faces[i].tolist()))
+        assert chosen[i] == (expected or 0)
+
+
+@pytest.mark.parametrize("batch_strategy", [BatchGreedyStrategy(), BatchFinishPegsStrategy()])
+def test_batch_strategy_breaks_ties_towards_the_lowest_target(batch_strategy):
+    faces = np.array(list(itertools.permutations([6, 1, 3])), dtype=np.int8)
+    positions = np.zeros((len(faces), 12), dtype=np.int8)
+    chosen = batch_strategy.choose_targets(positions, target_counts(faces), np.random.default_rng())
+    assert chosen.tolist() == [1] * len(faces)
+
+
+def test_batch_random_strategy_chooses_valid_target():
+    rng = np.random.default_rng(2)
+    faces = _random_rolls(300)
+    positions = rng.integers(0, MAX_ROW_HEIGHT + 1, size=(300, 12), dtype=np.int8)
+    counts = target_counts(faces)
+    chosen = BatchRandomStrategy().choose_targets(positions, counts, rng)
+    rows = np.arange(300)
+    valid = (counts > 0) & (positions < MAX_ROW_HEIGHT)
+    assert np.all(valid[rows[chosen > 0], chosen[chosen > 0] - 1])
+    assert not valid[chosen == 0].any()
+
+
+@pytest.mark.parametrize("use_outcome_table", [True, False])
+@pytest.mark.parametrize("target", [1, 7, 12])
+def test_simulate_turns_matches_dice_roller(target: int, use_outcome_table: bool) -> None:
+    random.seed(3)
+    roller = DiceRoller(use_outcome_table=False)
+    reference = np.array([roller.simulate_turn(target) for _ in range(4000)])
+    game = BatchGame(1, 1, rng=np.random.default_rng(3), use_outcome_table=use_outcome_table)
+    moves = game.simulate_turns(np.full(40000, target, dtype=np.int8))
+    standard_error = np.sqrt(reference.var() / reference.size + moves.var() / moves.size)
+    assert abs(reference.mean() - moves.mean()) < 4 * standard_error
+
+
+def test_batch_game_play():
+    game = BatchGame(200, 3, rng=np.random.default_rng(4))
+    result = game.play()
+    assert result.winners.shape == (200,)
+    assert set(result.winners.tolist()) <= {0, 1, 2}
+    winning_boards = result.boards[np.arange(200), result.winners]
+    assert np.all(winning_boards == MAX_ROW_HEIGHT)
+    assert np.all(result.turn_counts > 0)
+
+
+@pytest.mark.parametrize(
+    ("strategy1", "strategy2"), [("greedy", "smart"), ("smart", "random"), ("random", "greedy")]
+)
+def test_batch_game_matches_classic_games(strategy1: str, strategy2: str) -> None:
+    classic = play_classic_games(500, 2, strategy1, strategy2, rng=random.Random(9))
+    strategies = [BATCH_STRATEGIES_NAME_MAPPING[name]() for name in (strategy1, strategy2)]
+    batch = BatchGame(5000, 2, strategies, rng=np.random.default_rng(9)).play()
+    # win rate of the first seat
+    classic_rate = classic.wins[0] / classic.num_games
+    batch_rate = float(np.mean(batch.winners == 0))
+    rate_variance = classic_rate * (1 - classic_rate)
+    standard_error = np.sqrt(rate_variance / classic.num_games + rate_variance / batch.winners.size)
+    assert abs(classic_rate - batch_rate) < 4 * standard_error
+    # mean turns of a game
+    turns = batch.turn_counts
+    standard_error = np.sqrt(classic.turn_moments.standard_error**2 + turns.var() / turns.size)
+    assert abs(classic.turn_moments.mean - turns.mean()) < 4 * standard_error
+
+
+def test_batch_game_requires_strategy_per_player():
+    with pytest.raises(ValueError):
+        BatchGame(10, 2, [BatchGreedyStrategy()])
+
+
+def test_pack_boards_matches_packed_board():
+    positions = np.random.default_rng(5).integers(0, MAX_ROW_HEIGHT + 1, (50, 12), dtype=np.int8)
+    keys = pack_boards(positions)
+    for row, key in zip(positions, keys, strict=True):
+        board = PackedBoard([Peg(number=n + 1, position=int(p)) for n, p in enumerate(row)])
+        assert board.key == key
+    assert np.array_equal(unpack_boards(keys), positions)
+
+
+def test_batch_optimal_strategy_matches_classic():
+    solution = solve(2)
+    rng = np.random.default_rng(6)
+    faces = _random_rolls(300)
+    positions = rng.integers(0, 3, size=(300, 12), dtype=np.int8)
+    chosen = BatchOptimalStrategy(solution).choose_targets(positions, target_counts(faces), rng)
+    strategy = OptimalStrategy(solution)
+    for i in range(300):
+        board = Board(
+            [
+                Peg(number=n + 1, position=int(p), max_position=2)
+                for n, p in enumerate(positions[i])
+            ],
+            row_height=2,
+        )
+        expected = strategy.choose_target(board, DiceRoll(faces[i].tolist()))
+        assert chosen[i] == (expected or 0)
+
+
+def test_batch_strategy_names() -> None:
+    # the CLI offers these names without importing the engine
+    assert tuple(BATCH_STRATEGIES_NAME_MAPPING) == BATCH_STRATEGIES
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from opaprikkie_sim.benchmark import (
+    BENCHMARKS,
+    BenchmarkResult,
+    benchmark_report,
+    compare_to_baseline,
+    load_report,
+    run_benchmark,
+    run_benchmarks,
+    save_report,
+)
+
+
+def test_micro_benchmark_reports_time_per_operation() -> None:
+    result = run_benchmark(BENCHMARKS["dice.get_available_targets"], quick=True)
+    assert result.unit == "us/op"
+    assert not result.higher_is_better
+    assert result.value > 0
+    assert result.peak_memory_kib is None
+
+
+def test_throughput_benchmark_reports_games_and_memory() -> None:
+    result = run_benchmark(BENCHMARKS["simulation.classic"], quick=True)
+    assert result.unit == "games/s"
+    assert result.higher_is_better
+    assert result.value > 0
+    assert result.peak_memory_kib is not None
+    assert result.peak_memory_kib > 0
+
+
+def test_run_benchmarks_filters_by_name() -> None:
+    results = run_benchmarks(["get_available_targets", "get_combinations"], quick=True)
+    assert [result.name for result in results] == [
+        "dice.get_available_targets",
+        "dice.get_combinations_for_target",
+    ]
+
+
+def test_report_round_trip(tmp_path: Path) -> None:
+    results = [BenchmarkResult("game.play_game", 150.0, "games/s", True, 20.0)]
+    path = tmp_path / "report.json"
+    save_report(benchmark_report(results), path)
+    report = load_report(path)
+    assert report["results"] == [
+        {
+            "name": "game.play_game",
+            "value": 150.0,
+            "unit": "games/s",
+            "higher_is_better": True,
+            "peak_memory_kib": 20.0,
+        }
+    ]
+    assert "python" in report
+
+
+def test_compare_to_baseline() -> None:
+    baseline = benchmark_report(
+        [
+            BenchmarkResult("dice.simulate_turn", 1.0, "us/op", False),
+            BenchmarkResult("game.play_game", 100.0, "games/s", True, 10.0),
+            BenchmarkResult("simulation.batch", 1000.0, "games/s", True, 10.0),
+        ]
+    )
+    results = [
+        BenchmarkResult("dice.simulate_turn", 2.0, "us/op", False),  # twice as slow
+        BenchmarkResult("game.play_game", 110.0, "games/s", True, 10.0),  # faster
+        BenchmarkResult("simulation.batch", 1000.0, "games/s", True, 20.0),  # twice the memory
+        BenchmarkResult("strategy.smart.choose_target", 1.0, "us/op", False),  # not in baseline
+    ]
+
+    comparisons = {c.name: c for c in compare_to_baseline(results, baseline, tolerance=0.2)}
+    assert set(comparisons) == {"dice.simulate_turn", "game.play_game", "simulation.batch"}
+    assert comparisons["dice.simulate_turn"].change == pytest.approx(-0.5)
+    assert comparisons["dice.simulate_turn"].regressed
+    assert comparisons["game.play_game"].change == pytest.approx(0.1)
+    assert not comparisons["game.play_game"].regressed
+    assert comparisons["simulation.batch"].memory_change == pytest.approx(-0.5)
+    assert comparisons["simulation.batch"].regressed
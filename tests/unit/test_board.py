@@ -1,6 +1,6 @@
 import pytest
 
-from opaprikkie_sim.board import Board, Peg
+from opaprikkie_sim.board import Board, PackedBoard, Peg, board_key
 from opaprikkie_sim.constants import MAX_DICE_NUM, MAX_ROW_HEIGHT, MIN_DICE_NUM
 
 
@@ -139,3 +139,75 @@ def test_board_display_output():
     assert isinstance(output, str)
     assert "Board" not in output  # Should be just the board, not class name
     assert "-" in output  # Should contain separator
+
+
+# --- PackedBoard class tests ---
+def test_packed_board_initialization():
+    board = PackedBoard()
+    assert board.key == 0
+    assert [peg.number for peg in board.pegs] == list(range(MIN_DICE_NUM, 2 * MAX_DICE_NUM + 1))
+    assert all(board.is_peg_movable(number) for number in range(1, 13))
+    assert not board.is_complete()
+    assert board.completed_count == 0
+
+
+def test_packed_board_move_peg():
+    board = PackedBoard()
+    assert board.move_peg(7, 2) is False
+    assert board.get_position(7) == 2
+    peg = board.get_peg(7)
+    assert peg is not None
+    assert peg.position == 2
+    assert board.move_peg(7, 4) is True
+    assert board.get_position(7) == MAX_ROW_HEIGHT
+    assert not board.is_peg_movable(7)
+    assert board.completed_count == 1
+    with pytest.raises(AssertionError):
+        board.move_peg(7, 1)
+
+
+def test_packed_board_matches_board():
+    pegs = [Peg(number=2, position=1), Peg(number=4, position=MAX_ROW_HEIGHT)]
+    board = Board([Peg(number=p.number, position=p.position) for p in pegs])
+    packed = PackedBoard(pegs)
+    assert packed.get_peg(1) is None
+    assert packed.get_peg_positions() == board.get_peg_positions()
+    assert packed.get_incomplete_pegs() == board.get_incomplete_pegs()
+    assert packed.display() == board.display()
+    packed.move_peg(2, 4)
+    assert packed.is_complete()
+
+
+def test_packed_board_completion():
+    board = PackedBoard()
+    for number in range(1, 13):
+        board.move_peg(number, 10)
+    assert board.is_complete()
+    assert board.completed_count == 12
+    assert board.get_incomplete_pegs() == []
+
+
+def test_packed_board_key_and_hash():
+    board = PackedBoard()
+    board.move_peg(3, 2)
+    board.move_peg(12, 5)
+    copy = PackedBoard.from_key(board.key)
+    assert copy == board
+    assert hash(copy) == hash(board)
+    assert copy.open_mask == board.open_mask
+    assert PackedBoard.from_board(board) == board
+    copy.move_peg(3, 1)
+    assert copy != board
+    assert len({board, PackedBoard.from_board(board)}) == 1
+
+
+def test_board_key_is_canonical():
+    board = Board()
+    board.move_peg(3, 2)
+    board.move_peg(12, MAX_ROW_HEIGHT + 2)
+    packed = PackedBoard.from_board(board)
+    assert board_key(board) == board_key(packed)
+    packed.move_peg(3, 1)
+    assert board_key(board) != board_key(packed)
+    assert board_key(Board([Peg(number=2)])) != board_key(Board([Peg(number=3)]))
+    assert board_key(Board(row_height=4)) != board_key(Board(row_height=5))
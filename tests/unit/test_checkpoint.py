@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from opaprikkie_sim.checkpoint import (
+    Checkpointer,
+    load_checkpoint,
+    save_checkpoint,
+    stats_from_dict,
+    stats_to_dict,
+)
+from opaprikkie_sim.estimators import StoppingRule
+from opaprikkie_sim.simulation import SimulationStats, run_games, run_games_until
+from opaprikkie_sim.sinks import JsonlSink
+
+
+class StoppedCheckpointer(Checkpointer):
+    """Checkpoints after every chunk of a run that is stopped after some games, like a
+    preempted node.
+    """
+
+    def __init__(self, path: Path, stop_after: int):
+        super().__init__(path, interval=0)
+        self.stop_after = stop_after
+
+    def update(self, stats: SimulationStats) -> None:
+        super().update(stats)
+        if stats.num_games >= self.stop_after:
+            raise KeyboardInterrupt
+
+
+def test_stats_round_trip() -> None:
+    stats = run_games(30, 3, "greedy", "smart", workers=1, seed=1)
+    restored = stats_from_dict(json.loads(json.dumps(stats_to_dict(stats))))
+    assert restored == stats
+    assert restored.turn_moments == stats.turn_moments
+
+
+def test_save_checkpoint_replaces_the_file(tmp_path: Path) -> None:
+    path = tmp_path / "run.checkpoint"
+    save_checkpoint(path, {"version": 1, "games": 1})
+    save_checkpoint(path, {"version": 1, "games": 2})
+    assert load_checkpoint(path) == {"version": 1, "games": 2}
+    assert [file.name for file in tmp_path.iterdir()] == ["run.checkpoint"]
+
+    save_checkpoint(path, {"version": 0})
+    with pytest.raises(ValueError, match="Not a checkpoint of version 1"):
+        load_checkpoint(path)
+
+
+@pytest.mark.parametrize(("engine", "num_games"), [("classic", 300), ("batch", 8202)])
+def test_resumed_seeded_run_matches_uninterrupted_run(
+    tmp_path: Path, engine: str, num_games: int
+) -> None:
+    expected = run_games(num_games, 2, "greedy", "smart", engine, workers=1, seed=11)
+
+    path = tmp_path / "run.checkpoint"
+    with pytest.raises(KeyboardInterrupt):
+        run_games(
+            num_games, 2, "greedy", "smart", engine, workers=1, seed=11,
+            checkpoint=StoppedCheckpointer(path, num_games // 2),
+        )  # fmt: skip
+    played = load_checkpoint(path)["stats"]["num_games"]
+    assert num_games // 2 <= played < num_games
+
+    checkpoint = Checkpointer(path, interval=0, resume=True)
+    stats = run_games(
+        num_games, 2, "greedy", "smart", engine, workers=1, seed=11, checkpoint=checkpoint
+    )
+    assert checkpoint.resumed_games == played
+    assert stats == expected
+    assert stats.turn_moments == expected.turn_moments
+    # the checkpoint of the finished run resumes without playing
+    resumed = run_games(
+        num_games, 2, "greedy", "smart", engine, workers=1, seed=11,
+        checkpoint=Checkpointer(path, resume=True),
+    )  # fmt: skip
+    assert resumed == expected
+    assert resumed.turn_moments == expected.turn_moments
+
+
+def test_resumed_run_until(tmp_path: Path) -> None:
+    rule = StoppingRule(max_games=700)
+    expected, _ = run_games_until(rule, 2, "greedy", "random", workers=1, seed=2)
+
+    path = tmp_path / "run.checkpoint"
+    with pytest.raises(KeyboardInterrupt):
+        run_games_until(
+            rule, 2, "greedy", "random", workers=1, seed=2,
+            checkpoint=StoppedCheckpointer(path, 500),
+        )  # fmt: skip
+    checkpoint = load_checkpoint(path)
+    assert checkpoint["run"]["rule"] == {"target_ci": None, "max_seconds": None, "max_games": 700}
+    assert checkpoint["elapsed"] > 0
+
+    stats, reason = run_games_until(
+        rule, 2, "greedy", "random", workers=1, seed=2,
+        checkpoint=Checkpointer(path, resume=True),
+    )  # fmt: skip
+    assert stats == expected
+    assert stats.turn_moments == expected.turn_moments
+    assert reason == "maximum of 700 games played"
+
+
+def test_checkpoint_errors(tmp_path: Path) -> None:
+    path = tmp_path / "run.checkpoint"
+    run_games(10, 2, "greedy", "smart", workers=1, checkpoint=Checkpointer(path))
+    with pytest.raises(ValueError, match="is of another run"):
+        run_games(20, 2, "greedy", "smart", workers=1, checkpoint=Checkpointer(path, resume=True))
+    # without resume, the run starts over
+    stats = run_games(20, 2, "greedy", "smart", workers=1, checkpoint=Checkpointer(path))
+    assert stats.num_games == 20
+
+    with (
+        JsonlSink(tmp_path / "results.jsonl", 2) as sink,
+        pytest.raises(ValueError, match="cannot resume the files of a sink"),
+    ):
+        run_games(10, 2, sink=sink, checkpoint=Checkpointer(path))
+    with pytest.raises(ValueError, match="race engine does not play games"):
+        run_games(10, 2, engine="race", checkpoint=Checkpointer(path))
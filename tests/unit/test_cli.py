@@ -3,7 +3,12 @@ import re
 import pytest
 
 from opaprikkie_sim.cli import create_strategy, get_version
-from opaprikkie_sim.strategy import FinishPegsStrategy, GreedyStrategy, RandomStrategy
+from opaprikkie_sim.strategy import (
+    FinishPegsStrategy,
+    GreedyStrategy,
+    OptimalStrategy,
+    RandomStrategy,
+)
 
 
 def test_version() -> None:
@@ -19,6 +24,7 @@ def test_version() -> None:
         ("random", RandomStrategy),
         ("greedy", GreedyStrategy),
         ("smart", FinishPegsStrategy),
+        ("optimal", OptimalStrategy),
         ("RANDOM", RandomStrategy),  # test case-insensitivity
         ("GrEeDy", GreedyStrategy),
     ],
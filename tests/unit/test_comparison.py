@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+from opaprikkie_sim import simulation
+from opaprikkie_sim.comparison import PairedStats, compare_strategies, play_paired_games
+
+
+def test_paired_stats_record_and_merge() -> None:
+    stats = PairedStats(("greedy", "smart"), "random")
+    stats.record(True, True)
+    stats.record(True, False)
+    other = PairedStats(("greedy", "smart"), "random")
+    other.record(False, False)
+    other.record(False, True)
+
+    stats.merge(other)
+    assert stats.num_pairs == 4
+    assert stats.wins == [2, 2]
+    assert stats.differing_pairs == 2
+    assert stats.difference == 0
+    # per-pair differences 0, 1, 0, -1: sample variance 2/3
+    assert stats.standard_error == pytest.approx(math.sqrt(2 / 3 / 4))
+    assert stats.independent_standard_error == pytest.approx(math.sqrt(0.5 / 4))
+
+
+def test_identical_strategies_have_no_paired_difference() -> None:
+    stats = play_paired_games(20, "greedy", "greedy", "random", seed=3)
+    assert stats.wins[0] == stats.wins[1]
+    assert stats.differing_pairs == 0
+    assert stats.standard_error == 0
+
+
+def test_paired_games_reduce_the_standard_error() -> None:
+    stats, seed = compare_strategies(150, "greedy", "smart", "greedy", seed=4, workers=1)
+    assert seed == 4
+    assert stats.num_pairs == 150
+    assert stats.standard_error < stats.independent_standard_error
+    assert stats.variance_reduction > 1
+
+
+def test_compare_strategies_in_worker_processes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(simulation.MIN_PARALLEL_GAMES, "classic", 0)
+    serial, _ = compare_strategies(12, "random", "smart", "greedy", seed=5, workers=1)
+    parallel, _ = compare_strategies(12, "random", "smart", "greedy", seed=5, workers=2)
+    assert parallel == serial
@@ -1,7 +1,12 @@
+import random
+
+import numpy as np
 import pytest
 
 from opaprikkie_sim.constants import MAX_DICE_NUM, MAX_ROW_HEIGHT, MIN_DICE_NUM, NUMBER_OF_DICE
-from opaprikkie_sim.dice import DiceRoll, DiceRoller
+from opaprikkie_sim.dice import BufferedDiceRoller, DiceRoll, DiceRoller, TargetStreamDiceRoller
+from opaprikkie_sim.game import Game
+from opaprikkie_sim.roll_table import face_count_key, sample_face_key
 
 
 class DummyRandom:
@@ -108,7 +113,7 @@ def test_dice_roller_simulate_turn(
     assert len(dummy_values) == 12, "Dummy values should have 12 elements"
     dummy = DummyRandom(dummy_values)
     monkeypatch.setattr("random.randint", dummy.randint)
-    roller = DiceRoller(num_dice=6)
+    roller = DiceRoller(num_dice=6, use_outcome_table=False)
     count = roller.simulate_turn(target)
     assert count == expected
 
@@ -151,3 +156,97 @@ def test_dice_roll_get_available_targets(dice_values: list[int], expected: dict[
     roll = DiceRoll(dice_values)
     result = roll.get_available_targets()
     assert _sorted_dict(result) == _sorted_dict(expected)
+
+
+def test_dice_roll_get_available_targets_is_cached_and_sorted():
+    roll = DiceRoll([6, 1, 5, 2])
+    targets = roll.get_available_targets()
+    assert roll.get_available_targets() is targets
+    assert list(targets) == sorted(targets)
+
+
+def test_dice_roll_from_face_key():
+    roll = DiceRoll.from_face_key(face_count_key([5, 1, 5, 3]))
+    assert roll.values == [1, 3, 5, 5]
+    assert roll.face_counts == (1, 0, 1, 0, 2, 0)
+    assert roll.count_target(5) == 2
+    assert roll.count_combinations(8) == 1
+    assert roll.get_available_targets() == DiceRoll([5, 1, 5, 3]).get_available_targets()
+
+
+def test_dice_roller_histogram_mode() -> None:
+    random.seed(7)
+    roller = DiceRoller(histogram=True)
+    num_rolls = 20000
+    sixes = 0
+    for _ in range(num_rolls):
+        roll = roller.roll()
+        assert len(roll.values) == NUMBER_OF_DICE
+        assert roll.values == sorted(roll.values)
+        sixes += roll.count_target(6)
+    # on average one in six dice shows a six
+    assert abs(sixes / (num_rolls * NUMBER_OF_DICE) - 1 / 6) < 0.01
+    assert len(roller.roll_remaining(2).values) == 2
+
+
+def test_sample_face_key_covers_all_multisets():
+    keys = {sample_face_key(2, i / 1000) for i in range(1000)}
+    assert len(keys) == 21
+    assert sample_face_key(2, 1 - 1e-12) in keys
+
+
+def test_dice_roller_own_generator_is_reproducible() -> None:
+    first = DiceRoller(rng=random.Random(8))
+    second = DiceRoller(rng=random.Random(8))
+    random.seed(9)
+    for target in range(MIN_DICE_NUM, MAX_DICE_NUM + 1):
+        assert first.roll().values == second.roll().values
+        assert first.simulate_turn(target) == second.simulate_turn(target)
+
+
+def test_buffered_dice_roller_refills_blocks() -> None:
+    roller = BufferedDiceRoller(generator=np.random.default_rng(10), block_size=10)
+    again = BufferedDiceRoller(generator=np.random.default_rng(10), block_size=10)
+    faces = []
+    for remaining in [6, 4, 3, 6, 1, 6, 6]:
+        roll = roller.roll_remaining(remaining)
+        assert len(roll.values) == remaining
+        assert roll.values == again.roll_remaining(remaining).values
+        faces.extend(roll.values)
+    assert set(faces) <= set(range(MIN_DICE_NUM, MAX_DICE_NUM + 1))
+    assert len(roller.roll_remaining(25).values) == 25
+
+
+@pytest.mark.parametrize("use_outcome_table", [True, False])
+def test_buffered_dice_roller_simulate_turn(use_outcome_table: bool) -> None:
+    random.seed(11)
+    reference = DiceRoller()
+    roller = BufferedDiceRoller(
+        use_outcome_table=use_outcome_table, generator=np.random.default_rng(11)
+    )
+    expected = np.array([reference.simulate_turn(6) for _ in range(4000)])
+    moves = np.array([roller.simulate_turn(6) for _ in range(4000)])
+    standard_error = np.sqrt(expected.var() / expected.size + moves.var() / moves.size)
+    assert abs(expected.mean() - moves.mean()) < 4 * standard_error
+
+
+def test_game_with_buffered_dice_roller() -> None:
+    game = Game(2, dice_roller=BufferedDiceRoller(generator=np.random.default_rng(12)))
+    winner = game.play_game()
+    assert winner.is_winner()
+
+
+def test_target_stream_dice_roller_draws_turns_per_target() -> None:
+    def target_rng(target: int) -> random.Random:
+        return random.Random(target)
+
+    first = TargetStreamDiceRoller(random.Random(1), target_rng)
+    second = TargetStreamDiceRoller(random.Random(2), target_rng)
+    # other targets in between do not shift the outcomes of a target
+    outcomes = [first.simulate_turn(7) for _ in range(10)]
+    mixed = []
+    for _ in range(10):
+        second.simulate_turn(3)
+        mixed.append(second.simulate_turn(7))
+    assert outcomes == mixed
+    assert first.roll().values != second.roll().values
@@ -0,0 +1,40 @@
+import math
+
+import numpy as np
+import pytest
+
+from opaprikkie_sim.estimators import RunningMoments, StoppingRule, wilson_interval
+
+
+def test_running_moments_match_numpy() -> None:
+    values = np.random.default_rng(0).integers(10, 60, size=500)
+    moments = RunningMoments()
+    for value in values[:200]:
+        moments.add(int(value))
+    moments.merge(RunningMoments.from_histogram(np.bincount(values[200:]).tolist()))
+    moments.merge(RunningMoments())
+
+    assert moments.count == 500
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.variance == pytest.approx(values.var(ddof=1))
+    assert moments.standard_error == pytest.approx(math.sqrt(values.var(ddof=1) / 500))
+
+
+def test_wilson_interval() -> None:
+    low, high = wilson_interval(0, 10)
+    assert low == 0
+    assert high == pytest.approx(0.2775, abs=1e-4)
+    low, high = wilson_interval(50, 100)
+    assert (low + high) / 2 == pytest.approx(0.5)
+    assert high - low == pytest.approx(0.1923, abs=1e-4)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_stopping_rule() -> None:
+    with pytest.raises(ValueError):
+        StoppingRule()
+    rule = StoppingRule(target_ci=0.01, max_seconds=60, max_games=1000)
+    assert rule.reason([50, 50], 100, 1.0) is None
+    assert "maximum of 1000 games" in str(rule.reason([500, 500], 1000, 1.0))
+    assert "time budget of 60 s" in str(rule.reason([5, 5], 10, 61.0))
+    assert "confidence interval" in str(StoppingRule(target_ci=0.05).reason([250, 250], 500, 1))
@@ -0,0 +1,102 @@
+import random
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from opaprikkie_sim.batch import (
+    BatchFinishPegsStrategy,
+    BatchGreedyStrategy,
+    BatchOptimalStrategy,
+    BatchStrategy,
+    StrategyAdapter,
+)
+from opaprikkie_sim.board import Board
+from opaprikkie_sim.dice import DiceRoller
+from opaprikkie_sim.evaluation import choice_probabilities, evaluate_policy
+from opaprikkie_sim.solver import solve
+from opaprikkie_sim.strategy import FinishPegsStrategy, GreedyStrategy, Strategy
+
+ROW_HEIGHT = 1
+
+
+class _SkipStrategy(BatchStrategy):
+    def choose_targets(
+        self,
+        positions: npt.NDArray[np.int8],
+        counts: npt.NDArray[np.int8],
+        rng: np.random.Generator,
+    ) -> npt.NDArray[np.int8]:
+        return np.zeros(positions.shape[0], dtype=np.int8)
+
+
+def test_optimal_policy_matches_solver() -> None:
+    solution = solve(ROW_HEIGHT)
+    evaluation = evaluate_policy(BatchOptimalStrategy(solution), ROW_HEIGHT)
+    assert evaluation.mean == pytest.approx(float(solution.values[0]), rel=1e-6)
+    assert evaluation.tail < 1e-5
+    turns = np.arange(evaluation.pmf.size)
+    assert (turns * evaluation.pmf).sum() == pytest.approx(evaluation.mean, rel=1e-4)
+
+
+def test_greedy_policy_matches_monte_carlo() -> None:
+    evaluation = evaluate_policy(BatchGreedyStrategy(ROW_HEIGHT), ROW_HEIGHT)
+    random.seed(7)
+    roller = DiceRoller()
+    strategy = GreedyStrategy()
+    turns = []
+    for _ in range(1000):
+        board = Board(row_height=ROW_HEIGHT)
+        count = 0
+        while not board.is_complete():
+            count += 1
+            target = strategy.choose_target(board, roller.roll())
+            if target is not None and (moves := roller.simulate_turn(target)):
+                board.move_peg(target, moves)
+        turns.append(count)
+    standard_error = np.sqrt(evaluation.variance / len(turns))
+    assert abs(np.mean(turns) - evaluation.mean) < 4 * standard_error
+    assert np.var(turns) == pytest.approx(evaluation.variance, rel=0.2)
+
+
+def test_evaluation_distribution_helpers() -> None:
+    evaluation = evaluate_policy(BatchFinishPegsStrategy(ROW_HEIGHT), ROW_HEIGHT, max_turns=30)
+    assert evaluation.max_turns == 30
+    assert evaluation.tail > 0
+    assert evaluation.survival()[-1] == pytest.approx(evaluation.tail)
+    assert np.all(np.diff(evaluation.cdf()) >= 0)
+    assert evaluation.pmf[: 12 // 5].sum() == 0  # at most 5 pegs can finish per turn
+
+
+@pytest.mark.parametrize(
+    ("strategy", "batch_strategy"),
+    [
+        (GreedyStrategy(), BatchGreedyStrategy(2)),
+        (FinishPegsStrategy(), BatchFinishPegsStrategy(2)),
+    ],
+)
+def test_strategy_adapter_matches_batch_strategy(
+    strategy: Strategy, batch_strategy: BatchStrategy
+) -> None:
+    positions = np.random.default_rng(8).integers(0, 3, size=(20, 12), dtype=np.int8)
+    expected = choice_probabilities(batch_strategy, positions)
+    actual = choice_probabilities(StrategyAdapter(strategy, 2), positions)
+    assert np.allclose(actual, expected)
+    assert np.allclose(actual.sum(axis=1), 1.0)
+
+
+def test_evaluate_policy_rejects_stuck_strategy() -> None:
+    with pytest.raises(ValueError, match="never makes progress"):
+        evaluate_policy(_SkipStrategy(ROW_HEIGHT), ROW_HEIGHT)
+
+
+def test_evaluate_policy_rejects_other_row_height() -> None:
+    with pytest.raises(ValueError, match="row height"):
+        evaluate_policy(BatchGreedyStrategy(), ROW_HEIGHT)
+
+
+def test_evaluate_policy_rejects_too_many_boards() -> None:
+    with pytest.raises(ValueError, match="2176782336 boards"):
+        evaluate_policy(GreedyStrategy())
+    with pytest.raises(ValueError, match="4096 boards"):
+        evaluate_policy(BatchGreedyStrategy(ROW_HEIGHT), ROW_HEIGHT, max_states=1000)
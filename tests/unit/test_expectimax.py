@@ -0,0 +1,145 @@
+import random
+from collections.abc import Sequence
+
+import pytest
+
+from opaprikkie_sim.board import Board, PackedBoard, Peg
+from opaprikkie_sim.constants import MAX_ROW_HEIGHT
+from opaprikkie_sim.dice import DiceRoll, DiceRoller
+from opaprikkie_sim.expectimax import ExpectimaxSearch, pack_board
+from opaprikkie_sim.game import Game
+from opaprikkie_sim.simulation import run_games
+from opaprikkie_sim.solver import solve
+from opaprikkie_sim.strategy import (
+    CachedStrategy,
+    ExpectimaxStrategy,
+    GreedyStrategy,
+    OpponentAwareStrategy,
+    OptimalStrategy,
+)
+
+
+class _Search(ExpectimaxSearch):
+    def packed_boards(self) -> list[int]:
+        return list(self._keys)
+
+
+def _random_board(rng: random.Random) -> Board:
+    board = Board()
+    for peg in board.pegs:
+        peg.position = rng.randint(0, MAX_ROW_HEIGHT - 1)
+    return board
+
+
+def test_pack_board() -> None:
+    board = Board([Peg(number=2, position=1), Peg(number=12, position=MAX_ROW_HEIGHT + 1)])
+    top = sum(MAX_ROW_HEIGHT << (3 * peg) for peg in range(12))
+    assert pack_board(board) == top - (MAX_ROW_HEIGHT - 1) * 8
+    packed = PackedBoard.from_board(_random_board(random.Random(1)))
+    assert pack_board(packed) == packed.key
+
+
+def test_search_leaves_the_boards_as_they_were() -> None:
+    rng = random.Random(2)
+    boards = [_random_board(rng), _random_board(rng)]
+    search = _Search(MAX_ROW_HEIGHT, 2, 10**9, 1 << 20)
+    target = search.choose_target(boards, [1, 7, 11])
+    assert target in {1, 7, 11}
+    # the second depth is searched completely, and every move was undone
+    assert search.packed_boards() == [pack_board(board) for board in boards]
+    assert search.table
+    assert search.table_hits
+
+
+def test_node_budget_bounds_the_search() -> None:
+    rng = random.Random(3)
+    boards = [_random_board(rng), _random_board(rng)]
+    full = _Search(MAX_ROW_HEIGHT, 2, 10**9, 1 << 20)
+    full.choose_target(boards, [2, 5, 9])
+    limited = _Search(MAX_ROW_HEIGHT, 2, 1000, 1 << 20)
+    limited.choose_target(boards, [2, 5, 9])
+    assert limited.nodes == 1001 < full.nodes
+    assert limited.packed_boards() == full.packed_boards()
+    # the transposition table is cleared when it is full
+    small = ExpectimaxSearch(MAX_ROW_HEIGHT, 2, 10**9, 10)
+    assert small.choose_target(boards, [2, 5, 9]) == full.choose_target(boards, [2, 5, 9])
+    assert len(small.table) <= 10
+
+
+def test_expectimax_strategy_choose_target() -> None:
+    rng = random.Random(6)
+    board, opponent = _random_board(rng), _random_board(rng)
+    roll = DiceRoll([1, 2, 3, 4, 6, 6])
+    strategy = ExpectimaxStrategy(node_budget=2000)
+    target = strategy.choose_target_against(board, roll, [opponent])
+    assert target in roll.get_available_targets()
+    assert strategy.search is not None
+    assert strategy.search.nodes <= 2001
+    same = ExpectimaxStrategy(node_budget=2000)
+    assert same.choose_target_against(board, roll, [opponent]) == target
+    # a single valid target is chosen without a search
+    board = Board([Peg(number=7, position=MAX_ROW_HEIGHT - 1), Peg(number=3, position=4)])
+    assert strategy.choose_target(board, DiceRoll([1, 2, 5, 5, 5, 5])) == 7
+    assert strategy.choose_target(board, DiceRoll([1, 1, 1, 1, 1, 1])) is None
+
+
+def test_expectimax_strategy_alone_minimizes_its_turns() -> None:
+    # on the smallest game, alone, it mostly chooses the targets of the exact solution
+    optimal = OptimalStrategy(solve(1))
+    strategy = ExpectimaxStrategy()
+    rng = random.Random(7)
+    roller = DiceRoller(rng=random.Random(8))
+    decisions = agreements = greedy_agreements = 0
+    while decisions < 50:
+        board = Board(row_height=1)
+        for peg in board.pegs:
+            peg.position = rng.randint(0, 1)
+        roll = roller.roll()
+        if sum(board.is_peg_movable(target) for target in roll.get_available_targets()) < 2:
+            continue
+        decisions += 1
+        best = optimal.choose_target(board, roll)
+        agreements += strategy.choose_target(board, roll) == best
+        greedy_agreements += GreedyStrategy().choose_target(board, roll) == best
+    assert agreements >= 25
+    assert agreements > 2 * greedy_agreements
+
+
+def test_expectimax_strategy_is_not_cached() -> None:
+    with pytest.raises(TypeError, match="sees the opponents"):
+        CachedStrategy(ExpectimaxStrategy())
+
+
+def test_game_passes_the_opponents_in_order_of_play() -> None:
+    seen: list[list[int]] = []
+
+    class Watcher(OpponentAwareStrategy):
+        def choose_target_against(
+            self, board: Board, roll: DiceRoll, opponents: Sequence[Board]
+        ) -> int | None:
+            boards = [player.board for player in game.players]
+            seen.append([next(i for i, b in enumerate(boards) if b is o) for o in opponents])
+            return GreedyStrategy().choose_target(board, roll)
+
+    for headless in (False, True):
+        seen.clear()
+        game = Game(num_players=3, dice_roller=DiceRoller(rng=random.Random(4)), headless=True)
+        game.set_player_strategy(0, GreedyStrategy())
+        game.set_player_strategy(1, Watcher())
+        game.set_player_strategy(2, GreedyStrategy())
+        if headless:
+            game.play_headless()
+        else:
+            game.play_game()
+        assert seen
+        assert all(order == [2, 0] for order in seen)
+
+
+def test_seeded_expectimax_games_are_reproducible() -> None:
+    stats = run_games(2, 2, "expectimax", "greedy", workers=1, seed=5)
+    assert stats.strategy_names == ["ExpectimaxStrategy", "GreedyStrategy"]
+    assert stats == run_games(2, 2, "expectimax", "greedy", workers=1, seed=5)
+    # only the decisions of the greedy strategy are cached
+    cached = run_games(2, 2, "expectimax", "greedy", workers=1, seed=5, cache_decisions=True)
+    assert cached == stats
+    assert cached.cache_misses
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from opaprikkie_sim.dice import DiceRoller
+from opaprikkie_sim.game import Game
+from opaprikkie_sim.profiling import TURN_PHASES, LatencyHistogram, Profiler
+from opaprikkie_sim.strategy import GreedyStrategy
+
+
+def test_latency_histogram() -> None:
+    histogram = LatencyHistogram()
+    for latency in (0, 3, 100, 100, 5000):
+        histogram.add(latency)
+    other = LatencyHistogram()
+    other.add(1 << 20)
+    histogram.merge(other)
+
+    assert histogram.count == 6
+    assert histogram.total_ns == 5203 + (1 << 20)
+    assert histogram.percentile(50) == 128  # 100 is below 2**7
+    assert histogram.percentile(100) == 1 << 21
+    report = histogram.report()
+    assert report["histogram"] == {"1": 1, "4": 1, "128": 2, "8192": 1, str(1 << 21): 1}
+    assert report["p50_ns"] == 128
+
+
+def test_profiler_merge() -> None:
+    profiler = Profiler()
+    profiler.add_phase("roll", 10)
+    profiler.count("rolls")
+    other = Profiler()
+    other.add_phase("roll", 30)
+    other.add_phase("simulate_turn", 60)
+    other.count("rolls", 2)
+    other.lap_decision("GreedyStrategy", 0)
+
+    profiler.merge(other)
+    report = profiler.report()
+    assert report["phases"]["roll"]["calls"] == 2
+    assert report["phases"]["roll"]["mean_ns"] == 20
+    assert report["counts"] == {"rolls": 3}
+    assert report["decisions"]["GreedyStrategy"]["count"] == 1
+    shares = [phase["share"] for phase in report["phases"].values()]
+    assert sum(shares) == pytest.approx(1)
+
+
+def test_game_is_not_profiled_by_default() -> None:
+    game = Game(num_players=2)
+    assert game.profiler is None
+    assert game.dice_roller.profiler is None
+
+
+@pytest.mark.parametrize("use_outcome_table", [True, False])
+def test_profiled_game(use_outcome_table: bool) -> None:
+    roller = DiceRoller(use_outcome_table=use_outcome_table, rng=random.Random(4))
+    game = Game(num_players=2, dice_roller=roller)
+    for seat in range(2):
+        game.set_player_strategy(seat, GreedyStrategy())
+    profiler = Profiler()
+    game.set_profiler(profiler)
+    game.play_game()
+
+    report = profiler.report()
+    turns = report["counts"]["turns"]
+    assert report["phases"]["roll"]["calls"] == turns
+    assert report["phases"]["choose_target"]["calls"] == turns
+    played = turns - report["counts"].get("skipped_turns", 0)
+    assert report["phases"]["simulate_turn"]["calls"] == played
+    assert set(report["phases"]) >= set(TURN_PHASES)
+    assert report["decisions"]["GreedyStrategy"]["count"] == turns
+    if use_outcome_table:
+        assert report["counts"]["table_turns"] == played
+    else:
+        assert report["counts"]["rolls"] >= played
+        assert report["phases"]["turn_rolls"]["share"] is None
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from opaprikkie_sim.batch import BatchFinishPegsStrategy, BatchGame, BatchGreedyStrategy
+from opaprikkie_sim.evaluation import evaluate_policy
+from opaprikkie_sim.race import matchups, race, sample_turns_distribution
+
+ROW_HEIGHT = 1
+
+
+def _point_mass(turns: int) -> np.ndarray:
+    distribution = np.zeros(turns + 1)
+    distribution[turns] = 1.0
+    return distribution
+
+
+@pytest.mark.parametrize(
+    ("turns", "winner"),
+    [
+        ((3, 3), 0),  # the first seat finishes first in the same round
+        ((4, 3), 1),
+        ((5, 4, 4), 1),
+        ((5, 5, 4), 2),
+    ],
+)
+def test_race_first_finisher_wins(turns: tuple[int, ...], winner: int) -> None:
+    result = race([_point_mass(n) for n in turns])
+    assert result.win_probabilities[winner] == 1.0
+    assert result.expected_turn_count == min(turns) - 1
+
+
+def test_race_identical_players_favours_first_seat() -> None:
+    distribution = evaluate_policy(BatchGreedyStrategy(ROW_HEIGHT), ROW_HEIGHT).pmf
+    result = race([distribution] * 3)
+    assert sum(result.win_probabilities) == pytest.approx(1.0, abs=1e-5)
+    assert result.win_probabilities[0] > result.win_probabilities[1] > result.win_probabilities[2]
+
+
+def test_race_matches_batch_game() -> None:
+    strategies = [BatchGreedyStrategy(ROW_HEIGHT), BatchFinishPegsStrategy(ROW_HEIGHT)]
+    exact = race([evaluate_policy(strategy, ROW_HEIGHT).pmf for strategy in strategies])
+
+    num_games = 20000
+    game = BatchGame(num_games, 2, strategies, rng=np.random.default_rng(9), row_height=ROW_HEIGHT)
+    result = game.play()
+    win_rate = float(np.mean(result.winners == 0))
+    standard_error = np.sqrt(win_rate * (1 - win_rate) / num_games)
+    assert abs(win_rate - exact.win_probabilities[0]) < 4 * standard_error
+    assert result.turn_counts.mean() == pytest.approx(exact.expected_turn_count, rel=0.02)
+
+
+def test_sample_turns_distribution_matches_exact() -> None:
+    strategy = BatchGreedyStrategy(ROW_HEIGHT)
+    exact = evaluate_policy(strategy, ROW_HEIGHT)
+    sampled = sample_turns_distribution(strategy, 20000, np.random.default_rng(10))
+    assert sampled.sum() == pytest.approx(1.0)
+    mean = (np.arange(sampled.size) * sampled).sum()
+    assert abs(mean - exact.mean) < 4 * np.sqrt(exact.variance / 20000)
+
+
+def test_matchups_cover_every_seat_order() -> None:
+    distributions = {"a": _point_mass(3), "b": _point_mass(4)}
+    results = matchups(distributions, num_players=3)
+    assert len(results) == 8
+    assert results[("b", "b", "a")].win_probabilities == [0.0, 0.0, 1.0]
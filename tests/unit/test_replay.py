@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from opaprikkie_sim import simulation
+from opaprikkie_sim.board import Board
+from opaprikkie_sim.estimators import StoppingRule
+from opaprikkie_sim.replay import TURN_DTYPE, ReplayWriter, TurnLog, read_replay, verify_game
+from opaprikkie_sim.simulation import create_seeded_game, run_games, run_games_until
+
+NAMES = ["greedy", "smart"]
+
+
+def _record(path: Path, num_games: int, seed: int | None = 7, workers: int = 1) -> None:
+    with ReplayWriter(path, NAMES, seed) as replay:
+        run_games(num_games, 2, "greedy", "smart", workers=workers, seed=seed, replay=replay)
+
+
+def test_turn_log_indexes_games() -> None:
+    log = TurnLog()
+    log.turns.extend((0, 1, 2, 3, 4, 5, 6, 7, 2))
+    log.add_game(5, 0, 0)
+    log.turns.extend((1, 6, 6, 6, 6, 6, 6, 0, 0) * 2)
+    log.add_game(6, 1, 1)
+    assert log.num_turns == 3
+    assert log.games == [(5, 0, 1, 0), (6, 1, 2, 1)]
+    turns = np.frombuffer(log.turns, dtype=TURN_DTYPE)
+    assert turns[0]["roll"].tolist() == [1, 2, 3, 4, 5, 6]
+    assert turns[0]["target"] == 7
+
+
+def test_replay_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "games.replay"
+    _record(path, 30)
+    replay = read_replay(path)
+    assert replay.header == {"num_players": 2, "seed": 7, "strategies": NAMES}
+    assert replay.num_games == 30
+    assert replay.index["game"].tolist() == list(range(30))
+    assert replay.index["num_turns"].sum() == len(replay.turns)
+
+    # the recorded moves lead to the final boards of the game
+    recorded = replay.game(17)
+    game = create_seeded_game(7, 17, NAMES, headless=True)
+    winner, _ = game.play_headless()
+    assert recorded.winner == game.players.index(winner)
+    boards = [Board(), Board()]
+    for turn in recorded.turns:
+        if turn["target"]:
+            boards[turn["seat"]].move_peg(int(turn["target"]), int(turn["moves"]))
+    for board, player in zip(boards, game.players, strict=True):
+        assert board.get_peg_positions() == player.board.get_peg_positions()
+    assert boards[recorded.winner].is_complete()
+    assert verify_game(replay, 17)
+    with pytest.raises(KeyError, match="Game 30 is not in the replay"):
+        replay.game(30)
+
+
+def test_replay_does_not_depend_on_chunks_or_workers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _record(tmp_path / "one.replay", 250)
+    monkeypatch.setattr(simulation, "REPLAY_CHUNK_GAMES", 40)
+    _record(tmp_path / "chunks.replay", 250, workers=2)
+    assert (tmp_path / "one.replay").read_bytes() == (tmp_path / "chunks.replay").read_bytes()
+
+
+def test_replay_of_profiled_run_and_run_until(tmp_path: Path) -> None:
+    with ReplayWriter(tmp_path / "profiled.replay", NAMES, 3) as replay:
+        run_games(20, 2, "greedy", "smart", workers=1, seed=3, profile=True, replay=replay)
+    with ReplayWriter(tmp_path / "until.replay", NAMES, 3) as replay:
+        stats, _ = run_games_until(
+            StoppingRule(max_games=20), 2, "greedy", "smart", workers=1, seed=3, replay=replay
+        )
+    assert stats.num_games == 20
+    profiled = read_replay(tmp_path / "profiled.replay")
+    until = read_replay(tmp_path / "until.replay")
+    assert np.array_equal(profiled.turns, until.turns)
+    assert verify_game(profiled, 19)
+
+
+def test_replay_errors(tmp_path: Path) -> None:
+    with (
+        ReplayWriter(tmp_path / "batch.replay", NAMES) as replay,
+        pytest.raises(ValueError, match="Replays record the turns of Game"),
+    ):
+        run_games(10, 2, "greedy", "smart", engine="batch", replay=replay)
+    (tmp_path / "other.bin").write_bytes(b"not a replay")
+    with pytest.raises(ValueError, match="Not a replay file"):
+        read_replay(tmp_path / "other.bin")
+
+    _record(tmp_path / "unseeded.replay", 3, seed=None)
+    replay_file = read_replay(tmp_path / "unseeded.replay")
+    assert replay_file.num_games == 3
+    with pytest.raises(ValueError, match="seeded run"):
+        verify_game(replay_file, 0)
+
+    # a file that was not closed has no index
+    writer = ReplayWriter(tmp_path / "open.replay", NAMES)
+    writer.file.flush()
+    with pytest.raises(ValueError, match="without a valid game index"):
+        read_replay(tmp_path / "open.replay")
+    writer.close()
+    assert read_replay(tmp_path / "open.replay").num_games == 0
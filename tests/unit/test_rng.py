@@ -0,0 +1,34 @@
+from collections import Counter
+
+import numpy as np
+
+from opaprikkie_sim.rng import (
+    CHOICE_STREAM,
+    DICE_STREAM,
+    GeneratorRandom,
+    game_random,
+    philox_generator,
+)
+
+
+def test_streams_are_reproducible_and_distinct() -> None:
+    first = philox_generator(7, 1000, 1).random(5)
+    assert np.array_equal(first, philox_generator(7, 1000, 1).random(5))
+    assert not np.array_equal(first, philox_generator(7, 1001, 1).random(5))
+    assert not np.array_equal(first, philox_generator(7, 1000, 0).random(5))
+    assert not np.array_equal(first, philox_generator(7, 1000, 1, CHOICE_STREAM).random(5))
+    assert not np.array_equal(first, philox_generator(8, 1000, 1).random(5))
+
+
+def test_counter_random_matches_generator_across_refills() -> None:
+    source = game_random(3, 2**40, 2, DICE_STREAM)
+    values = [source.random() for _ in range(600)]
+    assert np.array_equal(values, philox_generator(3, 2**40, 2).random(600))
+
+
+def test_counter_random_randint_and_choice() -> None:
+    source = GeneratorRandom(np.random.default_rng(0))
+    faces = Counter(source.randint(1, 6) for _ in range(6000))
+    assert set(faces) == {1, 2, 3, 4, 5, 6}
+    assert all(abs(count - 1000) < 150 for count in faces.values())
+    assert {source.choice("abc") for _ in range(100)} == {"a", "b", "c"}
@@ -0,0 +1,62 @@
+import itertools
+
+import pytest
+
+from opaprikkie_sim.roll_table import (
+    count_matches,
+    face_count_key,
+    face_counts_to_key,
+    iter_face_counts,
+    key_to_face_counts,
+    targets_for_key,
+)
+
+
+def test_face_count_key_ignores_order():
+    assert face_count_key([1, 2, 2, 6]) == face_count_key([2, 6, 1, 2])
+    assert face_count_key([1, 2, 2, 6]) != face_count_key([1, 2, 6, 6])
+
+
+def test_face_count_key_round_trip():
+    key = face_count_key([3, 3, 5, 1, 3, 6])
+    assert key_to_face_counts(key) == (1, 0, 3, 0, 1, 1)
+    assert face_counts_to_key((1, 0, 3, 0, 1, 1)) == key
+
+
+@pytest.mark.parametrize(("num_dice", "expected"), [(0, 1), (1, 6), (2, 21), (6, 462)])
+def test_iter_face_counts(num_dice: int, expected: int) -> None:
+    multisets = list(iter_face_counts(num_dice))
+    assert len(multisets) == expected
+    assert len(set(multisets)) == expected
+    assert all(sum(face_counts) == num_dice for face_counts in multisets)
+
+
+@pytest.mark.parametrize(
+    ("face_counts", "target", "expected"),
+    [
+        ((2, 0, 0, 0, 0, 2), 7, 2),
+        ((0, 0, 0, 0, 3, 0), 10, 1),
+        ((1, 1, 1, 1, 1, 1), 7, 3),
+        ((0, 0, 0, 0, 0, 6), 12, 3),
+        ((0, 0, 0, 0, 0, 6), 6, 6),
+    ],
+)
+def test_count_matches(face_counts: tuple[int, ...], target: int, expected: int) -> None:
+    assert count_matches(face_counts, target) == expected
+
+
+def test_targets_for_key_all_rolls_of_three_dice():
+    for values in itertools.product(range(1, 7), repeat=3):
+        targets = targets_for_key(face_count_key(values))
+        for target in range(1, 13):
+            if target <= 6:
+                expected = values.count(target)
+            else:
+                expected = int(any(a + b == target for a, b in itertools.combinations(values, 2)))
+            assert targets.get(target, 0) == expected
+        assert list(targets) == sorted(targets)
+
+
+def test_targets_for_key_more_dice_than_table():
+    targets = targets_for_key(face_count_key([6] * 8))
+    assert targets == {6: 8, 12: 4}
@@ -0,0 +1,102 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from opaprikkie_sim.board import Board, PackedBoard, Peg
+from opaprikkie_sim.constants import MAX_ROW_HEIGHT
+from opaprikkie_sim.dice import DiceRoll
+from opaprikkie_sim.rollout import board_positions, estimate_targets, play_rollouts
+from opaprikkie_sim.simulation import run_games
+from opaprikkie_sim.strategy import CachedStrategy, RolloutStrategy
+from opaprikkie_sim.turn_table import turn_outcome_distribution
+
+
+def test_board_positions() -> None:
+    board = Board([Peg(number=2, position=1), Peg(number=7, position=MAX_ROW_HEIGHT + 1)])
+    positions = board_positions(board)
+    assert positions.tolist() == [MAX_ROW_HEIGHT, 1, *[MAX_ROW_HEIGHT] * 10]
+    packed = PackedBoard.from_board(Board())
+    packed.move_peg(12, 3)
+    assert board_positions(packed).tolist() == [0] * 11 + [3]
+
+
+def test_play_rollouts_counts_the_turns_to_finish() -> None:
+    # only pegs 3 and 9 are left, one step each
+    positions = np.full(12, MAX_ROW_HEIGHT, dtype=np.int8)
+    positions[[2, 8]] = MAX_ROW_HEIGHT - 1
+    turns = play_rollouts(positions, [3, 9], 50, "greedy", 6, MAX_ROW_HEIGHT, seed=1)
+    assert turns.shape == (2,)
+    # every rollout takes at least the turns of both pegs
+    assert (turns >= 2 * 50).all()
+    assert np.array_equal(turns, play_rollouts(positions, [3, 9], 50, "greedy", 6, 5, seed=1))
+
+
+def test_estimate_targets_matches_the_expected_turns() -> None:
+    # only peg 1 is left, one step from the top of a row of height 1
+    positions = np.ones(12, dtype=np.int8)
+    positions[0] = 0
+    estimate = estimate_targets(
+        positions, [1], random.Random(2), "greedy", 4000, 1000, row_height=1
+    )
+    # every turn moves with probability q, later turns only when a 1 is rolled
+    q = 1 - float(turn_outcome_distribution(1, 6)[0])
+    p = 1 - (5 / 6) ** 6
+    expected = 1 + (1 - q) / (p * q)
+    assert estimate.best_target == 1
+    assert abs(estimate.mean_turns[0] - expected) < 0.05 * expected
+
+
+def test_estimate_targets_budgets() -> None:
+    positions = np.zeros(12, dtype=np.int8)
+    estimate = estimate_targets(positions, [2, 5], random.Random(3), "smart", 10, 4)
+    assert estimate.rollouts == 10
+    # the time budget is checked after every round
+    estimate = estimate_targets(positions, [2, 5], random.Random(3), "smart", 10, 4, 0.0)
+    assert estimate.rollouts == 4
+
+
+def test_estimate_targets_on_executor() -> None:
+    positions = np.zeros(12, dtype=np.int8)
+    positions[:6] = MAX_ROW_HEIGHT
+    with ThreadPoolExecutor(2) as executor:
+        estimate = estimate_targets(
+            positions, [7, 8], random.Random(4), "greedy", 9, 9, executor=executor, workers=2
+        )
+    assert estimate.rollouts == 9
+    assert (estimate.total_turns >= 6 * 9).all()
+
+
+def test_rollout_strategy_choose_target() -> None:
+    board = Board([Peg(number=1, position=0), Peg(number=12, position=0)])
+    strategy = RolloutStrategy(random.Random(5), rollouts=16)
+    assert strategy.choose_target(board, DiceRoll([1, 6, 6, 2, 3, 4])) == 1
+    assert strategy.decisions == 1
+    assert strategy.rollouts_played == 2 * 16
+    # a single valid target is chosen without rollouts
+    assert strategy.choose_target(board, DiceRoll([1, 2, 3, 4, 5, 5])) == 1
+    assert strategy.choose_target(board, DiceRoll([2, 2, 3, 3, 4, 5])) is None
+    assert strategy.decisions == 1
+
+
+def test_rollout_strategy_is_reproducible() -> None:
+    board = Board()
+    roll = DiceRoll([1, 2, 3, 4, 5, 6])
+    first = RolloutStrategy(random.Random(6), rollouts=8)
+    second = RolloutStrategy(random.Random(6), rollouts=8)
+    choices = [first.choose_target(board, roll) for _ in range(3)]
+    assert choices == [second.choose_target(board, roll) for _ in range(3)]
+
+
+def test_rollout_strategy_rejects_unknown_base() -> None:
+    with pytest.raises(ValueError, match="Unknown base strategy"):
+        RolloutStrategy(base="rollout")
+    with pytest.raises(TypeError, match="cannot be cached"):
+        CachedStrategy(RolloutStrategy())
+
+
+def test_seeded_rollout_games_are_reproducible() -> None:
+    stats = run_games(2, 2, "rollout", "greedy", workers=1, seed=3)
+    assert stats.strategy_names == ["RolloutStrategy", "GreedyStrategy"]
+    assert stats == run_games(2, 2, "rollout", "greedy", workers=1, seed=3)
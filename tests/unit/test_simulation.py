@@ -0,0 +1,190 @@
+import logging
+import random
+
+import pytest
+
+from opaprikkie_sim import simulation
+from opaprikkie_sim.estimators import StoppingRule
+from opaprikkie_sim.simulation import (
+    SimulationStats,
+    create_seeded_game,
+    play_classic_games,
+    run_games,
+    run_games_until,
+    seat_strategies,
+)
+
+
+def test_seat_strategies() -> None:
+    assert seat_strategies(1, "greedy", "smart") == ["greedy"]
+    assert seat_strategies(3, "greedy", "smart") == ["greedy", "smart", "random"]
+
+
+def test_stats_record_and_merge() -> None:
+    stats = SimulationStats(2)
+    stats.record(0, 3)
+    stats.record(1, 5)
+    other = SimulationStats(2, strategy_names=["A", "B"])
+    other.record(1, 7)
+
+    stats.merge(other)
+    assert stats.strategy_names == ["A", "B"]
+    assert stats.num_games == 3
+    assert stats.wins == [1, 2]
+    assert stats.total_turns == 15
+    assert stats.turn_histogram == [0, 0, 0, 1, 0, 1, 0, 1]
+    assert stats.average_turns == 5
+
+
+@pytest.mark.parametrize("engine", ["classic", "batch"])
+def test_run_games_in_worker_processes(engine: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(simulation.MIN_PARALLEL_GAMES, engine, 0)
+    stats = run_games(30, 3, "greedy", "smart", engine=engine, workers=2)
+    assert stats.num_games == 30
+    assert sum(stats.wins) == 30
+    assert sum(stats.turn_histogram) == 30
+    assert stats.total_turns == sum(n * games for n, games in enumerate(stats.turn_histogram))
+    assert len(stats.strategy_names) == 3
+
+
+@pytest.mark.parametrize("engine", ["classic", "batch"])
+def test_run_games_in_worker_threads(engine: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(simulation.MIN_PARALLEL_GAMES, engine, 0)
+    stats = run_games(30, 2, "random", "smart", engine=engine, workers=2, executor="thread")
+    assert stats.num_games == 30
+    assert sum(stats.wins) == 30
+    assert sum(stats.turn_histogram) == 30
+
+
+def test_play_classic_games_with_own_generator_and_logger(caplog: pytest.LogCaptureFixture) -> None:
+    game_logger = logging.getLogger("opaprikkie_sim.test_worker")
+    with caplog.at_level(logging.DEBUG, logger=game_logger.name):
+        first = play_classic_games(
+            100, 2, "random", "greedy", rng=random.Random(3), game_logger=game_logger
+        )
+    second = play_classic_games(100, 2, "random", "greedy", rng=random.Random(3))
+    assert first == second
+    # headless games log nothing, the progress of the run goes to the given logger
+    assert any(
+        record.name == game_logger.name and "Completed 100 games" in record.getMessage()
+        for record in caplog.records
+    )
+
+
+@pytest.mark.parametrize(("engine", "executor"), [("classic", "process"), ("batch", "thread")])
+def test_seeded_run_does_not_depend_on_workers(
+    engine: str, executor: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(simulation.MIN_PARALLEL_GAMES, engine, 0)
+    monkeypatch.setattr(simulation, "SEED_BLOCK_GAMES", 8)
+    serial = run_games(40, 2, "random", "greedy", engine=engine, workers=1, seed=11)
+    parallel = run_games(
+        40, 2, "random", "greedy", engine=engine, workers=3, executor=executor, seed=11
+    )
+    assert serial == parallel
+    assert serial != run_games(40, 2, "random", "greedy", engine=engine, workers=1, seed=12)
+
+
+def test_seeded_game_is_regenerated_on_its_own() -> None:
+    names = ["random", "greedy"]
+    stats = play_classic_games(6, 2, "random", "greedy", seed=5)
+    results = []
+    for game_index in range(6):
+        game = create_seeded_game(5, game_index, names)
+        winner = game.play_game()
+        results.append((game.players.index(winner), game.state.turn_count))
+    assert sum(turn_count for _, turn_count in results) == stats.total_turns
+    assert [sum(winner == seat for winner, _ in results) for seat in range(2)] == stats.wins
+
+    game = create_seeded_game(5, 4, names)
+    game.play_game()
+    again = create_seeded_game(5, 4, names)
+    again.play_game()
+    assert game.get_game_state() == again.get_game_state()
+
+
+@pytest.mark.parametrize("engine", ["classic", "batch"])
+def test_run_games_until_max_games_does_not_depend_on_workers(
+    engine: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(simulation.STOPPING_CHUNK_GAMES, engine, 8)
+    monkeypatch.setattr(simulation, "SEED_BLOCK_GAMES", 4)
+    rule = StoppingRule(max_games=30)
+    serial, reason = run_games_until(rule, 2, "random", "greedy", engine, workers=1, seed=2)
+    parallel, _ = run_games_until(rule, 2, "random", "greedy", engine, workers=2, seed=2)
+    assert serial.num_games == 30
+    assert "maximum of 30 games" in reason
+    assert parallel == serial
+    assert serial == run_games(30, 2, "random", "greedy", engine=engine, seed=2)
+
+
+def test_run_games_until_target_interval(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(simulation.STOPPING_CHUNK_GAMES, "batch", 100)
+    stats, reason = run_games_until(StoppingRule(target_ci=0.05), engine="batch", workers=1)
+    assert "confidence interval" in reason
+    # a win rate close to 1/2 needs about 400 games for +/-0.05
+    assert 300 <= stats.num_games <= 500
+    assert stats.turn_moments.count == stats.num_games
+    assert stats.turn_moments.mean == pytest.approx(stats.average_turns)
+
+
+def test_run_games_until_time_budget() -> None:
+    stats, reason = run_games_until(StoppingRule(max_seconds=0), workers=1)
+    assert stats.num_games == simulation.STOPPING_CHUNK_GAMES["classic"]
+    assert "time budget" in reason
+
+
+def test_run_games_until_rejects_race_engine() -> None:
+    with pytest.raises(ValueError, match="cannot stop early"):
+        run_games_until(StoppingRule(max_games=10), engine="race")
+
+
+@pytest.mark.parametrize(("num_games", "num_players", "seed"), [(7, 3, 2), (1000, 4, 0)])
+def test_race_wins_add_up_to_the_games(num_games: int, num_players: int, seed: int) -> None:
+    # the expected wins of every seat, rounded on their own, miss the games with these seeds
+    stats = run_games(num_games, num_players, "greedy", "smart", engine="race", seed=seed)
+    assert sum(stats.wins) == stats.num_games == num_games
+
+
+def test_run_games_rejects_unknown_executor() -> None:
+    with pytest.raises(ValueError, match="Unknown executor"):
+        run_games(10, executor="fiber")
+
+
+def test_run_games_rejects_unknown_engine() -> None:
+    with pytest.raises(ValueError, match="Unknown engine"):
+        run_games(10, engine="quantum")
+
+
+def test_run_games_profile_is_merged_across_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(simulation.MIN_PARALLEL_GAMES, "classic", 0)
+    stats = run_games(20, 2, "greedy", "smart", workers=2, seed=3, profile=True)
+    assert stats.profile is not None
+    report = stats.profile.report()
+    assert report["counts"]["turns"] == report["phases"]["roll"]["calls"]
+    assert set(report["decisions"]) == {"GreedyStrategy", "FinishPegsStrategy"}
+    assert run_games(20, 2, "greedy", "smart", workers=1, seed=3).profile is None
+
+
+def test_cached_decisions_do_not_change_the_results(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(simulation.MIN_PARALLEL_GAMES, "classic", 0)
+    stats = run_games(30, 2, "greedy", "smart", workers=1, seed=4)
+    cached = run_games(30, 2, "greedy", "smart", workers=1, seed=4, cache_decisions=True)
+    assert cached == stats
+    assert run_games(30, 2, "greedy", "smart", workers=2, seed=4, cache_decisions=True) == stats
+    assert cached.strategy_names == ["GreedyStrategy", "FinishPegsStrategy"]
+    assert cached.cache_hits + cached.cache_misses > 0
+    assert stats.cache_hits == stats.cache_misses == 0
+    # the caches of the thread are kept, the same games only hit them
+    again = run_games(30, 2, "greedy", "smart", workers=1, seed=4, cache_decisions=True)
+    assert again.cache_misses == 0
+
+
+def test_run_games_cached_decisions_need_classic_engine() -> None:
+    with pytest.raises(ValueError, match="classic engine"):
+        run_games(10, 2, "greedy", "smart", engine="batch", cache_decisions=True)
+
+
+def test_run_games_profile_needs_classic_engine() -> None:
+    with pytest.raises(ValueError, match="classic engine"):
+        run_games(10, 2, "greedy", "smart", engine="batch", profile=True)
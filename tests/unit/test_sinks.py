@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from opaprikkie_sim import simulation
+from opaprikkie_sim.constants import MAX_ROW_HEIGHT
+from opaprikkie_sim.simulation import run_games
+from opaprikkie_sim.sinks import (
+    STRATEGY_CODES,
+    BinarySink,
+    JsonlSink,
+    read_results,
+    result_dtype,
+    strategy_codes,
+)
+
+
+def _records(num_games: int) -> np.ndarray:
+    records = np.zeros(num_games, dtype=result_dtype(2))
+    records["game"] = np.arange(num_games)
+    records["seats"] = strategy_codes(["greedy", "smart"])
+    records["winner"] = np.arange(num_games) % 2
+    records["turn_count"] = 20 + np.arange(num_games)
+    records["positions"][:, 0] = MAX_ROW_HEIGHT
+    return records
+
+
+def test_jsonl_sink(tmp_path: Path) -> None:
+    path = tmp_path / "results.jsonl"
+    with JsonlSink(path, 2, seed=7) as sink:
+        sink.write(_records(3))
+        sink.write(_records(0))
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 3
+    assert lines[1] == {
+        "game": 1,
+        "seed": 7,
+        "strategies": ["greedy", "smart"],
+        "winner": 1,
+        "turn_count": 21,
+        "positions": [[MAX_ROW_HEIGHT] * 12, [0] * 12],
+    }
+
+
+def test_binary_sink_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "results.bin"
+    with BinarySink(path, 2, seed=7) as sink:
+        sink.write(_records(3))
+        sink.write(_records(2))
+    header, records = read_results(path)
+    assert header == {"num_players": 2, "seed": 7, "strategies": STRATEGY_CODES}
+    assert len(records) == 5
+    assert np.array_equal(records[3:], _records(2))
+
+
+def test_read_results_of_empty_run_and_other_files(tmp_path: Path) -> None:
+    BinarySink(tmp_path / "empty.bin", 3).close()
+    assert len(read_results(tmp_path / "empty.bin")[1]) == 0
+    (tmp_path / "other.bin").write_bytes(b"not results")
+    with pytest.raises(ValueError, match="Not a binary results file"):
+        read_results(tmp_path / "other.bin")
+
+
+@pytest.mark.parametrize(("engine", "workers"), [("classic", 1), ("classic", 2), ("batch", 2)])
+def test_run_games_streams_every_game(
+    engine: str, workers: int, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(simulation.MIN_PARALLEL_GAMES, engine, 0)
+    monkeypatch.setattr(simulation, "SINK_CHUNK_GAMES", 7)
+    path = tmp_path / "results.bin"
+    with BinarySink(path, 3) as sink:
+        stats = run_games(30, 3, "greedy", "smart", engine=engine, workers=workers, sink=sink)
+    _, records = read_results(path)
+
+    assert records["game"].tolist() == list(range(30))
+    assert np.bincount(records["winner"], minlength=3).tolist() == stats.wins
+    assert int(records["turn_count"].sum()) == stats.total_turns
+    assert [STRATEGY_CODES[code] for code in records["seats"][0]] == ["greedy", "smart", "random"]
+    winning_boards = records["positions"][np.arange(30), records["winner"]]
+    assert np.all(winning_boards == MAX_ROW_HEIGHT)
+
+
+def test_race_engine_has_no_per_game_results(tmp_path: Path) -> None:
+    with JsonlSink(tmp_path / "results.jsonl", 2) as sink, pytest.raises(ValueError):
+        run_games(10, engine="race", sink=sink)
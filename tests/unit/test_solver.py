@@ -0,0 +1,158 @@
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from opaprikkie_sim import solver
+from opaprikkie_sim.board import Board, Peg
+from opaprikkie_sim.dice import DiceRoll, DiceRoller
+from opaprikkie_sim.roll_table import multiset_probabilities, targets_for_key
+from opaprikkie_sim.solver import (
+    SolitaireSolution,
+    availability_table,
+    board_index,
+    check_solution,
+    get_solution,
+    move_probabilities,
+    pack_policy,
+    solve,
+    state_index,
+    unpack_policy,
+)
+from opaprikkie_sim.strategy import GreedyStrategy, OptimalStrategy, Strategy
+
+ROW_HEIGHT = 1
+
+
+@pytest.fixture(scope="module")
+def solution() -> SolitaireSolution:
+    return solve(ROW_HEIGHT)
+
+
+def test_state_index_of_board():
+    board = Board(row_height=2)
+    board.move_peg(1, 1)
+    board.move_peg(12, 2)
+    assert board_index(board) == state_index([1, *[0] * 10, 2], 2) == 1 + 2 * 3**11
+
+
+def test_board_index_treats_missing_pegs_as_finished():
+    board = Board([Peg(number=3, position=0, max_position=1)], row_height=1)
+    assert board_index(board) == sum(2**n for n in range(12) if n != 2)
+
+
+def test_availability_table():
+    table = availability_table()
+    assert table[0] == pytest.approx(1.0)
+    # no roll of six dice misses both every face and every pair
+    assert table[(1 << 12) - 1] == 0.0
+    # probability that no die shows a one
+    assert table[1] == pytest.approx((5 / 6) ** 6)
+
+
+def test_pack_policy_round_trip():
+    order = np.array([[3, 0, 11, *range(1, 3), *range(4, 11)]])
+    usable = np.array([[True, True, True, *[False] * 9]])
+    assert unpack_policy(pack_policy(order, usable))[0].tolist() == [3, 0, 11, *[-1] * 9]
+
+
+def test_values_satisfy_bellman_equation(solution: SolitaireSolution) -> None:
+    """V(s) = 1 + E_roll[min(V(s), min over rolled open targets of Q)] on sampled boards."""
+    moves = move_probabilities()
+    base = ROW_HEIGHT + 1
+    rolls = list(multiset_probabilities(6).items())
+    for index in np.random.default_rng(0).integers(0, solution.values.size - 1, 100):
+        positions = [int(index) // base**t % base for t in range(12)]
+        value = float(solution.values[index])
+        q = {}
+        for t, position in enumerate(positions):
+            if position < ROW_HEIGHT:
+                successor = float(solution.values[index + base**t])
+                q[t + 1] = moves[0, t] * value + (1 - moves[0, t]) * successor
+        bellman = 1 + sum(
+            p * min([value, *(q[t] for t in targets_for_key(key) if t in q)]) for key, p in rolls
+        )
+        assert bellman == pytest.approx(value, rel=1e-5)
+
+
+def _play_solitaire(strategy: Strategy, num_games: int) -> np.ndarray:
+    roller = DiceRoller()
+    turns = []
+    for _ in range(num_games):
+        board = Board(row_height=ROW_HEIGHT)
+        count = 0
+        while not board.is_complete():
+            count += 1
+            target = strategy.choose_target(board, roller.roll())
+            if target is not None:
+                moves = roller.simulate_turn(target)
+                if moves:
+                    board.move_peg(target, moves)
+        turns.append(count)
+    return np.array(turns)
+
+
+def test_optimal_strategy_plays_expected_turns(solution: SolitaireSolution) -> None:
+    random.seed(1)
+    turns = _play_solitaire(OptimalStrategy(solution), 1500)
+    standard_error = turns.std() / np.sqrt(turns.size)
+    assert abs(turns.mean() - solution.values[0]) < 4 * standard_error
+
+    greedy = _play_solitaire(GreedyStrategy(), 1500)
+    assert turns.mean() < greedy.mean()
+
+
+def test_optimal_strategy_only_chooses_rolled_targets(solution: SolitaireSolution) -> None:
+    strategy = OptimalStrategy(solution)
+    board = Board(row_height=ROW_HEIGHT)
+    assert strategy.choose_target(board, DiceRoll([1, 1, 1, 1, 1, 1])) in {1, 2}
+    board.move_peg(1, 1)
+    board.move_peg(2, 1)
+    assert strategy.choose_target(board, DiceRoll([1, 1, 1, 1, 1, 1])) is None
+
+
+def test_solution_without_policy_ranks_from_values(solution: SolitaireSolution) -> None:
+    without_policy = SolitaireSolution(ROW_HEIGHT, solution.values)
+    for index in range(0, solution.values.size, 97):
+        assert without_policy.preferences(index) == solution.preferences(index)
+
+
+def test_parallel_solve_to_directory(
+    solution: SolitaireSolution, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(solver, "_PARALLEL_MIN_STATES", 0)
+    solve(ROW_HEIGHT, workers=2, directory=tmp_path)
+    loaded = SolitaireSolution.load(tmp_path)
+    assert loaded.row_height == ROW_HEIGHT
+    assert np.array_equal(loaded.values, solution.values)
+    assert loaded.policy is not None
+    assert solution.policy is not None
+    assert np.array_equal(loaded.policy, solution.policy)
+
+
+def test_get_solution_loads_from_solution_dir(
+    solution: SolitaireSolution, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    solution.save(tmp_path / f"h{ROW_HEIGHT}")
+    monkeypatch.setenv(solver.SOLUTION_DIR_ENV, str(tmp_path))
+    get_solution.cache_clear()
+    try:
+        assert isinstance(get_solution(ROW_HEIGHT).values, np.memmap)
+        with pytest.raises(FileNotFoundError):
+            get_solution(5)
+    finally:
+        get_solution.cache_clear()
+
+
+def test_check_solution(
+    solution: SolitaireSolution, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv(solver.SOLUTION_DIR_ENV, raising=False)
+    # small games are solved on first use
+    check_solution(2)
+    with pytest.raises(FileNotFoundError, match="solve --row-height 5"):
+        check_solution()
+    monkeypatch.setenv(solver.SOLUTION_DIR_ENV, str(tmp_path))
+    solution.save(tmp_path / "h5")
+    check_solution()
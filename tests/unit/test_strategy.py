@@ -1,3 +1,4 @@
+import itertools
 import random
 
 import pytest
@@ -5,7 +6,14 @@ import pytest
 from opaprikkie_sim.board import Board, Peg
 from opaprikkie_sim.constants import MAX_ROW_HEIGHT
 from opaprikkie_sim.dice import DiceRoll
-from opaprikkie_sim.strategy import FinishPegsStrategy, GreedyStrategy, RandomStrategy
+from opaprikkie_sim.strategy import (
+    DECISION_CACHE_ENTRY_BYTES,
+    CachedStrategy,
+    FinishPegsStrategy,
+    GreedyStrategy,
+    RandomStrategy,
+    Strategy,
+)
 
 
 @pytest.mark.parametrize(
@@ -73,3 +81,71 @@ def test_finish_pegs_strategy_choose_target() -> None:
     strat = FinishPegsStrategy()
     # Should pick 4 (closest to completion, gets bonus)
     assert strat.choose_target(board, roll) == 4
+
+
+@pytest.mark.parametrize("strategy", [GreedyStrategy(), FinishPegsStrategy()])
+def test_heuristic_strategies_break_ties_towards_the_lowest_target(strategy: Strategy) -> None:
+    # 1, 3, 6, 7 and 9 all move a peg at the bottom once: the choice must not depend on the
+    # order of the dice, as the decision caches look decisions up by the multiset of faces
+    board = Board([Peg(number=n, position=0) for n in range(1, 13)])
+    for values in itertools.permutations([6, 1, 3]):
+        assert strategy.choose_target(board, DiceRoll(list(values))) == 1
+    board.get_peg(1).position = MAX_ROW_HEIGHT  # type: ignore[union-attr]
+    assert strategy.choose_target(board, DiceRoll([6, 3, 1])) == 3
+
+
+def test_random_strategy_own_generator_is_reproducible() -> None:
+    board = Board([Peg(number=n, position=0) for n in range(1, 13)])
+    roll = DiceRoll([1, 2, 3, 4, 5, 6])
+    first = RandomStrategy(random.Random(1))
+    second = RandomStrategy(random.Random(1))
+    choices = [first.choose_target(board, roll) for _ in range(20)]
+    assert choices == [second.choose_target(board, roll) for _ in range(20)]
+    assert len(set(choices)) > 1
+
+
+def test_cached_strategy_matches_wrapped_strategy() -> None:
+    rng = random.Random(3)
+    boards = []
+    for _ in range(50):
+        board = Board()
+        for peg in board.pegs:
+            peg.position = rng.randint(0, MAX_ROW_HEIGHT)
+        boards.append(board)
+    rolls = [DiceRoll([rng.randint(1, 6) for _ in range(6)]) for _ in range(50)]
+    strategy = FinishPegsStrategy()
+    cached = CachedStrategy(FinishPegsStrategy())
+    for _ in range(2):
+        for board, roll in zip(boards, rolls, strict=True):
+            assert cached.choose_target(board, roll) == strategy.choose_target(board, roll)
+    assert cached.misses == 50
+    assert cached.hits == 50
+    assert cached.hit_rate == 0.5
+    # the same dice in another order are the same decision
+    cached.choose_target(boards[0], DiceRoll(sorted(rolls[0].values, reverse=True)))
+    assert cached.hits == 51
+
+
+def test_cached_strategy_evicts_least_recently_used() -> None:
+    cached = CachedStrategy(GreedyStrategy(), max_bytes=2 * DECISION_CACHE_ENTRY_BYTES)
+    board = Board()
+    first, second, third = DiceRoll([1, 1, 2]), DiceRoll([3, 3, 4]), DiceRoll([5, 5, 6])
+    cached.choose_target(board, first)
+    cached.choose_target(board, second)
+    cached.choose_target(board, first)  # second is now the least recently used
+    cached.choose_target(board, third)
+    assert cached.num_entries == 2
+    assert cached.evictions == 1
+    cached.choose_target(board, first)
+    assert cached.hits == 2
+    cached.choose_target(board, second)
+    assert cached.misses == 4
+
+    cached.clear()
+    assert cached.num_entries == 0
+    assert cached.hits == cached.misses == cached.evictions == 0
+
+
+def test_cached_strategy_rejects_random_strategy() -> None:
+    with pytest.raises(TypeError, match="random choices"):
+        CachedStrategy(RandomStrategy())
@@ -0,0 +1,73 @@
+import pytest
+
+from opaprikkie_sim import tournament
+from opaprikkie_sim.simulation import SEED_BLOCK_GAMES, play_batch_lineup, run_games
+from opaprikkie_sim.tournament import run_tournament, tournament_lineups
+
+
+def test_tournament_lineups() -> None:
+    assert tournament_lineups(["greedy", "smart"], 2) == [("greedy", "smart"), ("smart", "greedy")]
+    lineups = tournament_lineups(["random", "greedy", "smart"], 3)
+    # 3**3 seatings without the 3 of a single strategy
+    assert len(lineups) == 24
+    assert ("greedy", "random", "random") in lineups
+    assert ("random", "random", "greedy") in lineups
+    assert ("random", "greedy", "smart") in lineups
+    assert ("smart", "smart", "smart") not in lineups
+
+
+def test_win_rate_matrix() -> None:
+    result = run_tournament(30, ["greedy", "smart"], [2, 3], workers=1, seed=5)
+    assert len(result.stats) == 2 + 6
+    assert all(stats.num_games == 30 for stats in result.stats.values())
+
+    matrix = result.win_rate_matrix(2)
+    assert matrix[0][0] is None
+    assert matrix[1][1] is None
+    greedy_stats = result.stats[("greedy", "smart")]
+    smart_stats = result.stats[("smart", "greedy")]
+    expected = (greedy_stats.wins[0] + smart_stats.wins[1]) / 60
+    assert matrix[0][1] == pytest.approx(expected)
+    # in two-player games the two rates of a matchup sum to one
+    assert matrix[0][1] + matrix[1][0] == pytest.approx(1)  # type: ignore[operator]
+
+
+def test_win_rate_matrix_sums_mixed_lineups() -> None:
+    result = run_tournament(20, ["random", "greedy", "smart"], [3], workers=1, seed=6)
+    assert len(result.stats) == 24
+    # greedy against random: every seat of greedy in every lineup with random
+    wins = games = 0
+    for lineup, stats in result.stats.items():
+        if "random" in lineup:
+            seats = [seat for seat, name in enumerate(lineup) if name == "greedy"]
+            wins += sum(stats.wins[seat] for seat in seats)
+            games += len(seats) * stats.num_games
+    # 9 seats of greedy in the 6 lineups of greedy and random, 1 in each of the 6 mixed ones
+    assert games == 20 * (9 + 6)
+    assert result.win_rate_matrix(3)[1][0] == pytest.approx(wins / games)
+
+
+@pytest.mark.parametrize("engine", ["classic", "batch"])
+def test_parallel_tournament_matches_serial(engine: str) -> None:
+    serial = run_tournament(250, ["random", "greedy"], [2], engine, workers=1, seed=9)
+    parallel = run_tournament(250, ["random", "greedy"], [2], engine, workers=2, seed=9)
+    assert parallel.stats == serial.stats
+
+
+def test_seeded_batch_chunks_play_every_game_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(tournament.TOURNAMENT_CHUNK_GAMES, "batch", 1000)
+    num_games = SEED_BLOCK_GAMES + 500
+    result = run_tournament(num_games, ["random", "greedy"], [2], "batch", workers=1, seed=4)
+    # the chunks are whole blocks, so every game plays its own stream as in one chunk
+    whole = run_games(num_games, 2, "random", "greedy", "batch", workers=1, seed=4)
+    assert result.stats[("random", "greedy")] == whole
+    # a chunk that starts inside a block would replay the games of the block
+    with pytest.raises(ValueError, match="multiple of"):
+        play_batch_lineup(10, ["random", "greedy"], seed=4, first_game=1000)
+
+
+def test_tournament_needs_two_strategies() -> None:
+    with pytest.raises(ValueError, match="two strategies"):
+        run_tournament(10, ["greedy", "greedy"], [2])
+    with pytest.raises(ValueError, match="Unknown engine"):
+        run_tournament(10, ["greedy", "smart"], [2], engine="race")
@@ -0,0 +1,69 @@
+import random
+from collections import Counter
+from fractions import Fraction
+
+import pytest
+
+from opaprikkie_sim.constants import MAX_ROW_HEIGHT, NUMBER_OF_DICE
+from opaprikkie_sim.dice import DiceRoller
+from opaprikkie_sim.turn_table import (
+    TurnOutcomeTable,
+    roll_match_distribution,
+    turn_outcome_distribution,
+)
+
+
+@pytest.mark.parametrize("target", range(1, 13))
+def test_turn_outcome_distribution_sums_to_one(target: int) -> None:
+    assert sum(turn_outcome_distribution(target)) == 1
+
+
+def test_roll_match_distribution_single_target():
+    distribution = roll_match_distribution(3, 2)
+    assert distribution == {0: Fraction(25, 36), 1: Fraction(10, 36), 2: Fraction(1, 36)}
+
+
+def test_roll_match_distribution_double_target():
+    # 12 needs two sixes, 7 can be formed by 1+6, 2+5 or 3+4
+    assert roll_match_distribution(12, 2)[1] == Fraction(1, 36)
+    assert roll_match_distribution(7, 2)[1] == Fraction(6, 36)
+
+
+def test_turn_outcome_distribution_first_miss():
+    assert NUMBER_OF_DICE == 6
+    # a single-die target misses when none of the six dice shows it
+    assert turn_outcome_distribution(4)[0] == Fraction(5, 6) ** 6
+
+
+def test_turn_outcome_distribution_stops_at_row_height():
+    distribution = turn_outcome_distribution(2, num_dice=1, max_moves=MAX_ROW_HEIGHT)
+    # with one die every hit re-rolls that die, so the turn either misses or reaches the top
+    assert len(distribution) == MAX_ROW_HEIGHT + 1
+    assert distribution[MAX_ROW_HEIGHT] == Fraction(1, 6) ** MAX_ROW_HEIGHT
+
+
+@pytest.mark.parametrize("target", [1, 7, 12])
+def test_turn_outcome_distribution_matches_reference_loop(target: int) -> None:
+    random.seed(5)
+    roller = DiceRoller(use_outcome_table=False)
+    num_turns = 20000
+    observed = Counter(roller.simulate_turn(target) for _ in range(num_turns))
+    for moves, probability in enumerate(turn_outcome_distribution(target)):
+        expected = float(probability)
+        tolerance = 4 * (expected * (1 - expected) / num_turns) ** 0.5 + 1e-3
+        assert abs(observed[moves] / num_turns - expected) < tolerance
+
+
+def test_turn_outcome_table_sample():
+    table = TurnOutcomeTable()
+    probabilities = table.probabilities(7)
+    assert table.sample(7, 0.0) == 0
+    assert table.sample(7, probabilities[0]) == 1
+    assert table.sample(7, 1 - 1e-12) == len(probabilities) - 1
+
+
+def test_dice_roller_uses_outcome_table():
+    random.seed(6)
+    roller = DiceRoller()
+    moves = [roller.simulate_turn(12) for _ in range(1000)]
+    assert all(0 <= m < len(turn_outcome_distribution(12)) for m in moves)